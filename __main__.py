@@ -20,9 +20,47 @@ Moving any of these folders or files will prevent the game from working properly
 Author: Walker M. White (wmw2)
 Date:   November 1, 2017 (Python 3 Version)
 """
-from consts import *
-from app import *
+import consts
+import sys
+
+
+def wave_file(argv, default=None):
+    """
+    Returns the wave file named on the command line, or default if there is
+    none (so with the default of None, it reports whether one was named).
+
+    sys.argv is a list of the command line arguments when you run python. These
+    arguments are everything after the word python. So if you start the game
+    typing
+
+        python planetoids default.json
+
+    Python puts ['planetoids', 'default.json'] into sys.argv. The .json may be
+    left off the name of the file.
+
+    Parameter argv: the command line arguments
+    Precondition: argv is a list of strings
+
+    Parameter default: the wave file to use if none is named
+    Precondition: default is a string or None
+    """
+    if len(argv) < 2:
+        return default
+    file = argv[1]
+    if file[-5:].lower() == '.json':
+        return file
+    return file+'.json'
+
 
 # Application code
 if __name__ == '__main__':
+    # The command line is only read here, so that importing consts.py (as the
+    # headless tools do) never picks up their arguments. NAMED_WAVE and
+    # DEFAULT_WAVE have to be set before app.py copies them with
+    # from consts import *.
+    consts.NAMED_WAVE = wave_file(sys.argv)
+    if consts.NAMED_WAVE != None:
+        consts.DEFAULT_WAVE = consts.NAMED_WAVE
+    from consts import *
+    from app import *
     Planetoids(width=GAME_WIDTH,height=GAME_HEIGHT).run()
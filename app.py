@@ -14,6 +14,13 @@ Emily Wei (ejw235) and Amira Razack (arr258)
 from consts import *
 from game2d import *
 from wave import *
+from assets import *
+from labels import *
+from profiler import *
+from replay import *
+from campaign import *
+import os
+import time
 import json
 
 # PRIMARY RULE: Planetoids can only access attributes in wave.py via getters/setters
@@ -58,16 +65,11 @@ class Planetoids(GameApp):
     These attributes are inherited. You do not need to add them. Any other attributes
     that you add should be hidden.
 
-    Other Class Attributes:
-    Attribute waves: contains a list of the names of the different wave files
-    Invariant: waves is a list of strings containing the three different waves
-
-    Attribute wins: serves as a counter if the player won the wave
-    Invariant: wins is an int that is incremented when the player wins a wave
+    The waves that are played, and their order, come from the campaign (see
+    campaign.py): the manifest CAMPAIGN_FILE, or CAMPAIGN_WAVES in order if
+    there is none.
     """
     # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    waves = ['wave1.json','wave2.json','wave3.json']
-    wins = 0
     # THE ATTRIBUTES LISTED ARE SUGGESTIONS ONLY AND CAN BE CHANGED AS YOU SEE FIT
     # Attribute _state: the current state of the game as a value from consts.py
     # Invariant: _state is one of STATE_INACTIVE, STATE_LOADING, STATE_PAUSED,
@@ -93,6 +95,60 @@ class Planetoids(GameApp):
     #           the end of a wave
     # Invariant: _winlosetext is a GLabel, or None if there is no message to
     #            display
+    #
+    # Attribute _tick: the length of a simulation tick in seconds
+    # Invariant: _tick is a float > 0 (1/TICK_RATE)
+    #
+    # Attribute _accumulator: the frame time not yet simulated by a tick
+    # Invariant: _accumulator is a float between 0 and MAX_FRAME_TIME+_tick
+    #
+    # Attribute _wavecache: the parsed wave files, each loaded the first time
+    #           it is needed
+    # Invariant: _wavecache is a WaveCache object
+    #
+    # Attribute _campaign: the waves to play and the order to play them in
+    # Invariant: _campaign is a Campaign object
+    #
+    # Attribute _prefetcher: builds the waves that may come next in the
+    #           background, while the current wave is played
+    # Invariant: _prefetcher is a WavePrefetcher object
+    #
+    # Attribute _waveid: the id in _campaign of the current wave
+    # Invariant: _waveid is a string, an id of a wave of _campaign
+    #
+    # Attribute _retries: how many times the current wave was lost
+    # Invariant: _retries is an int >= 0
+    #
+    # Attribute _ticks: the number of ticks played of the current try
+    # Invariant: _ticks is an int >= 0
+    #
+    # Attribute _labels: the labels made so far (every label shown comes from
+    #           here, so a label is only made again when its text changes)
+    # Invariant: _labels is a LabelCache object
+    #
+    # Attribute _shown: the labels drawn in the last frame
+    # Invariant: _shown is a tuple of GLabels (or None)
+    #
+    # Attribute _labelchanges: the number of frames that drew different labels
+    #           from the frame before
+    # Invariant: _labelchanges is an int >= 0
+    #
+    # Attribute _profiler: the profiler that times the phases of each frame
+    # Invariant: _profiler is a FrameProfiler object, or None if the HUD is
+    #            hidden and PROFILE_CSV is None
+    #
+    # Attribute _hud: the text of the profiler HUD
+    # Invariant: _hud is a GLabel, or None if the HUD is hidden
+    #
+    # Attribute _hudkey: whether PROFILE_KEY was down in the last frame
+    # Invariant: _hudkey is a boolean
+    #
+    # Attribute _recorder: the recorder of the keys of the current wave
+    # Invariant: _recorder is a Recorder object, or None if RECORD_FOLDER is
+    #            None or the current wave is over
+    #
+    # Attribute _recordings: the number of recordings saved so far
+    # Invariant: _recordings is an int >= 0
 
     # THREE MAIN GAMEAPP METHODS
     def start(self):
@@ -109,27 +165,48 @@ class Planetoids(GameApp):
         that the user should press a key to play a game.
         """
         self._state=STATE_INACTIVE
+        shared_assets().preload()
         self._background = GImage(x=400,y=350,width=GAME_WIDTH,
-            height=GAME_HEIGHT,source='space.png')
+            height=GAME_HEIGHT,source=BACKGROUND_IMAGE)
         self._wave=None
+        self._labels=LabelCache()
+        self._shown=()
+        self._labelchanges=0
         if self._state==STATE_INACTIVE:
-            self._title=GLabel(text="Planetoids", font_size=TITLE_SIZE,
-                x=GAME_WIDTH/2, y=(GAME_HEIGHT/2)+TITLE_OFFSET,
-                font_name=TITLE_FONT, linecolor='white')
-            self._message=GLabel(text="Press s to start",
-                font_size=MESSAGE_SIZE, x=GAME_WIDTH/2,
-                y=(GAME_HEIGHT/2)+MESSAGE_OFFSET,
-                font_name=MESSAGE_FONT,linecolor='white')
+            self._title=self._labels.label("Planetoids",TITLE_FONT,TITLE_SIZE,
+                GAME_WIDTH/2,(GAME_HEIGHT/2)+TITLE_OFFSET)
+            self._message=self._labels.label("Press s to start",MESSAGE_FONT,
+                MESSAGE_SIZE,GAME_WIDTH/2,(GAME_HEIGHT/2)+MESSAGE_OFFSET)
         elif self._state==STATE_ACTIVE:
             self._message=None
         else:
             self._title=None
-        self._winlosetext = GLabel(text="",
-            font_size=120, x=GAME_WIDTH/2,
-            y=(GAME_HEIGHT/2)+TITLE_OFFSET,
-            font_name=MESSAGE_FONT,linecolor='white')
-        l=super().load_json(DEFAULT_WAVE)
-        self._wave=Wave(l)
+        self._winlosetext = self._labels.label("",MESSAGE_FONT,120,
+            GAME_WIDTH/2,(GAME_HEIGHT/2)+TITLE_OFFSET)
+        self._tick=1/TICK_RATE
+        self._accumulator=0.0
+        self._profiler=None
+        self._hud=None
+        self._hudkey=False
+        self._recorder=None
+        self._recordings=0
+        if PROFILE_CSV != None:
+            self._profiler=FrameProfiler(PROFILE_CSV)
+        self._wavecache=WaveCache(self.load_json)
+        self._campaign=self.loadcampaign()
+        self._prefetcher=WavePrefetcher(self.buildwave)
+        self._retries=0
+        self._ticks=0
+        first=self._campaign.getter_start()
+        if NAMED_WAVE != None:
+            # A wave named on the command line is played from its place in
+            # the campaign, or on its own if it is not in the campaign
+            first=self._campaign.find(NAMED_WAVE)
+            if first == None:
+                self._campaign=default_campaign([NAMED_WAVE])
+                first=NAMED_WAVE
+        self.preloadcampaign()
+        self.newwave(first)
 
     def update(self,dt):
         """
@@ -176,17 +253,29 @@ class Planetoids(GameApp):
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
 
+        The wave is simulated in fixed ticks of 1/TICK_RATE seconds, no matter
+        how often this method is called. The frame time dt is added to an
+        accumulator, and as many whole ticks as fit are run; the remainder
+        carries over to the next frame (and tells draw how far to interpolate).
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
         assert isinstance(dt,int) or isinstance(dt,float)
+        self.togglehud()
         if self.input.is_key_pressed('s') and self._state==STATE_INACTIVE:
             self._state=STATE_LOADING
             self._message=None
             self._title=None
             self._state = STATE_ACTIVE
         if self._state==STATE_ACTIVE:
-            self._wave.update(dt, self.input)
+            self._accumulator += min(dt,MAX_FRAME_TIME)
+            while self._accumulator >= self._tick:
+                if self._recorder != None:
+                    self._recorder.record(self.input)
+                self._wave.update(self._tick, self.input)
+                self._accumulator -= self._tick
+                self._ticks += 1
         self.winlosestates()
 
     def draw(self):
@@ -200,17 +289,93 @@ class Planetoids(GameApp):
         in Wave. In order to draw them, you either need to add getters for these
         attributes or you need to add a draw method to class Wave. We suggest the latter.
         See the example subcontroller.py from class.
+
+        The labels all come from the label cache, so a frame that shows the
+        same text as the frame before makes no new labels. Frames that show
+        different labels from the frame before are counted (see
+        getter_labelstats).
+
+        If there is a profiler, the background and label passes are timed
+        (Wave times its own draw), the frame is ended, and the HUD is drawn
+        on top if it is showing.
         """
+        shown = (self._message,self._title,self._winlosetext)
+        if shown != self._shown:
+            self._labelchanges += 1
+            self._shown = shown
+        profiler = self._profiler
+        if profiler != None:
+            start = time.perf_counter()
         if self._background != None:
             self._background.draw(self.view)
+        if profiler != None:
+            profiler.add('background',time.perf_counter()-start)
         if self._wave!=None:
-            self._wave.draw(self.view)
+            alpha = 1
+            if self._state==STATE_ACTIVE:
+                alpha = min(1,self._accumulator/self._tick)
+            self._wave.draw(self.view,alpha)
+        if profiler != None:
+            start = time.perf_counter()
         if self._message!=None:
             self._message.draw(self.view)
         if self._title!=None:
             self._title.draw(self.view)
         if self._winlosetext != None:
             self._winlosetext.draw(self.view)
+        if profiler != None:
+            profiler.add('labels',time.perf_counter()-start)
+            profiler.end_frame()
+            self.drawhud()
+
+    # METHOD FOR WHEN THE APPLICATION STOPS
+    def on_stop(self):
+        """
+        Cleans up when the application stops (Kivy calls this once the
+        window is closed).
+
+        It saves the recording of the current wave, closes the CSV file of
+        the profiler, so the last frames are written, and stops the thread
+        that builds waves ahead of time.
+        """
+        self.saverecording()
+        if self._profiler != None:
+            self._profiler.close()
+            self._profiler = None
+        self._prefetcher.shutdown()
+
+    def getter_labelstats(self):
+        """
+        This method returns a dict with the number of labels made ('builds'),
+        the number of times a label already made was reused ('hits') and the
+        number of frames that drew different labels from the frame before
+        ('changes').
+
+        On an end screen the builds and changes stay the same from frame to
+        frame, and only the hits go up.
+
+        Parameter self: current instance of the class
+        """
+        return {'builds':self._labels.getter_builds(),
+            'hits':self._labels.getter_hits(),'changes':self._labelchanges}
+
+    def getter_wavecache(self):
+        """
+        This method is a getter for the wave cache, whose hit and miss
+        counters show how often a wave was started without loading a file.
+
+        Parameter self: current instance of the class
+        """
+        return self._wavecache
+
+    def getter_prefetcher(self):
+        """
+        This method is a getter for the wave prefetcher, whose hit and miss
+        counters show how often a wave was started without building it.
+
+        Parameter self: current instance of the class
+        """
+        return self._prefetcher
 
     # HELPER METHODS FOR THE STATES
     def winlosestates(self):
@@ -220,35 +385,180 @@ class Planetoids(GameApp):
 
         Parameter self: current instance of the class
         """
+        if self._wave.getter_for_winlose() != None:
+            self.saverecording()
         if self._wave.getter_for_winlose() == True:
-            if Planetoids.wins < (len(Planetoids.waves) - 1):
+            nextwave = self._campaign.getter_wave(self._waveid).next_wave(
+                self._retries,self._ticks*self._tick)
+            if nextwave != None:
                 self.winningtext()
                 if self.input.is_key_pressed('n'):
                     self.loading()
-                    Planetoids.wins+=1
-                    if Planetoids.wins <= (len(Planetoids.waves) - 1):
-                        l = super().load_json(Planetoids.waves[Planetoids.wins])
-                        self._wave=Wave(l)
-                        self._state = STATE_ACTIVE
-                else:
-                    self_state = STATE_COMPLETE
+                    self._retries = 0
+                    self.newwave(nextwave)
+                    self._state = STATE_ACTIVE
             else:
                 self._message = None
                 self._title=None
-                self._winlosetext = GLabel(text="YOU WIN",
-                    font_size=120, x=GAME_WIDTH/2,
-                    y=(GAME_HEIGHT/2), font_name=MESSAGE_FONT,linecolor='white')
+                self._winlosetext = self._labels.label("YOU WIN",MESSAGE_FONT,
+                    120,GAME_WIDTH/2,GAME_HEIGHT/2)
                 self._state=STATE_COMPLETE
         elif self._wave.getter_for_winlose() == False:
             self.losingtext()
             if self.input.is_key_pressed('r'):
                 self.loading()
-                l = super().load_json(Planetoids.waves[Planetoids.wins])
-                self._wave=Wave(l)
+                self._retries += 1
+                self.newwave(self._waveid)
                 self._state = STATE_ACTIVE
             else:
                 self._state = STATE_COMPLETE
 
+    def loadcampaign(self):
+        """
+        This method returns the campaign to play: the manifest CAMPAIGN_FILE,
+        or CAMPAIGN_WAVES in order if there is none.
+
+        Parameter self: current instance of the class
+        """
+        if CAMPAIGN_FILE == None:
+            return default_campaign()
+        data = self.load_json(CAMPAIGN_FILE)
+        assert data != None, 'could not load '+repr(CAMPAIGN_FILE)
+        return parse_campaign(data)
+
+    def preloadcampaign(self):
+        """
+        This method loads and parses the wave file of every wave of the
+        campaign, so a file that is missing or malformed fails when the game
+        starts instead of when the prefetcher (or the player) reaches it.
+
+        Parameter self: current instance of the class
+        """
+        files=[]
+        for waveid in self._campaign.getter_ids():
+            files.append(self._campaign.getter_wave(waveid).getter_file())
+        self._wavecache.preload(files)
+
+    def buildwave(self, waveid):
+        """
+        This method returns a new Wave of a wave of the campaign. The
+        prefetcher calls it on its background thread.
+
+        It makes no Kivy objects and changes none: the shared sounds and
+        sprite were made by shared_assets().preload() in start, on the main
+        thread, and a Wave only sets up its explosion sprite when it draws
+        it (see AssetRegistry.sprite).
+
+        Parameter self: current instance of the class
+
+        Parameter waveid: the id of the wave
+        Precondition: waveid is the id of a wave of the campaign
+        """
+        return self._campaign.getter_wave(waveid).make_wave(self._wavecache)
+
+    def newwave(self, waveid):
+        """
+        This method makes a wave of the campaign the current wave.
+
+        The Wave was usually built in the background by the prefetcher while
+        the wave before was played, so starting it takes no time. Then the
+        prefetcher starts building the waves that may come after it (and
+        this wave again, for a retry).
+
+        Parameter self: current instance of the class
+
+        Parameter waveid: the id of the wave
+        Precondition: waveid is the id of a wave of the campaign
+        """
+        assert isinstance(waveid,str)
+        self.saverecording()
+        campaignwave=self._campaign.getter_wave(waveid)
+        if RECORD_FOLDER != None:
+            self._recorder=Recorder(campaignwave.getter_file(),
+                campaignwave.definition(self._wavecache),self._tick,
+                campaignwave.getter_maxbullets(),campaignwave.getter_swept())
+        self._wave=self._prefetcher.take(waveid)
+        self._waveid=waveid
+        self._ticks=0
+        self._wave.setter_interpolate(True)
+        self._wave.setter_profiler(self._profiler)
+        self._accumulator=0.0
+        upcoming=self._campaign.upcoming(waveid,PREFETCH_DEPTH)
+        if waveid in upcoming:
+            upcoming.remove(waveid)
+        self._prefetcher.request([waveid]+upcoming)
+
+    def saverecording(self):
+        """
+        This method saves the recording of the current wave (if there is one)
+        to RECORD_FOLDER and stops recording.
+
+        Recordings are named session-<number>-<wave file>.rec, and can be
+        played back with replay.py.
+
+        Parameter self: current instance of the class
+        """
+        if self._recorder == None:
+            return
+        recording = self._recorder.recording()
+        self._recorder = None
+        if recording.getter_masks() == b'':
+            return
+        self._recordings += 1
+        os.makedirs(RECORD_FOLDER,exist_ok=True)
+        recording.save(os.path.join(RECORD_FOLDER,'session-%03d-%s.rec' %
+            (self._recordings,os.path.basename(recording.getter_name()))))
+
+    def togglehud(self):
+        """
+        This method shows or hides the profiler HUD when PROFILE_KEY goes
+        down.
+
+        Showing the HUD starts a profiler if there is none. Hiding it stops
+        the profiler, unless it is also writing to PROFILE_CSV, so nothing is
+        timed while the HUD is hidden.
+
+        Parameter self: current instance of the class
+        """
+        down = self.input.is_key_down(PROFILE_KEY)
+        if down and not self._hudkey:
+            if self._hud == None:
+                if self._profiler == None:
+                    self._profiler = FrameProfiler()
+                self.refreshhud()
+            else:
+                self._hud = None
+                if PROFILE_CSV == None:
+                    self._profiler = None
+            if self._wave != None:
+                self._wave.setter_profiler(self._profiler)
+        self._hudkey = down
+
+    def drawhud(self):
+        """
+        This method draws the profiler HUD if it is showing, updating its text
+        every PROFILE_HUD_REFRESH frames.
+
+        Parameter self: current instance of the class
+        """
+        if self._hud == None:
+            return
+        if self._profiler.getter_frame() % PROFILE_HUD_REFRESH == 0:
+            self.refreshhud()
+        self._hud.draw(self.view)
+
+    def refreshhud(self):
+        """
+        This method remakes the HUD label with the latest averages, in the
+        top left corner of the screen.
+
+        Parameter self: current instance of the class
+        """
+        self._hud = GLabel(text=self._profiler.hud_text(),
+            font_size=PROFILE_HUD_SIZE,linecolor='white')
+        self._hud.left = 8
+        self._hud.top = GAME_HEIGHT-8
+
     def loading(self):
         """
         This method sets the class into a loading state, changing the message,
@@ -268,14 +578,10 @@ class Planetoids(GameApp):
 
         Parameter self: current instance of the class
         """
-        self._winlosetext = GLabel(text="YOU WIN",
-            font_size=120, x=GAME_WIDTH/2,
-            y=(GAME_HEIGHT/2)+TITLE_OFFSET,
-            font_name=MESSAGE_FONT,linecolor='white')
-        self._message = GLabel(text="Press n to next wave",
-            font_size=MESSAGE_SIZE, x=GAME_WIDTH/2,
-            y=(GAME_HEIGHT/2)+MESSAGE_OFFSET,
-            font_name=MESSAGE_FONT,linecolor='white')
+        self._winlosetext = self._labels.label("YOU WIN",MESSAGE_FONT,120,
+            GAME_WIDTH/2,(GAME_HEIGHT/2)+TITLE_OFFSET)
+        self._message = self._labels.label("Press n to next wave",MESSAGE_FONT,
+            MESSAGE_SIZE,GAME_WIDTH/2,(GAME_HEIGHT/2)+MESSAGE_OFFSET)
 
     def losingtext(self):
         """
@@ -284,10 +590,7 @@ class Planetoids(GameApp):
 
         Parameter self: current instance of the class
         """
-        self._winlosetext = GLabel(text="YOU LOSE",
-            font_size=120, x=GAME_WIDTH/2, y=(GAME_HEIGHT/2)+TITLE_OFFSET,
-            font_name=MESSAGE_FONT,linecolor='white')
-        self._message = GLabel(text="Press r to retry",
-            font_size=MESSAGE_SIZE, x=GAME_WIDTH/2,
-            y=(GAME_HEIGHT/2)+MESSAGE_OFFSET,
-            font_name=MESSAGE_FONT,linecolor='white')
+        self._winlosetext = self._labels.label("YOU LOSE",MESSAGE_FONT,120,
+            GAME_WIDTH/2,(GAME_HEIGHT/2)+TITLE_OFFSET)
+        self._message = self._labels.label("Press r to retry",MESSAGE_FONT,
+            MESSAGE_SIZE,GAME_WIDTH/2,(GAME_HEIGHT/2)+MESSAGE_OFFSET)
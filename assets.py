@@ -0,0 +1,255 @@
+"""
+Asset registry module for Planetoids
+
+This module contains a registry of the images, sounds and fonts named in
+consts.py. Instead of every Wave making its own Sound and GSprite objects (and
+loading their files again on every retry or new wave), Wave asks the registry,
+which makes each one the first time and hands out the same object after that.
+
+The registry also loads every image into a texture once, so the textures of
+the ship, the asteroids and the explosion are already in Kivy's cache when the
+first drawable that uses them is made. For each asset it records how much
+memory it holds: the size of the texture for images, and the size of the file
+for sounds and fonts.
+
+There is a single registry per process, returned by shared_assets.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from game2d import *
+import os
+
+try:
+    from kivy.core.image import Image as CoreImage
+except ImportError:
+    CoreImage = None
+
+# The images, sounds and fonts that preload loads
+IMAGES = (SHIP_IMAGE,LARGE_IMAGE,MEDIUM_IMAGE,SMALL_IMAGE,EXPLOSION_IMAGE,
+    BACKGROUND_IMAGE)
+SOUNDS = (BULLET_SOUND,EXPLOSION_SOUND)
+FONTS  = (TITLE_FONT,MESSAGE_FONT)
+
+# The folder that the asset folders are in
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def asset_path(folder, name):
+    """
+    Returns the path of an asset file, or None if there is no such file.
+
+    Parameter folder: the asset folder
+    Precondition: folder is IMAGE_FOLDER, SOUND_FOLDER or FONT_FOLDER
+
+    Parameter name: the name of the file
+    Precondition: name is a string
+    """
+    path = os.path.join(_ROOT,folder,name)
+    if os.path.isfile(path):
+        return path
+    return None
+
+
+class AssetRegistry(object):
+    """
+    A class that makes each sound, sprite and texture once and shares it.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _handles: the shared objects made so far
+    # Invariant: _handles is a dict mapping (kind, name) tuples to objects
+    #
+    # Attribute _bytes: the memory held by each asset
+    # Invariant: _bytes is a dict mapping (kind, name) tuples to ints >= 0
+    #
+    # Attribute _hits: the number of requests served by a shared object
+    # Invariant: _hits is an int >= 0
+    #
+    # Attribute _misses: the number of requests that made a new object
+    # Invariant: _misses is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_hits(self):
+        """
+        This method is a getter for the number of requests served by an
+        object that was already made.
+
+        Parameter self: current instance of the class
+        """
+        return self._hits
+
+    def getter_misses(self):
+        """
+        This method is a getter for the number of requests that made a new
+        object.
+
+        Parameter self: current instance of the class
+        """
+        return self._misses
+
+    def getter_total_bytes(self):
+        """
+        This method returns the memory held by every asset, in bytes.
+
+        Parameter self: current instance of the class
+        """
+        return sum(self._bytes.values())
+
+    # INITIALIZER TO MAKE AN EMPTY REGISTRY
+    def __init__(self):
+        """
+        Initializes an empty registry.
+        """
+        self._handles = {}
+        self._bytes = {}
+        self._hits = 0
+        self._misses = 0
+
+    # ADDITIONAL METHODS
+    def preload(self):
+        """
+        This method loads every image, sound and font named in IMAGES,
+        SOUNDS and FONTS, so a new wave loads nothing.
+
+        Preloading does not count as a hit or miss.
+
+        Parameter self: current instance of the class
+        """
+        hits = self._hits
+        misses = self._misses
+        for name in IMAGES:
+            self.texture(name)
+        for name in SOUNDS:
+            self.sound(name)
+        for name in FONTS:
+            self.font(name)
+        self.sprite(EXPLOSION_IMAGE)
+        self._hits = hits
+        self._misses = misses
+
+    def sound(self, name):
+        """
+        This method returns the shared Sound for a sound file.
+
+        Parameter name: the name of the sound file
+        Precondition: name is a string naming a file in SOUND_FOLDER
+        """
+        key = ('sound',name)
+        if self._lookup(key):
+            return self._handles[key]
+        self._handles[key] = Sound(name)
+        self._bytes[key] = self._filesize(SOUND_FOLDER,name)
+        return self._handles[key]
+
+    def sprite(self, name):
+        """
+        This method returns the shared explosion GSprite.
+
+        Waves are built ahead of time (see WavePrefetcher in campaign.py),
+        so the sprite must not hold the state of any one wave. Each wave
+        keeps its own frame of the explosion, and sets the frame and the
+        position of the sprite just before it draws it. Its size and frames
+        are those of the ship explosion.
+
+        Parameter name: the name of the sprite sheet
+        Precondition: name is a string naming a file in IMAGE_FOLDER
+        """
+        key = ('sprite',name)
+        if self._lookup(key):
+            return self._handles[key]
+        self.texture(name)
+        self._handles[key] = GSprite(x=0,y=0,source=name,width=2*SHIP_RADIUS,
+            height=2*SHIP_RADIUS,format=(2,4),count=8)
+        self._bytes[key] = 0
+        return self._handles[key]
+
+    def texture(self, name):
+        """
+        This method returns the shared texture of an image file, or None if
+        Kivy or the file is not there.
+
+        Parameter name: the name of the image file
+        Precondition: name is a string naming a file in IMAGE_FOLDER
+        """
+        key = ('texture',name)
+        if self._lookup(key):
+            return self._handles[key]
+        path = asset_path(IMAGE_FOLDER,name)
+        texture = None
+        size = self._filesize(IMAGE_FOLDER,name)
+        if CoreImage != None and path != None:
+            texture = CoreImage(path).texture
+            size = texture.width*texture.height*4
+        self._handles[key] = texture
+        self._bytes[key] = size
+        return texture
+
+    def font(self, name):
+        """
+        This method returns the path of a font file, or None if there is no
+        such file.
+
+        Fonts are loaded by Kivy the first time a GLabel uses them, so the
+        registry only records where they are and how large they are.
+
+        Parameter name: the name of the font file
+        Precondition: name is a string naming a file in FONT_FOLDER
+        """
+        key = ('font',name)
+        if self._lookup(key):
+            return self._handles[key]
+        self._handles[key] = asset_path(FONT_FOLDER,name)
+        self._bytes[key] = self._filesize(FONT_FOLDER,name)
+        return self._handles[key]
+
+    def report(self):
+        """
+        This method returns a list of (kind, name, bytes) tuples, one per
+        asset, from the largest to the smallest.
+
+        Parameter self: current instance of the class
+        """
+        rows = [(key[0],key[1],self._bytes[key]) for key in self._bytes]
+        rows.sort(key=lambda row: (-row[2],row[0],row[1]))
+        return rows
+
+    def _lookup(self, key):
+        """
+        Returns True (and counts a hit) if there is a shared object for key,
+        and False (and counts a miss) if not.
+
+        Parameter key: the kind and name of the asset
+        Precondition: key is a (kind, name) tuple
+        """
+        if key in self._handles:
+            self._hits += 1
+            return True
+        self._misses += 1
+        return False
+
+    def _filesize(self, folder, name):
+        """
+        Returns the size of an asset file in bytes, or 0 if it is not there.
+
+        Parameter folder: the asset folder
+        Precondition: folder is IMAGE_FOLDER, SOUND_FOLDER or FONT_FOLDER
+
+        Parameter name: the name of the file
+        Precondition: name is a string
+        """
+        path = asset_path(folder,name)
+        if path == None:
+            return 0
+        return os.path.getsize(path)
+
+
+# The registry of this process
+_REGISTRY = AssetRegistry()
+
+
+def shared_assets():
+    """
+    Returns the asset registry of this process.
+    """
+    return _REGISTRY
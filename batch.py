@@ -0,0 +1,203 @@
+"""
+Batch runner for Planetoids
+
+This module plays many independent headless waves (see headless.py) across a
+pool of worker processes. Every run is described by a job, a dict with
+
+    'wave':    a wave JSON dict, a WaveDefinition (e.g. from generator.py),
+               or the name of a wave JSON file
+    'script':  the keys down in each frame (anything ScriptedInput accepts;
+               a bytes object of key masks is the most compact)
+    'frames':  the most frames to play
+    'id':      anything, handed back in the outcome (optional)
+
+and produces an outcome, a dict with
+
+    'id':        the id of the job
+    'result':    'win', 'lose', or None if the frame limit was reached first
+    'frames':    the number of frames played
+    'destroyed': the number of asteroids hit by bullets
+
+Runs share nothing, so throughput grows with the number of cores. Jobs are
+handed out to the workers in chunks to keep the cost of talking to the workers
+small, and wave files named by a job are only read and parsed once per worker
+(see WaveCache in wavedata.py).
+
+Run it from the game folder to play random scripts against wave files, e.g.
+
+    python batch.py wave1.json wave2.json --runs 1000 --frames 3600
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+def read_json(name):
+    """
+    Returns the contents of a JSON file.
+
+    Parameter name: the name of the file
+    Precondition: name is a string naming a JSON file
+    """
+    with open(name) as file:
+        return json.load(file)
+
+
+# The wave files already loaded by this process
+_WAVE_FILES = WaveCache(read_json)
+
+
+def load_wave(wave):
+    """
+    Returns the wave JSON dict or WaveDefinition for a job.
+
+    Parameter wave: a wave JSON dict, a WaveDefinition, or the name of a wave
+    JSON file
+    Precondition: wave is a dict, a WaveDefinition or a string
+    """
+    if isinstance(wave,dict) or isinstance(wave,WaveDefinition):
+        return wave
+    assert isinstance(wave,str), repr(wave)+' is not a wave'
+    return _WAVE_FILES.get(wave)
+
+
+def run_one(job):
+    """
+    Plays a single headless wave and returns its outcome.
+
+    Parameter job: the run to play (see the module description)
+    Precondition: job is a dict with the keys 'wave', 'script' and 'frames'
+    """
+    assert isinstance(job,dict)
+    wave = Wave(load_wave(job['wave']),vectorized=job.get('vectorized',False),
+        headless=True)
+    frames = simulate(wave,job['script'],job['frames'])
+    winlose = wave.getter_for_winlose()
+    if winlose == True:
+        result = 'win'
+    elif winlose == False:
+        result = 'lose'
+    else:
+        result = None
+    return {'id':job.get('id'),'result':result,'frames':frames,
+        'destroyed':wave.getter_destroyed()}
+
+
+def run_batch(jobs, processes=None, chunksize=None):
+    """
+    Plays every job and returns the list of outcomes, in the same order.
+
+    Parameter jobs: the runs to play
+    Precondition: jobs is an iterable of job dicts
+
+    Parameter processes: the number of worker processes (None means one per
+    core, and 1 plays every job in this process)
+    Precondition: processes is None or an int > 0
+
+    Parameter chunksize: the number of jobs handed to a worker at a time (None
+    picks about four chunks per worker)
+    Precondition: chunksize is None or an int > 0
+    """
+    jobs = list(jobs)
+    if processes == None:
+        processes = os.cpu_count() or 1
+    assert isinstance(processes,int) and processes > 0
+    if processes == 1 or len(jobs) <= 1:
+        return [run_one(job) for job in jobs]
+    if chunksize == None:
+        chunksize = max(1,len(jobs)//(4*processes))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run_one,jobs,chunksize)
+
+
+def random_script(seed, frames, density=0.3):
+    """
+    Returns a random script of key masks (see headless.keys_to_mask).
+
+    Each key is held down in a frame with probability density.
+
+    Parameter seed: the seed for the script
+    Precondition: seed is an int
+
+    Parameter frames: the length of the script
+    Precondition: frames is an int >= 0
+
+    Parameter density: the chance that a key is down in a frame
+    Precondition: density is a float between 0 and 1
+    """
+    rng = random.Random(seed)
+    script = bytearray(frames)
+    for frame in range(frames):
+        mask = 0
+        for i in range(len(WAVE_KEYS)):
+            if rng.random() < density:
+                mask |= 1 << i
+        script[frame] = mask
+    return bytes(script)
+
+
+def summarize(outcomes):
+    """
+    Returns a dict with the number of wins, losses and unfinished runs, and the
+    total frames played.
+
+    Parameter outcomes: the outcomes of run_batch
+    Precondition: outcomes is a list of outcome dicts
+    """
+    summary = {'win':0,'lose':0,'unfinished':0,'frames':0}
+    for outcome in outcomes:
+        if outcome['result'] == None:
+            summary['unfinished'] += 1
+        else:
+            summary[outcome['result']] += 1
+        summary['frames'] += outcome['frames']
+    return summary
+
+
+def main(argv):
+    """
+    Plays random scripts against wave files and writes one outcome per line.
+
+    Parameter argv: the command line arguments (without the program name)
+    Precondition: argv is a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Play Planetoids in batches')
+    parser.add_argument('waves',nargs='+',help='the wave JSON files')
+    parser.add_argument('--runs',type=int,default=100,
+        help='the number of runs per wave')
+    parser.add_argument('--frames',type=int,default=3600)
+    parser.add_argument('--processes',type=int,default=None)
+    parser.add_argument('--chunksize',type=int,default=None)
+    parser.add_argument('--seed',type=int,default=0)
+    parser.add_argument('--output',default=None,
+        help='the file to write the outcomes to, one JSON object per line')
+    args = parser.parse_args(argv)
+    jobs = []
+    for wave in args.waves:
+        for run in range(args.runs):
+            seed = args.seed+len(jobs)
+            jobs.append({'id':[wave,seed],'wave':wave,'frames':args.frames,
+                'script':random_script(seed,args.frames)})
+    start = time.perf_counter()
+    outcomes = run_batch(jobs,args.processes,args.chunksize)
+    elapsed = time.perf_counter()-start
+    summary = summarize(outcomes)
+    print('%d runs, %d frames in %.2fs (%.0f runs/s, %.0f frames/s)' %
+        (len(outcomes),summary['frames'],elapsed,len(outcomes)/elapsed,
+        summary['frames']/elapsed))
+    print('%(win)d won, %(lose)d lost, %(unfinished)d unfinished' % summary)
+    if args.output != None:
+        with open(args.output,'w') as file:
+            for outcome in outcomes:
+                file.write(json.dumps(outcome)+'\n')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,1286 @@
+"""
+Benchmark script for Planetoids
+
+This module times the per-frame hot paths of a Wave. It builds synthetic
+headless waves (see headless.py) with a chosen number of asteroids and bullets,
+plays them for a number of frames, and records how long each phase of a frame
+takes along with how much memory each frame allocates. The results are written
+to a JSON file so that runs from before and after a change can be compared.
+
+Run it from the game folder, for example
+
+    python benchmark.py frame --asteroids 10 100 1000 5000 --bullets 0 1000
+
+Every suite is a function in the dictionary SUITES, and is run by name. The
+entity suite compares the memory and per-tick cost of an asteroid stored as a
+body (bodies.py) and as a game2d drawable (models.py), e.g.
+
+    python benchmark.py entity --entities 1000 10000
+
+The rotation suite times turning the ship and splitting an asteroid with the
+precomputed tables in bodies.py against working out the trig every call. The
+collision suite counts bullet/asteroid pair tests per second with Point2
+objects and a square root and with the squared distance collision kernel. The
+asset suite times a wave transition with the shared assets (see assets.py)
+and lists the memory each asset holds. The label suite compares the YOU LOSE
+screen with new labels every frame and with the label cache (see labels.py).
+The generate suite times making, and starting a wave from, a generated wave
+(see generator.py) with each of the --entities counts, straight from the
+generator and through a wave JSON dict. The tunnel suite fires bullets at
+small asteroids at several tick rates and counts the hits with and without
+swept collisions, e.g.
+
+    python benchmark.py tunnel --tick-rates 60 30 15 10
+
+The split suite times the worst case split burst, every large asteroid of a
+wave breaking on the same tick and then every medium one, with fragments
+constructed from scratch, cloned from the prototypes of the fragment factory
+(see pool.py), and taken from a factory with a full reserve of spares, e.g.
+
+    python benchmark.py split --splits 16 64
+
+The wrap suite times the wrapping stage of a tick, Wave.wrap_all against
+the four edge tests per body that it replaced, for each of the --asteroids
+counts with as many bullets, to show how its cost grows with the number of
+entities.
+
+The startup suite starts a new Python process for each run, which imports
+wave.py and plays the first tick of a headless wave, and reports how long
+the import and the first tick took and whether game2d, Kivy or NumPy were
+loaded, e.g.
+
+    python benchmark.py startup --startups 20
+
+The snapshot suite times Wave.snapshot and Wave.restore as a rollback
+(snapshot, play a tick, restore) for each of the --asteroids counts with as
+many bullets, and compares cloning a wave from a snapshot with reloading it
+from its wave JSON dict, e.g.
+
+    python benchmark.py snapshot --asteroids 10 100 1000
+
+The env suite counts the environment steps per second of a VectorEnv (see
+env.py) with each of the --envs counts of environments, stepped in this
+process and split between each of the --workers counts of worker processes,
+with random actions, e.g.
+
+    python benchmark.py env --envs 1 16 64 --workers 1 2 4
+
+Only the entity, asset and label suites need game2d, and they import it
+when they run, so the other suites run without Kivy installed.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+from generator import *
+from env import *
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# The phases of a frame, in the order Wave.update runs them
+FRAME_PHASES = ('update','move_all','wrap_all','collisions','place_asteroids',
+    'draw')
+
+
+def synthetic_wave(asteroids, seed=0, safe=200):
+    """
+    Returns a wave JSON dict with the ship in the center of the screen and
+    randomly placed asteroids of mixed sizes.
+
+    No asteroid starts within safe pixels (in both x and y) of the ship, and
+    they all move horizontally, so the ship survives for a while.
+
+    Parameter asteroids: the number of asteroids
+    Precondition: asteroids is an int >= 0
+
+    Parameter seed: the seed for the random placement
+    Precondition: seed is an int
+
+    Parameter safe: the half-size of the empty square around the ship
+    Precondition: safe is an int or float >= 0
+    """
+    assert isinstance(asteroids,int) and asteroids >= 0
+    rng = random.Random(seed)
+    cx = GAME_WIDTH/2
+    cy = GAME_HEIGHT/2
+    data = {'ship':{'position':[cx,cy],'angle':90},'asteroids':[]}
+    sizes = [SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID]
+    while len(data['asteroids']) < asteroids:
+        x = rng.uniform(0,GAME_WIDTH)
+        y = rng.uniform(0,GAME_HEIGHT)
+        if abs(x-cx) > safe or abs(y-cy) > safe:
+            data['asteroids'].append({'size':rng.choice(sizes),
+                'position':[x,y],'direction':[rng.choice([-1,1]),0]})
+    return data
+
+
+def top_up_bullets(wave, bullets, rng):
+    """
+    Spawns bullets at random positions until the wave has the given number.
+
+    Parameter wave: the wave to add bullets to
+    Precondition: wave is a Wave object
+
+    Parameter bullets: the number of bullets wanted
+    Precondition: bullets is an int >= 0
+
+    Parameter rng: the random generator for positions and directions
+    Precondition: rng is a random.Random object
+    """
+    while wave.getter_bullet_count() < bullets:
+        angle = rng.uniform(0,2*math.pi)
+        wave.spawn_bullet([rng.uniform(0,GAME_WIDTH),
+            rng.uniform(0,GAME_HEIGHT)],
+            Vector2(math.cos(angle),math.sin(angle)))
+
+
+def percentiles(samples):
+    """
+    Returns a dict with the mean, p50, p90, p99 and max of a list of samples.
+
+    Parameter samples: the samples
+    Precondition: samples is a non-empty list of ints or floats
+    """
+    assert isinstance(samples,list) and samples != []
+    ordered = sorted(samples)
+    def pick(p):
+        return ordered[min(len(ordered)-1,int(p*len(ordered)))]
+    return {'mean':sum(ordered)/len(ordered),'p50':pick(0.5),'p90':pick(0.9),
+        'p99':pick(0.99),'max':ordered[-1]}
+
+
+class _Scenario(object):
+    """
+    A class that keeps a synthetic wave running for a benchmark.
+
+    When the ship dies or the wave ends, the wave is rebuilt from its data so
+    every measured frame is a frame of normal play.
+    """
+
+    def __init__(self, asteroids, bullets, seed, vectorized):
+        """
+        Initializes the scenario and its first wave.
+
+        Parameter asteroids: the number of asteroids in the wave
+        Precondition: asteroids is an int >= 0
+
+        Parameter bullets: the number of bullets to keep on screen
+        Precondition: bullets is an int >= 0
+
+        Parameter seed: the seed for the wave and bullets
+        Precondition: seed is an int
+
+        Parameter vectorized: whether to use the array engine
+        Precondition: vectorized is a boolean
+        """
+        self.data = synthetic_wave(asteroids,seed)
+        self.bullets = bullets
+        self.vectorized = vectorized
+        self.rng = random.Random(seed)
+        self.input = ScriptedInput()
+        self.view = NullView()
+        self.rebuilds = 0
+        self.wave = None
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuilds the wave if it is over, and tops up its bullets.
+        """
+        if self.wave == None or not self.wave.is_playing():
+            self.wave = Wave(self.data,vectorized=self.vectorized,
+                headless=True,maxbullets=max(self.bullets,MAX_BULLETS))
+            self.rebuilds += 1
+        top_up_bullets(self.wave,self.bullets,self.rng)
+
+
+def time_frames(scenario, frames):
+    """
+    Returns a dict mapping each name in FRAME_PHASES to a list of timings (in
+    microseconds), one per frame.
+
+    The phases are timed by calling the Wave methods one after another in the
+    same order as Wave.update. The update phase is timed separately, as a
+    whole, on the same scenario.
+
+    Parameter scenario: the scenario to play
+    Precondition: scenario is a _Scenario object
+
+    Parameter frames: the number of frames to time
+    Precondition: frames is an int > 0
+    """
+    clock = time.perf_counter
+    timings = {}
+    for name in FRAME_PHASES:
+        timings[name] = []
+    for frame in range(frames):
+        scenario.refresh()
+        wave = scenario.wave
+        start = clock()
+        wave.update(1/60,scenario.input)
+        timings['update'].append((clock()-start)*1e6)
+        scenario.refresh()
+        wave = scenario.wave
+        if wave.is_vectorized():
+            # The array engine does all three phases in one batch
+            start = clock()
+            wave.engine_step()
+            elapsed = (clock()-start)*1e6
+            timings['move_all'].append(0.0)
+            timings['wrap_all'].append(0.0)
+            timings['collisions'].append(elapsed)
+        else:
+            start = clock()
+            wave.move_all()
+            timings['move_all'].append((clock()-start)*1e6)
+            start = clock()
+            wave.wrap_all()
+            timings['wrap_all'].append((clock()-start)*1e6)
+            start = clock()
+            wave.collisions()
+            timings['collisions'].append((clock()-start)*1e6)
+        wave.end_tick()
+        scenario.refresh()
+        timings['place_asteroids'].append(time_split(scenario.wave))
+        start = clock()
+        scenario.wave.draw(scenario.view)
+        timings['draw'].append((clock()-start)*1e6)
+    return timings
+
+
+def time_split(wave):
+    """
+    Returns the time (in microseconds) to split the first large or medium
+    asteroid of a wave with place_asteroids, or 0.0 if there is none.
+
+    The fragments are removed again afterwards, so the wave is unchanged.
+
+    Parameter wave: the wave to split an asteroid in
+    Precondition: wave is a Wave object
+    """
+    asteroids = wave.getter_asteroids()
+    for ast in range(len(asteroids)):
+        size = asteroids[ast].get_size()
+        if size == MEDIUM_ASTEROID or size == LARGE_ASTEROID:
+            vectors = asteroids[ast].resultant_vectors()
+            count = len(asteroids)
+            start = time.perf_counter()
+            wave.place_asteroids(size,vectors,ast)
+            elapsed = (time.perf_counter()-start)*1e6
+            for fragment in range(count,len(asteroids)):
+                asteroids.remove_at(fragment)
+            asteroids.flush()
+            return elapsed
+    return 0.0
+
+
+def measure_allocations(scenario, frames):
+    """
+    Returns a dict with the bytes allocated (peak over the frame) and the net
+    change in allocated memory blocks for each of a number of Wave.update
+    frames.
+
+    This is a separate pass from the timings, as tracemalloc slows every
+    allocation down.
+
+    Parameter scenario: the scenario to play
+    Precondition: scenario is a _Scenario object
+
+    Parameter frames: the number of frames to measure
+    Precondition: frames is an int > 0
+    """
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    try:
+        for frame in range(frames):
+            scenario.refresh()
+            wave = scenario.wave
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            count = sys.getallocatedblocks()
+            wave.update(1/60,scenario.input)
+            blocks.append(sys.getallocatedblocks()-count)
+            peaks.append(tracemalloc.get_traced_memory()[1]-before)
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes':percentiles(peaks),'net_blocks':percentiles(blocks)}
+
+
+def frame_suite(args):
+    """
+    Returns the results of the per-frame benchmark for every combination of
+    asteroid and bullet counts.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = []
+    for asteroids in args.asteroids:
+        for bullets in args.bullets:
+            scenario = _Scenario(asteroids,bullets,args.seed,args.vectorized)
+            for frame in range(args.warmup):
+                scenario.refresh()
+                scenario.wave.update(1/60,scenario.input)
+            gc.collect()
+            timings = time_frames(scenario,args.frames)
+            entry = {'asteroids':asteroids,'bullets':bullets,'phases':{}}
+            for name in FRAME_PHASES:
+                entry['phases'][name] = percentiles(timings[name])
+            entry['allocations'] = measure_allocations(scenario,
+                min(args.frames,args.alloc_frames))
+            entry['rebuilds'] = scenario.rebuilds
+            pool = scenario.wave.getter_bulletpool()
+            entry['bullet_pool'] = {'hits':pool.getter_hits(),
+                'misses':pool.getter_misses(),'hitrate':pool.getter_hitrate()}
+            results.append(entry)
+            report(asteroids,bullets,entry)
+    return results
+
+
+def make_entities(representation, count, seed):
+    """
+    Returns a list of count asteroids of mixed sizes moving in random
+    directions.
+
+    Parameter representation: 'body' for AsteroidBody (bodies.py) or
+    'drawable' for Asteroid (models.py)
+    Precondition: representation is 'body' or 'drawable'
+
+    Parameter count: the number of asteroids
+    Precondition: count is an int >= 0
+
+    Parameter seed: the seed for the positions and directions
+    Precondition: seed is an int
+    """
+    assert representation in ENTITY_REPRESENTATIONS, repr(representation)
+    if representation == 'drawable':
+        from models import Asteroid as cls
+    else:
+        cls = AsteroidBody
+    rng = random.Random(seed)
+    sizes = [SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID]
+    entities = []
+    for i in range(count):
+        entities.append(cls(rng.choice(sizes),[rng.uniform(0,GAME_WIDTH),
+            rng.uniform(0,GAME_HEIGHT)],[rng.uniform(-1,1),rng.uniform(-1,1)]))
+    return entities
+
+
+def entity_bytes(representation, count, seed):
+    """
+    Returns the memory (in bytes) taken by each of count asteroids, counting
+    everything allocated to make them (their velocities included).
+
+    Parameter representation: 'body' or 'drawable' (see make_entities)
+    Precondition: representation is 'body' or 'drawable'
+
+    Parameter count: the number of asteroids
+    Precondition: count is an int > 0
+
+    Parameter seed: the seed for the positions and directions
+    Precondition: seed is an int
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entities = make_entities(representation,count,seed)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # The list holding them is not part of the entities
+    return (after-before-sys.getsizeof(entities))/count
+
+
+def time_ticks(entities, ticks):
+    """
+    Returns a list of the time (in nanoseconds per entity) of each of a number
+    of ticks that move every entity by its velocity, the same way as
+    Wave.move_asteroids.
+
+    Parameter entities: the asteroids to move
+    Precondition: entities is a non-empty list from make_entities
+
+    Parameter ticks: the number of ticks to time
+    Precondition: ticks is an int > 0
+    """
+    clock = time.perf_counter
+    scale = 1
+    samples = []
+    for tick in range(ticks):
+        start = clock()
+        for entity in entities:
+            entity.x += entity._velocity.x*scale
+            entity.y += entity._velocity.y*scale
+        samples.append((clock()-start)*1e9/len(entities))
+    return samples
+
+
+def time_binds(entities, ticks):
+    """
+    Returns a list of the time (in nanoseconds per entity) of each of a number
+    of frames that bind every body to its drawable with a BodyView, which is
+    the extra cost of drawing bodies instead of drawables.
+
+    Parameter entities: the bodies to bind
+    Precondition: entities is a non-empty list of bodies
+
+    Parameter ticks: the number of frames to time
+    Precondition: ticks is an int > 0
+    """
+    from models import BodyView
+    clock = time.perf_counter
+    bodyview = BodyView()
+    samples = []
+    for tick in range(ticks):
+        start = clock()
+        for entity in entities:
+            bodyview.bind(entity)
+        bodyview.sweep()
+        samples.append((clock()-start)*1e9/len(entities))
+    return samples
+
+
+def entity_suite(args):
+    """
+    Returns the per-entity memory and per-tick cost of the two ways of storing
+    an asteroid: the __slots__ body that Wave simulates on, and the game2d
+    drawable from models.py.
+
+    The first bind of each body (when its drawable is made) is left out of
+    the bind timings, as it only happens once per body.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = []
+    for count in args.entities:
+        entry = {'entities':count}
+        for representation in ENTITY_REPRESENTATIONS:
+            entities = make_entities(representation,count,args.seed)
+            gc.collect()
+            entry[representation] = {
+                'bytes':entity_bytes(representation,count,args.seed),
+                'tick_ns':percentiles(time_ticks(entities,args.frames))}
+            if representation == 'body':
+                entry[representation]['bind_ns'] = percentiles(
+                    time_binds(entities,args.frames+1)[1:])
+        results.append(entry)
+        print('%6d entities  body %5.0f bytes %6.1fns/tick %6.1fns/bind  '
+            'drawable %5.0f bytes %6.1fns/tick' % (count,
+            entry['body']['bytes'],entry['body']['tick_ns']['p50'],
+            entry['body']['bind_ns']['p50'],entry['drawable']['bytes'],
+            entry['drawable']['tick_ns']['p50']))
+    return results
+
+
+def trig_turn(ship, angle):
+    """
+    Turns a ship the way ShipPhysics.turn did before the facing table, by
+    working out the trig and making a new facing vector.
+
+    Parameter ship: the ship to turn
+    Precondition: ship is a ShipBody
+
+    Parameter angle: the new angle of the ship in degrees
+    Precondition: angle is an int or float
+    """
+    ship.angle = angle
+    theta = angle*(math.pi/180)
+    ship._facing = Vector2(math.cos(theta),math.sin(theta))
+
+
+def trig_split(asteroid):
+    """
+    Returns the three resultant vectors of an asteroid the way
+    AsteroidPhysics.resultant_vectors did before the cached rotations.
+
+    Parameter asteroid: the asteroid to split
+    Precondition: asteroid is an AsteroidBody
+    """
+    vx = asteroid.get_velocity().x
+    vy = asteroid.get_velocity().y
+    vectors = []
+    angle = 120
+    for i in range(3):
+        if vx == 0.0 and vy == 0.0:
+            vectors.append(Vector2(0,0))
+        else:
+            vectors.append(Vector2(vx*math.cos(math.radians(angle))-vy*
+                math.sin(math.radians(angle)),vx*math.sin(math.radians(angle))+
+                vy*math.cos(math.radians(angle))).normalize())
+        angle += 120
+    return vectors
+
+
+def time_calls(function, args, repeats):
+    """
+    Returns a list of the time (in nanoseconds per call) of each of a number
+    of passes that call function once on every item of args.
+
+    Parameter function: the function to time
+    Precondition: function is callable with each item of args unpacked
+
+    Parameter args: the argument tuples
+    Precondition: args is a non-empty list of tuples
+
+    Parameter repeats: the number of passes
+    Precondition: repeats is an int > 0
+    """
+    clock = time.perf_counter
+    samples = []
+    for repeat in range(repeats):
+        start = clock()
+        for arg in args:
+            function(*arg)
+        samples.append((clock()-start)*1e9/len(args))
+    return samples
+
+
+def point_collided(bullet, asteroid):
+    """
+    Returns whether a bullet overlaps an asteroid the way
+    BulletPhysics.bullet_isCollided did before the collision kernel, with two
+    Point2 objects and a square root.
+
+    Parameter bullet: the bullet
+    Precondition: bullet is a BulletBody
+
+    Parameter asteroid: the asteroid
+    Precondition: asteroid is an AsteroidBody
+    """
+    sum_radii = BULLET_RADIUS + (asteroid.getter_width() / 2)
+    return Point2.distance(Point2(bullet.x,bullet.y),
+        Point2(asteroid.getter_x(),asteroid.getter_y())) < sum_radii
+
+
+def collision_suite(args):
+    """
+    Returns the number of bullet/asteroid pair tests per second with Point2
+    objects and a square root, with the squared distance collision kernel
+    (circles_overlap in bodies.py), and with the swept test.
+
+    The pairs are placed so about half of them overlap.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    rng = random.Random(args.seed)
+    sizes = [SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID]
+    pairs = []
+    for call in range(args.calls):
+        asteroid = AsteroidBody(rng.choice(sizes),[rng.uniform(0,GAME_WIDTH),
+            rng.uniform(0,GAME_HEIGHT)],[rng.uniform(-1,1),rng.uniform(-1,1)])
+        angle = rng.uniform(0,2*math.pi)
+        distance = rng.uniform(0,2*(BULLET_RADIUS+asteroid.width/2))
+        pairs.append((BulletBody([asteroid.x+distance*math.cos(angle),
+            asteroid.y+distance*math.sin(angle)],
+            Vector2(math.cos(angle),math.sin(angle))),asteroid))
+    results = {}
+    cases = [('point2',point_collided),('kernel',BulletBody.bullet_isCollided),
+        ('swept',lambda bullet, asteroid: bullet.bullet_isSwept(asteroid,1))]
+    for case in cases:
+        hits = len([pair for pair in pairs if case[1](*pair)])
+        samples = percentiles(time_calls(case[1],pairs,args.frames))
+        results[case[0]] = {'ns_per_test':samples,
+            'tests_per_second':1e9/samples['p50'],'hits':hits}
+        print('%-7s p50 %7.1fns/test %12.0f tests/s %6d/%d hits' % (case[0],
+            samples['p50'],1e9/samples['p50'],hits,len(pairs)))
+    return results
+
+
+def rotation_suite(args):
+    """
+    Returns the cost of turning the ship and splitting an asteroid, with the
+    precomputed tables in bodies.py and with the trig worked out every call.
+
+    The turns sweep the ship all the way around in SHIP_TURN_RATE steps, like
+    a player holding down left.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    ship = ShipBody([0,0],0)
+    turns = [(ship,step*SHIP_TURN_RATE) for step in range(args.calls)]
+    rng = random.Random(args.seed)
+    splits = [(AsteroidBody(LARGE_ASTEROID,[0,0],[rng.uniform(-1,1),
+        rng.uniform(-1,1)]),) for i in range(args.calls//10)]
+    results = {}
+    cases = [('turn_table',ShipBody.turn,turns),('turn_trig',trig_turn,turns),
+        ('split_table',AsteroidBody.resultant_vectors,splits),
+        ('split_trig',trig_split,splits)]
+    for case in cases:
+        results[case[0]] = percentiles(time_calls(case[1],case[2],
+            args.frames))
+        print('%-12s p50 %7.1fns/call' % (case[0],results[case[0]]['p50']))
+    # Turning all the way around many times should land exactly on the angle
+    ship.turn(0)
+    for step in range(args.calls):
+        ship.turn(ship.angle+SHIP_TURN_RATE)
+    results['final_angle'] = ship.angle
+    results['expected_angle'] = (args.calls*SHIP_TURN_RATE) % 360
+    return results
+
+
+def asset_suite(args):
+    """
+    Returns the time to preload the shared assets, the time to make a new
+    windowed Wave (a wave transition) once they are loaded, and the memory
+    held by each asset.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    from assets import shared_assets
+    assets = shared_assets()
+    start = time.perf_counter()
+    assets.preload()
+    preload = (time.perf_counter()-start)*1e6
+    definition = parse_wave(synthetic_wave(args.asteroids[0],args.seed))
+    samples = []
+    for frame in range(args.frames):
+        start = time.perf_counter()
+        Wave(definition)
+        samples.append((time.perf_counter()-start)*1e6)
+    rows = assets.report()
+    print('preload %.0fus  new wave p50 %.1fus  %d assets, %d bytes' %
+        (preload,percentiles(samples)['p50'],len(rows),
+        assets.getter_total_bytes()))
+    for row in rows:
+        print('  %-8s %-24s %9d bytes' % row)
+    return {'preload_us':preload,'new_wave_us':percentiles(samples),
+        'hits':assets.getter_hits(),'misses':assets.getter_misses(),
+        'assets':[{'kind':row[0],'name':row[1],'bytes':row[2]} for row in rows]}
+
+
+def end_screen_labels(labels):
+    """
+    Returns the two labels of the YOU LOSE screen, made the way
+    Planetoids.losingtext makes them, with a LabelCache or (if labels is None)
+    as new GLabels.
+
+    Parameter labels: the cache to take the labels from
+    Precondition: labels is a LabelCache or None
+    """
+    if labels == None:
+        from game2d import GLabel
+        return (GLabel(text="YOU LOSE",font_size=120,x=GAME_WIDTH/2,
+            y=(GAME_HEIGHT/2)+TITLE_OFFSET,font_name=MESSAGE_FONT,
+            linecolor='white'),GLabel(text="Press r to retry",
+            font_size=MESSAGE_SIZE,x=GAME_WIDTH/2,
+            y=(GAME_HEIGHT/2)+MESSAGE_OFFSET,font_name=MESSAGE_FONT,
+            linecolor='white'))
+    return (labels.label("YOU LOSE",MESSAGE_FONT,120,GAME_WIDTH/2,
+        (GAME_HEIGHT/2)+TITLE_OFFSET),labels.label("Press r to retry",
+        MESSAGE_FONT,MESSAGE_SIZE,GAME_WIDTH/2,(GAME_HEIGHT/2)+MESSAGE_OFFSET))
+
+
+def label_suite(args):
+    """
+    Returns the time and memory per frame of showing the YOU LOSE screen,
+    with new labels every frame and with the label cache.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    from labels import LabelCache
+    results = {}
+    for name, labels in (('rebuild',None),('cached',LabelCache())):
+        times = []
+        for frame in range(args.frames):
+            start = time.perf_counter()
+            end_screen_labels(labels)
+            times.append((time.perf_counter()-start)*1e6)
+        peaks = []
+        tracemalloc.start()
+        try:
+            for frame in range(min(args.frames,args.alloc_frames)):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                end_screen_labels(labels)
+                peaks.append(tracemalloc.get_traced_memory()[1]-before)
+        finally:
+            tracemalloc.stop()
+        results[name] = {'frame_us':percentiles(times),
+            'peak_bytes':percentiles(peaks)}
+        if labels != None:
+            results[name]['builds'] = labels.getter_builds()
+        print('%-8s p50 %8.1fus/frame %8.0f bytes/frame' % (name,
+            results[name]['frame_us']['p50'],results[name]['peak_bytes']['p50']))
+    return results
+
+
+def generate_suite(args):
+    """
+    Returns the time and peak memory of making a Wave from a generated wave
+    with each of args.entities asteroids, from a WaveDefinition made straight
+    by the generator and from a wave JSON dict.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    generator = WaveGenerator(args.seed)
+    results = {}
+    for count in args.entities:
+        entry = {}
+        for name in ('definition','json'):
+            make = generator.definition if name == 'definition' else \
+                generator.wave
+            start = time.perf_counter()
+            wave = Wave(make(count),headless=True)
+            seconds = time.perf_counter()-start
+            assert wave.getter_asteroid_count() == count
+            wave = None
+            tracemalloc.start()
+            try:
+                Wave(make(count),headless=True)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            entry[name] = {'ms':seconds*1000,'peak_bytes':peak}
+            print('%6d asteroids %-10s %9.1fms %12d bytes peak' % (count,name,
+                seconds*1000,peak))
+        results[count] = entry
+    return results
+
+
+def shooting_gallery(shots, seed):
+    """
+    Returns a list of wave JSON dicts, one per shot, each with a single small
+    asteroid and the ship in a corner out of its way.
+
+    Parameter shots: the number of waves
+    Precondition: shots is an int >= 0
+
+    Parameter seed: the seed for the positions and directions
+    Precondition: seed is an int
+    """
+    rng = random.Random(seed)
+    waves = []
+    for shot in range(shots):
+        waves.append({'ship':{'position':[-DEAD_ZONE/2,-DEAD_ZONE/2],
+            'angle':0},'asteroids':[{'size':SMALL_ASTEROID,
+            'position':[rng.uniform(200,GAME_WIDTH-200),
+            rng.uniform(200,GAME_HEIGHT-200)],
+            'direction':[rng.uniform(-1,1),rng.uniform(-1,1)]}]})
+    return waves
+
+
+def fire_at(wave, rng):
+    """
+    Fires one bullet at every asteroid of a wave, from 100 to 200 pixels away.
+
+    Each bullet is aimed at where its asteroid will be when the bullet gets
+    there, give or take a random offset smaller than the sum of their radii,
+    so every bullet would hit if collisions were tested continuously.
+
+    Parameter wave: the wave to fire in
+    Precondition: wave is a Wave object
+
+    Parameter rng: the random generator for the angles and offsets
+    Precondition: rng is a random.Random object
+    """
+    reach = SMALL_RADIUS+BULLET_RADIUS
+    for asteroid in wave.getter_asteroids():
+        distance = rng.uniform(100,200)
+        frames = distance/BULLET_SPEED
+        velocity = asteroid.get_velocity()
+        x = asteroid.getter_x()+velocity.x*frames
+        y = asteroid.getter_y()+velocity.y*frames
+        angle = rng.uniform(0,2*math.pi)
+        offset = rng.uniform(-0.9,0.9)*reach
+        x += offset*-math.sin(angle)
+        y += offset*math.cos(angle)
+        wave.spawn_bullet([x-distance*math.cos(angle),
+            y-distance*math.sin(angle)],
+            Vector2(math.cos(angle),math.sin(angle)))
+
+
+def tunnel_suite(args):
+    """
+    Returns the number of hits out of args.shots aimed bullets, and the time
+    the shots took to play, at each tick rate with and without swept
+    collisions.
+
+    Every shot is played in a wave of its own for a second of game time, so
+    a miss can only be a bullet that passed through its asteroid between two
+    ticks.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    waves = shooting_gallery(args.shots,args.seed)
+    results = {}
+    for rate in args.tick_rates:
+        for swept in (False,True):
+            rng = random.Random(args.seed)
+            hits = 0
+            ticks = 0
+            seconds = 0.0
+            for data in waves:
+                wave = Wave(data,vectorized=args.vectorized,headless=True,
+                    swept=swept)
+                fire_at(wave,rng)
+                start = time.perf_counter()
+                ticks += simulate(wave,b'',rate,1/rate)
+                seconds += time.perf_counter()-start
+                hits += wave.getter_destroyed()
+            name = '%d_%s' % (rate,'swept' if swept else 'overlap')
+            results[name] = {'tick_rate':rate,'swept':swept,'hits':hits,
+                'shots':args.shots,'ticks':ticks,'seconds':seconds}
+            print('%3dHz %-8s %5d/%d hits  %6d ticks in %8.2fms' % (rate,
+                'swept' if swept else 'overlap',hits,args.shots,ticks,
+                seconds*1000))
+    return results
+
+
+def report(asteroids, bullets, entry):
+    """
+    Prints a one line summary of a frame benchmark entry.
+
+    Parameter asteroids: the number of asteroids
+    Precondition: asteroids is an int
+
+    Parameter bullets: the number of bullets
+    Precondition: bullets is an int
+
+    Parameter entry: the entry from frame_suite
+    Precondition: entry is a dict
+    """
+    update = entry['phases']['update']
+    print('%5d asteroids %5d bullets  update p50 %9.1fus p99 %9.1fus  '
+        '%8.0f bytes/frame  pool hits %3.0f%%' % (asteroids,bullets,
+        update['p50'],update['p99'],entry['allocations']['peak_bytes']['p50'],
+        100*entry['bullet_pool']['hitrate']))
+
+
+class ConstructingFactory(AsteroidFactory):
+    """
+    A fragment factory that constructs every fragment from scratch, the way
+    splits made them before the factory, for split_suite to compare against.
+    """
+
+    def __init__(self):
+        """
+        Initializes a factory that keeps no spares.
+        """
+        super().__init__(AsteroidBody,0)
+
+    def acquire(self, size, position, direction):
+        """
+        This method returns a new asteroid of a size at position moving in
+        direction.
+
+        Parameter size: the asteroid size
+        Precondition: size is MEDIUM_ASTEROID or SMALL_ASTEROID
+
+        Parameter position: the x and y coordinates of the asteroid
+        Precondition: position is a list or tuple of two ints or floats
+
+        Parameter direction: the direction of the asteroid
+        Precondition: direction is a Vector2 object
+        """
+        return AsteroidBody(size,position,direction)
+
+
+def split_factory(mode):
+    """
+    Returns the fragment factory that split_suite uses for a mode.
+
+    Parameter mode: 'construct', 'clone' or 'spare'
+    Precondition: mode is one of SPLIT_MODES
+    """
+    if mode == 'construct':
+        return ConstructingFactory()
+    elif mode == 'clone':
+        return AsteroidFactory(AsteroidBody)
+    return AsteroidFactory(AsteroidBody,prefill=FRAGMENT_RESERVE)
+
+
+def time_burst(wave):
+    """
+    Returns the time (in microseconds) to break every asteroid of a wave on
+    one tick, ending the tick afterwards (which is not timed).
+
+    Parameter wave: the wave to break the asteroids of
+    Precondition: wave is a Wave object
+    """
+    destroyed = list(range(len(wave.getter_asteroids())))
+    start = time.perf_counter()
+    wave.break_asteroids(destroyed)
+    elapsed = (time.perf_counter()-start)*1e6
+    wave.end_tick()
+    return elapsed
+
+
+def split_suite(args):
+    """
+    Returns the time of the large and medium split bursts of waves with each
+    of args.splits large asteroids, for every mode of SPLIT_MODES, and how
+    many fragments the factory reused and cloned.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = {}
+    for count in args.splits:
+        data = synthetic_wave(count,args.seed)
+        for asteroid in data['asteroids']:
+            asteroid['size'] = LARGE_ASTEROID
+        entry = {}
+        for mode in SPLIT_MODES:
+            bursts = {LARGE_ASTEROID:[],MEDIUM_ASTEROID:[]}
+            reused = 0
+            cloned = 0
+            for repeat in range(args.warmup+args.repeats):
+                factory = split_factory(mode)
+                wave = Wave(data,vectorized=False,headless=True,
+                    factory=factory)
+                large = time_burst(wave)
+                medium = time_burst(wave)
+                if repeat >= args.warmup:
+                    bursts[LARGE_ASTEROID].append(large)
+                    bursts[MEDIUM_ASTEROID].append(medium)
+                    reused += factory.getter_reused()
+                    cloned += factory.getter_cloned()
+            entry[mode] = {'large':percentiles(bursts[LARGE_ASTEROID]),
+                'medium':percentiles(bursts[MEDIUM_ASTEROID]),
+                'reused':reused/args.repeats,'cloned':cloned/args.repeats}
+            print('%5d large %-9s large burst p50 %8.1fus  medium burst p50 '
+                '%8.1fus  %4.0f reused %4.0f cloned' % (count,mode,
+                entry[mode]['large']['p50'],entry[mode]['medium']['p50'],
+                reused/args.repeats,cloned/args.repeats))
+        results[count] = entry
+    return results
+
+
+def edge_wrap(wave):
+    """
+    Wraps the ship and asteroids of a wave and marks the bullets that left
+    the screen for removal, with four edge tests per body the way Wave did
+    before wrap_all.
+
+    Parameter wave: the wave to wrap
+    Precondition: wave is a Wave object that is not vectorized
+    """
+    bullets = wave.getter_bullets()
+    for i in range(len(bullets)):
+        if (bullets[i].x < -DEAD_ZONE):
+            bullets.remove_at(i)
+        elif (bullets[i].y < -DEAD_ZONE):
+            bullets.remove_at(i)
+        elif (bullets[i].x > GAME_WIDTH+DEAD_ZONE):
+            bullets.remove_at(i)
+        elif (bullets[i].y > GAME_HEIGHT+DEAD_ZONE):
+            bullets.remove_at(i)
+    bodies = list(wave.getter_asteroids())
+    if wave.getter_ship() != None:
+        bodies.append(wave.getter_ship())
+    for body in bodies:
+        if (body.right < -DEAD_ZONE):
+            body.right = GAME_WIDTH+DEAD_ZONE
+        if (body.top < -DEAD_ZONE):
+            body.bottom = GAME_HEIGHT+DEAD_ZONE
+        if (body.left > GAME_WIDTH+DEAD_ZONE):
+            body.right = -DEAD_ZONE
+        if (body.bottom > GAME_HEIGHT+DEAD_ZONE):
+            body.top = -DEAD_ZONE
+
+
+def wrap_suite(args):
+    """
+    Returns the time per frame (and per entity) of wrapping a wave with
+    each of args.asteroids asteroids and as many bullets, with edge_wrap and
+    with Wave.wrap_all.
+
+    Everything is moved between the timed wraps, and the bullets that leave
+    the screen are replaced, so every frame wraps and culls a few entities.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = {}
+    for count in args.asteroids:
+        data = synthetic_wave(count,args.seed)
+        entry = {}
+        for name in ('edges','torus'):
+            rng = random.Random(args.seed)
+            wave = Wave(data,vectorized=False,headless=True,
+                maxbullets=max(count,1))
+            wrap = edge_wrap if name == 'edges' else Wave.wrap_all
+            samples = []
+            for frame in range(args.warmup+args.frames):
+                top_up_bullets(wave,count,rng)
+                wave.move_all()
+                start = time.perf_counter()
+                wrap(wave)
+                elapsed = (time.perf_counter()-start)*1e6
+                wave.end_tick()
+                if frame >= args.warmup:
+                    samples.append(elapsed)
+            entities = 2*count+1
+            entry[name] = percentiles(samples)
+            entry[name]['ns_per_entity'] = entry[name]['p50']*1000/entities
+            print('%6d entities %-6s p50 %9.1fus p99 %9.1fus %7.1fns/entity' %
+                (entities,name,entry[name]['p50'],entry[name]['p99'],
+                entry[name]['ns_per_entity']))
+        results[count] = entry
+    return results
+
+
+def snapshot_suite(args):
+    """
+    Returns the time and size of a snapshot (see Wave.snapshot) of a wave
+    with each of args.asteroids asteroids and as many bullets, and the time
+    to restore it, to clone the wave, and to reload it from its JSON dict.
+
+    Snapshots are timed like a rollback: a tick is played after each one,
+    and the snapshot is then restored, so restore has to move every entity
+    back and put back the bullets that were culled.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = {}
+    clock = time.perf_counter
+    for count in args.asteroids:
+        data = synthetic_wave(count,args.seed)
+        rng = random.Random(args.seed)
+        wave = Wave(data,vectorized=args.vectorized,headless=True,
+            maxbullets=max(count,1))
+        script = ScriptedInput()
+        times = {'snapshot':[],'restore':[],'clone':[],'reload':[]}
+        for frame in range(args.warmup+args.frames):
+            top_up_bullets(wave,count,rng)
+            start = clock()
+            snapshot = wave.snapshot()
+            taken = clock()
+            wave.update(1/TICK_RATE,script)
+            played = clock()
+            wave.restore(snapshot)
+            if frame >= args.warmup:
+                times['snapshot'].append((taken-start)*1e6)
+                times['restore'].append((clock()-played)*1e6)
+        for repeat in range(args.repeats):
+            start = clock()
+            wave.clone()
+            middle = clock()
+            Wave(data,vectorized=args.vectorized,headless=True,
+                maxbullets=max(count,1))
+            times['clone'].append((middle-start)*1e6)
+            times['reload'].append((clock()-middle)*1e6)
+        entry = {'bytes':len(snapshot)}
+        for name in times:
+            entry[name] = percentiles(times[name])
+        entry['mb_per_s'] = len(snapshot)/entry['snapshot']['p50']
+        results[count] = entry
+        print('%6d asteroids %8d bytes  snapshot %8.1fus (%6.0f MB/s)  '
+            'restore %8.1fus  clone %8.1fus  reload %8.1fus' % (count,
+            len(snapshot),entry['snapshot']['p50'],entry['mb_per_s'],
+            entry['restore']['p50'],entry['clone']['p50'],
+            entry['reload']['p50']))
+    return results
+
+
+def env_suite(args):
+    """
+    Returns the environment steps per second of a VectorEnv with each of
+    args.envs environments and each of args.workers worker processes.
+
+    Each VectorEnv plays args.frames steps with random actions after
+    args.warmup steps that are not timed. A count of workers larger than
+    the count of environments is skipped.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    results = {}
+    for count in args.envs:
+        results[count] = {}
+        for workers in args.workers:
+            if workers > count:
+                continue
+            rng = random.Random(args.seed)
+            envs = VectorEnv(count,workers=workers)
+            envs.reset([args.seed+i for i in range(count)])
+            episodes = 0
+            for step in range(args.warmup+args.frames):
+                if step == args.warmup:
+                    start = time.perf_counter()
+                actions = [rng.randrange(ACTIONS) for i in range(count)]
+                dones = envs.step(actions)[2]
+                if step >= args.warmup:
+                    episodes += int(dones.sum())
+            elapsed = time.perf_counter()-start
+            envs.close()
+            entry = {'steps_per_s':count*args.frames/elapsed,
+                'episodes':episodes}
+            results[count][workers] = entry
+            print('%5d envs %3d workers  %9.0f steps/s  %6d episodes' % (
+                count,workers,entry['steps_per_s'],episodes))
+    return results
+
+
+# The program that startup_suite runs in a new process. It reads a wave JSON
+# dict and the settings from stdin, and prints its timings as JSON.
+_STARTUP_PROGRAM = """
+import json, sys, time
+start = time.perf_counter()
+from wave import Wave, ScriptedInput
+imported = time.perf_counter()
+settings = json.loads(sys.stdin.read())
+wave = Wave(settings['wave'],vectorized=settings['vectorized'],headless=True)
+wave.update(1/TICK_RATE,ScriptedInput())
+ticked = time.perf_counter()
+print(json.dumps({'import_ms':(imported-start)*1000,
+    'tick_ms':(ticked-imported)*1000,
+    'loaded':[name for name in ('game2d','kivy','numpy','models','assets')
+        if name in sys.modules]}))
+""".replace('TICK_RATE',repr(TICK_RATE))
+
+
+def start_process(data, vectorized):
+    """
+    Returns the timings of one run of _STARTUP_PROGRAM in a new process, as
+    a dict, with the time the whole process took added as 'process_ms'.
+
+    Parameter data: the wave to play the first tick of
+    Precondition: data is a wave JSON dict
+
+    Parameter vectorized: whether the wave uses the array engine
+    Precondition: vectorized is a boolean
+    """
+    settings = json.dumps({'wave':data,'vectorized':vectorized})
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable,'-c',_STARTUP_PROGRAM],
+        input=settings,capture_output=True,text=True,check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    process = (time.perf_counter()-start)*1000
+    result = json.loads(done.stdout)
+    result['process_ms'] = process
+    return result
+
+
+def startup_suite(args):
+    """
+    Returns the time to import wave.py in a new process, the time from there
+    to the end of the first tick of a headless wave with args.asteroids[0]
+    asteroids, and the time the whole process took, over args.startups
+    runs, with and (if numpy is installed) without the array engine.
+
+    Parameter args: the parsed command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    data = synthetic_wave(args.asteroids[0],args.seed)
+    results = {}
+    for vectorized in ([False,True] if HAS_NUMPY else [False]):
+        runs = [start_process(data,vectorized) for run in range(args.startups)]
+        name = 'vectorized' if vectorized else 'python'
+        entry = {}
+        for key in ('import_ms','tick_ms','process_ms'):
+            entry[key] = percentiles([run[key] for run in runs])
+        entry['loaded'] = runs[0]['loaded']
+        results[name] = entry
+        print('%-10s import p50 %7.1fms  first tick p50 %7.1fms  process p50 '
+            '%7.1fms  loaded: %s' % (name,entry['import_ms']['p50'],
+            entry['tick_ms']['p50'],entry['process_ms']['p50'],
+            ', '.join(entry['loaded']) or 'none of game2d, kivy, numpy'))
+    return results
+
+
+# The ways of making fragments compared by split_suite
+SPLIT_MODES = ('construct','clone','spare')
+
+# The two ways of storing an asteroid compared by entity_suite: AsteroidBody
+# (bodies.py) and Asteroid (models.py, imported only by that suite)
+ENTITY_REPRESENTATIONS = ('body','drawable')
+
+# The benchmark suites, by name
+SUITES = {'frame':frame_suite,'entity':entity_suite,
+    'rotation':rotation_suite,'collision':collision_suite,
+    'asset':asset_suite,'label':label_suite,'generate':generate_suite,
+    'tunnel':tunnel_suite,'split':split_suite,'wrap':wrap_suite,
+    'startup':startup_suite,'snapshot':snapshot_suite,'env':env_suite}
+
+
+def parse_args(argv):
+    """
+    Returns the parsed command line arguments.
+
+    Parameter argv: the command line arguments (without the program name)
+    Precondition: argv is a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Benchmark Planetoids')
+    parser.add_argument('suites',nargs='*',default=['frame'],
+        help='the suites to run: '+', '.join(sorted(SUITES)))
+    parser.add_argument('--asteroids',type=int,nargs='+',
+        default=[10,100,1000,5000])
+    parser.add_argument('--bullets',type=int,nargs='+',default=[0,100,1000])
+    parser.add_argument('--entities',type=int,nargs='+',default=[1000,10000],
+        help='the entity counts for the entity and generate suites')
+    parser.add_argument('--calls',type=int,default=10000,
+        help='the calls per pass for the rotation and collision suites')
+    parser.add_argument('--shots',type=int,default=500,
+        help='the bullets fired by the tunnel suite')
+    parser.add_argument('--tick-rates',type=int,nargs='+',
+        default=[60,30,15,10],help='the tick rates for the tunnel suite')
+    parser.add_argument('--splits',type=int,nargs='+',default=[16,64],
+        help='the large asteroid counts for the split suite')
+    parser.add_argument('--repeats',type=int,default=50,
+        help='the bursts timed per mode by the split suite (and the clones '
+        'and reloads by the snapshot suite)')
+    parser.add_argument('--startups',type=int,default=10,
+        help='the processes started by the startup suite')
+    parser.add_argument('--envs',type=int,nargs='+',default=[1,16,64],
+        help='the environment counts for the env suite')
+    parser.add_argument('--workers',type=int,nargs='+',default=[1],
+        help='the worker process counts for the env suite')
+    parser.add_argument('--frames',type=int,default=200)
+    parser.add_argument('--warmup',type=int,default=10)
+    parser.add_argument('--alloc-frames',type=int,default=50)
+    parser.add_argument('--seed',type=int,default=0)
+    parser.add_argument('--vectorized',action='store_true',
+        help='use the NumPy array engine')
+    parser.add_argument('--output',default='benchmark.json',
+        help='the JSON file to write the results to')
+    args = parser.parse_args(argv)
+    for name in args.suites:
+        if not name in SUITES:
+            parser.error('unknown suite '+repr(name))
+    if args.vectorized and not HAS_NUMPY:
+        parser.error('--vectorized needs numpy')
+    if 'env' in args.suites and not HAS_NUMPY:
+        parser.error('the env suite needs numpy')
+    return args
+
+
+def main(argv):
+    """
+    Runs the chosen benchmark suites and writes the results to a JSON file.
+
+    Parameter argv: the command line arguments (without the program name)
+    Precondition: argv is a list of strings
+    """
+    args = parse_args(argv)
+    results = {'python':platform.python_version(),
+        'platform':platform.platform(),'time':time.time(),
+        'settings':vars(args),'suites':{}}
+    for name in args.suites:
+        results['suites'][name] = SUITES[name](args)
+    with open(args.output,'w') as file:
+        json.dump(results,file,indent=1)
+    print('wrote '+args.output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
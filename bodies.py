@@ -0,0 +1,813 @@
+"""
+Physics module for Planetoids
+
+This module contains everything about the ship, asteroids and bullets that is
+not drawing: velocities, facing, collisions and asteroid break up. It does not
+use game2d, so it can be imported (and a Wave can be played) without a window.
+
+The physics lives in three mixin classes (ShipPhysics, AsteroidPhysics and
+BulletPhysics). The mixins only need the attributes x, y and width from the
+class they are mixed into. This module mixes them into the small __slots__
+classes ShipBody, AsteroidBody and BulletBody, which are what a Wave simulates
+on. models.py mixes them into the game2d drawables Ship, Asteroid and Bullet
+too, so those still work on their own, but a Wave only turns its bodies into
+drawables when it draws them (see BodyView in models.py).
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from introcs import *
+import math
+
+# PRIMARY RULE: Like models.py, this module is not allowed to access anything
+# in any module other than consts.py.
+
+
+def asteroid_radius(size):
+    """
+    Returns the radius of an asteroid of the given size.
+
+    Parameter size: the asteroid size
+    Precondition: size is 'small', 'medium' or 'large'
+    """
+    if (size == SMALL_ASTEROID):
+        return SMALL_RADIUS
+    elif (size == MEDIUM_ASTEROID):
+        return MEDIUM_RADIUS
+    assert size == LARGE_ASTEROID, repr(size)+' is not an asteroid size'
+    return LARGE_RADIUS
+
+
+def asteroid_speed(size):
+    """
+    Returns the speed of an asteroid of the given size.
+
+    Parameter size: the asteroid size
+    Precondition: size is 'small', 'medium' or 'large'
+    """
+    if (size == SMALL_ASTEROID):
+        return SMALL_SPEED
+    elif (size == MEDIUM_ASTEROID):
+        return MEDIUM_SPEED
+    assert size == LARGE_ASTEROID, repr(size)+' is not an asteroid size'
+    return LARGE_SPEED
+
+
+# The squared sum of the radii of a bullet and an asteroid, by asteroid width
+BULLET_REACH2 = dict([(2*radius,(BULLET_RADIUS+radius)*(BULLET_RADIUS+radius))
+    for radius in (SMALL_RADIUS,MEDIUM_RADIUS,LARGE_RADIUS)])
+
+# The squared sum of the radii of the ship and an asteroid, by asteroid width
+SHIP_REACH2 = dict([(2*radius,(SHIP_RADIUS+radius)*(SHIP_RADIUS+radius))
+    for radius in (SMALL_RADIUS,MEDIUM_RADIUS,LARGE_RADIUS)])
+
+# The torus that the ship and asteroids wrap around, by body width: the
+# lowest x and y coordinate of the center of the body, then the width and
+# height of the torus. A body wraps once it has left the screen and the dead
+# zone entirely.
+TORUS = dict([(2*radius,(-DEAD_ZONE-radius,GAME_WIDTH+2*(DEAD_ZONE+radius),
+    GAME_HEIGHT+2*(DEAD_ZONE+radius))) for radius in (SHIP_RADIUS,SMALL_RADIUS,
+    MEDIUM_RADIUS,LARGE_RADIUS)])
+
+
+def wrap_bodies(bodies):
+    """
+    Moves every body that left the torus of its width (see TORUS) back onto
+    it, in one pass.
+
+    Each coordinate is wrapped with modular arithmetic instead of testing
+    the four edges: it moves by the number of whole torus widths (or
+    heights) that it is off the torus, which is 0 for a body on the torus.
+    So a body keeps how far past the edge it went, and a body on the torus
+    is not moved at all.
+
+    Parameter bodies: the bodies to wrap
+    Precondition: bodies is an iterable of ShipBody and AsteroidBody objects
+    """
+    floor = math.floor
+    for body in bodies:
+        low, width, height = TORUS[body.width]
+        body.x -= width*floor((body.x-low)/width)
+        body.y -= height*floor((body.y-low)/height)
+
+
+def circles_overlap(x1, y1, x2, y2, reach2):
+    """
+    Returns True if two circles overlap.
+
+    This is the collision kernel behind isCollided and bullet_isCollided. It
+    compares the squared distance between the centers to the squared sum of
+    the radii (see BULLET_REACH2 and SHIP_REACH2), so it takes no square root
+    and makes no objects.
+
+    Parameter x1: the x coordinate of the center of the first circle
+    Precondition: x1 is an int or float
+
+    Parameter y1: the y coordinate of the center of the first circle
+    Precondition: y1 is an int or float
+
+    Parameter x2: the x coordinate of the center of the second circle
+    Precondition: x2 is an int or float
+
+    Parameter y2: the y coordinate of the center of the second circle
+    Precondition: y2 is an int or float
+
+    Parameter reach2: the squared sum of the radii
+    Precondition: reach2 is an int or float >= 0
+    """
+    dx = x1-x2
+    dy = y1-y2
+    return dx*dx+dy*dy < reach2
+
+
+def swept_overlap(dx, dy, mx, my, reach2):
+    """
+    Returns True if a circle that moved by (mx, my) this step came within
+    reach of another circle at any point of the step.
+
+    The test is done in the frame of the other circle, so (dx, dy) is where
+    the moving circle ended up relative to it, and (mx, my) is the difference
+    of their movements. The moving circle swept the segment from (dx-mx,
+    dy-my) to (dx, dy), and the test finds the point of that segment closest
+    to the other circle. With no movement this is the usual overlap test.
+
+    Parameter dx: the x offset from the other circle at the end of the step
+    Precondition: dx is an int or float
+
+    Parameter dy: the y offset from the other circle at the end of the step
+    Precondition: dy is an int or float
+
+    Parameter mx: the relative x movement during the step
+    Precondition: mx is an int or float
+
+    Parameter my: the relative y movement during the step
+    Precondition: my is an int or float
+
+    Parameter reach2: the squared sum of the radii
+    Precondition: reach2 is an int or float >= 0
+    """
+    sx = dx-mx
+    sy = dy-my
+    length = mx*mx+my*my
+    t = 0.0
+    if length > 0:
+        t = -(sx*mx+sy*my)/length
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+    cx = sx+t*mx
+    cy = sy+t*my
+    return cx*cx+cy*cy < reach2
+
+
+# The (cos, sin) of every multiple of SHIP_TURN_RATE degrees from 0 up to 360
+_FACING_TABLE = [(math.cos(step*SHIP_TURN_RATE*(math.pi/180)),
+    math.sin(step*SHIP_TURN_RATE*(math.pi/180)))
+    for step in range(math.ceil(360/SHIP_TURN_RATE))]
+
+# The (cos, sin) of the angles between the pieces of a broken asteroid
+_SPLIT_ROTATIONS = [(math.cos(math.radians(angle)),
+    math.sin(math.radians(angle))) for angle in (120,240,360)]
+
+
+def facing_components(angle):
+    """
+    Returns the tuple (cos, sin) of an angle in degrees.
+
+    A ship turning at BASE_RATE always faces a multiple of SHIP_TURN_RATE
+    degrees, so those angles are looked up in a table made when this module
+    is loaded. Any other angle is computed. An angle of 360 (which angle%360
+    gives for a tiny negative angle) faces the same way as 0.
+
+    Parameter angle: the angle in degrees
+    Precondition: angle is an int or float between 0 and 360 (inclusive)
+    """
+    step = angle/SHIP_TURN_RATE
+    if step == int(step):
+        return _FACING_TABLE[int(step) % len(_FACING_TABLE)]
+    theta = angle*(math.pi/180)
+    return (math.cos(theta),math.sin(theta))
+
+
+class BulletPhysics(object):
+    """
+    A mixin with the velocity and collision methods of a bullet.
+
+    The class this is mixed into must have the attributes x and y.
+    """
+    # The attributes are stored by the class this is mixed into
+    __slots__ = ()
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _velocity: the direction and speed the bullet is traveling
+    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_for_velocity(self):
+        """
+        This method is a getter for the velocity of the bullet.
+
+        Parameter self: current instance of the class
+
+        self._velocity: The velocity vector of the bullet velocity.
+        """
+        return self._velocity
+
+    # HELPER FOR THE INITIALIZER
+    def init_motion(self, direction):
+        """
+        Sets the velocity of a new bullet from the direction it is fired in.
+
+        Parameter direction: the direction of the bullet based on the ships
+        facing angle
+        Precondition: direction is a Vector2 object
+        """
+        assert isinstance(direction,Vector2)
+        velocity_x = direction.x * BULLET_SPEED
+        velocity_y = direction.y * BULLET_SPEED
+        self._velocity = Vector2(velocity_x, velocity_y)
+
+    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
+    def reset(self, position, direction):
+        """
+        Moves a used bullet to a new position and direction, so it can be
+        fired again without making a new object.
+
+        The velocity vector is changed in place.
+
+        Parameter position: the x and y coordinates of the location of the
+        bullet.
+        Precondition: position is a list of ints or floats with a length of 2
+
+        Parameter direction: the direction of the bullet based on the ships
+        facing angle
+        Precondition: direction is a Vector2 object
+        """
+        assert isinstance(direction,Vector2)
+        self.x = position[0]
+        self.y = position[1]
+        self._velocity.x = direction.x * BULLET_SPEED
+        self._velocity.y = direction.y * BULLET_SPEED
+
+    def dist_between_center(self, asteroid):
+        """
+        This method returns the distance between the center of the bullet and
+        asteroid.
+
+        Parameter self: current instance of the class
+        Parameter asteroid: any Asteroid object
+        Precondition: asteroid is an Asteroid object
+        """
+        assert isinstance(asteroid,AsteroidPhysics)
+        return Point2.distance(Point2(self.x,self.y),Point2(asteroid.getter_x(),
+             asteroid.getter_y()))
+
+    def bullet_isCollided(self, asteroid):
+        """
+        This method returns whether or not a bullet has collided with an
+        asteroid using the circles_overlap() collision kernel.
+
+        Parameter self: current instance of the class
+        Parameter asteroid: an Asteroid object that is either overlapping or not
+        with the bullet
+        Precondition: asteroid is an Asteroid object
+        """
+        assert isinstance(asteroid, AsteroidPhysics)
+        return circles_overlap(self.x,self.y,asteroid.x,asteroid.y,
+            BULLET_REACH2[asteroid.width])
+
+    def bullet_isSwept(self, asteroid, scale):
+        """
+        This method returns whether or not a bullet touched an asteroid at any
+        point of the last step, not just at the end of it.
+
+        A bullet moves BULLET_SPEED*scale pixels a step, which is more than
+        the width of a small asteroid when steps are long, so bullet_isCollided
+        can miss a bullet that passed right through one. Both the bullet and
+        the asteroid are assumed to have moved by their velocity times scale.
+
+        Parameter self: current instance of the class
+
+        Parameter asteroid: the asteroid to test
+        Precondition: asteroid is an Asteroid object
+
+        Parameter scale: the length of the step in BASE_RATE frames
+        Precondition: scale is an int or float >= 0
+        """
+        assert isinstance(asteroid, AsteroidPhysics)
+        velocity = asteroid.get_velocity()
+        return swept_overlap(self.x-asteroid.getter_x(),
+            self.y-asteroid.getter_y(),(self._velocity.x-velocity.x)*scale,
+            (self._velocity.y-velocity.y)*scale,BULLET_REACH2[asteroid.width])
+
+
+class ShipPhysics(object):
+    """
+    A mixin with the velocity, facing and collision methods of the ship.
+
+    The class this is mixed into must have the attributes x, y and angle.
+    """
+    # The attributes are stored by the class this is mixed into
+    __slots__ = ()
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _velocity: the direction and speed the ship is traveling
+    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
+    #
+    # Attribute _facing: the direction the ship is facing
+    # Invariant: _facing is a Vector2 object and objects of this class represent a 2D vector
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_for_velocity(self):
+        """
+        This method is a getter for the velocity of the ship.
+
+        Parameter self: current instance of the class
+
+        self._velocity: The velocity vector of the ship.
+        """
+        return self._velocity
+
+    def getter_for_impulse(self):
+        """
+        This method is the getter for the ship's impulse.
+
+        Parameter self: current instance of the class
+
+        self._facing: The vector for the direction the ship is facing.
+        SHIP_IMPULSE: The ship's change in momentum constant
+        found in consts.py.
+        """
+        return self._facing.__mul__(SHIP_IMPULSE)
+
+    def getter_for_facing(self):
+        """
+        This method is the getter for the ship's direction value.
+
+        Parameter self: current instance of the class
+
+        self._facing: The vector for the direction the ship is facing.
+        """
+        return self._facing
+
+    def get_theta(self, angle):
+        """
+        This method returns the unit vector for an angle in degrees.
+
+        Parameter self: current instance of the class
+
+        Parameter: angle
+        Precondition: angle can be any number
+        """
+        assert isinstance(angle,int) or isinstance(angle,float)
+        components=facing_components(angle % 360)
+        return Vector2(components[0],components[1])
+
+    # HELPER FOR THE INITIALIZER
+    def init_motion(self, angle):
+        """
+        Sets the facing angle, facing vector and (zero) velocity of a new ship.
+
+        Parameter angle: the angle of the ship in degrees
+        Precondition: angle is any number
+        """
+        assert isinstance(angle,float) or isinstance(angle,int)
+        self.angle=angle % 360
+        self._velocity=Vector2(0,0)
+        self._facing=self.get_theta(self.angle)
+
+    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
+    def turn(self,angle):
+        """
+        This method updates the angle and facing vector.
+
+        The angle is kept between 0 and 360, so turning for a long time never
+        makes it large enough to lose precision. The facing vector is updated
+        in place from the table in facing_components.
+
+        Parameter self: current instance of the class
+
+        Parameterangle: how much the ship is rotated
+        Precondition: angle can be any number
+
+        self._facing: The vector for the direction that the ship is facing.
+        """
+        assert isinstance(angle, int) or isinstance(angle, float)
+        self.angle=angle % 360
+        components=facing_components(self.angle)
+        self._facing.x=components[0]
+        self._facing.y=components[1]
+
+    def dist_between_center(self, asteroid):
+        """
+        This method returns the distance between the centers of the asteroid
+        and ship object.
+
+        Parameter self: current instance of the class
+
+        Parameter: an asteroid
+        Precondition: asteroid is a single GImage Asteroid object
+        """
+        assert isinstance(asteroid,AsteroidPhysics)
+        return Point2.distance(Point2(self.x,self.y),Point2(asteroid.getter_x(),
+             asteroid.getter_y()))
+
+    def isCollided(self, asteroid):
+        """
+        This method returns True if the distance between the two centers of
+        the ship and asteroid was less than their combined radii and False
+        if the distance was greater.
+
+        Parameter self: current instance of the class
+
+        Parameter: an asteroid
+        Precondition: asteroid is a single GImage Asteroid object
+
+        SHIP_REACH2: The squared sum of the ship radius and the radius of
+        each size of asteroid, looked up by the width of the asteroid.
+        """
+        assert isinstance(asteroid, AsteroidPhysics)
+        return circles_overlap(self.x,self.y,asteroid.x,asteroid.y,
+            SHIP_REACH2[asteroid.width])
+
+    def isSwept(self, asteroid, scale):
+        """
+        This method returns True if the ship touched an asteroid at any point
+        of the last step, like bullet_isSwept does for bullets.
+
+        Parameter self: current instance of the class
+
+        Parameter asteroid: the asteroid to test
+        Precondition: asteroid is an Asteroid object
+
+        Parameter scale: the length of the step in BASE_RATE frames
+        Precondition: scale is an int or float >= 0
+        """
+        assert isinstance(asteroid, AsteroidPhysics)
+        velocity = asteroid.get_velocity()
+        return swept_overlap(self.x-asteroid.getter_x(),
+            self.y-asteroid.getter_y(),(self._velocity.x-velocity.x)*scale,
+            (self._velocity.y-velocity.y)*scale,SHIP_REACH2[asteroid.width])
+
+
+class AsteroidPhysics(object):
+    """
+    A mixin with the size, velocity and break up methods of an asteroid.
+
+    The class this is mixed into must have the attributes x, y and width.
+    """
+    # The attributes are stored by the class this is mixed into
+    __slots__ = ()
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _velocity: the direction and speed the asteroid is travelling
+    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def get_velocity(self):
+        """
+        This method is a getter for the velocity of the asteroid.
+
+        Parameter self: current instance of the class
+
+        self._velocity: The velocity vector of the asteroid.
+        """
+        return self._velocity
+
+    def get_size(self):
+        """
+        This method is a getter for the size of the asteroid and returns
+        the categorization of the asteroid's size.
+
+        Parameter self: current instance of the class
+
+        self.width: The width of the entire asteroid.
+
+        SMALL_RADIUS: The radius of the small asteroid found in consts.py.
+        MEDIUM_RADIUS: The radium of the medium asteroid found in consts.py
+        """
+        if (self.width == 2*SMALL_RADIUS):
+            return 'small'
+        elif (self.width == 2*MEDIUM_RADIUS):
+            return 'medium'
+        else:
+            return 'large'
+
+    def getter_x(self):
+        """
+        This method is a getter for the x position of the asteroid.
+
+        Parameter self: current instance of the class
+
+        self.x: The x position of the asteroid.
+        """
+        return self.x
+
+    def getter_y(self):
+        """
+        This method is a getter for the y position of the asteroid.
+
+        Parameter self: current instance of the class
+
+        self.y: The y position of the asteroid.
+        """
+        return self.y
+
+    def getter_width(self):
+        """
+        This method is a getter for width of the asteroid.
+
+        Parameter self: current instance of the class
+
+        self.width: The width of the entire asteroid.
+        """
+        return self.width
+
+    # HELPER FOR THE INITIALIZER
+    def init_motion(self, size, direction):
+        """
+        Sets the velocity of a new asteroid from its size and direction.
+
+        Parameter size: either "small", "medium", or "large"
+        Precondition: size is a string
+
+        Parameter direction: direction angle of an asteroid
+        Precondition: direction is either a list or a Vector2 object
+        """
+        assert isinstance(direction, list) or isinstance(direction, Vector2)
+        zero_vector = Vector2(0,0)
+        if isinstance(direction, list):
+            direction_vect = Vector2(direction[0],direction[1])
+        elif isinstance(direction, Vector2):
+            direction_vect = Vector2(direction.x,direction.y)
+        if (direction_vect.__eq__(zero_vector)):
+            self._velocity = zero_vector
+        else:
+            self._velocity=direction_vect.normalize().__mul__(
+                asteroid_speed(size))
+
+    def reset(self, position, direction):
+        """
+        Moves the asteroid to position and sets its velocity from direction,
+        in place, with the same arithmetic as init_motion. This is how an
+        asteroid is reused for a fragment (see AsteroidFactory in pool.py).
+
+        Parameter position: the x and y coordinates of the asteroid
+        Precondition: position is a list or tuple of two ints or floats
+
+        Parameter direction: the direction of the asteroid
+        Precondition: direction is a Vector2 object that is either exactly
+        zero or not close to zero (like the vectors from resultant_vectors)
+        """
+        assert isinstance(direction, Vector2)
+        self.x = position[0]
+        self.y = position[1]
+        x = direction.x
+        y = direction.y
+        if x == 0.0 and y == 0.0:
+            self._velocity.x = 0.0
+            self._velocity.y = 0.0
+        else:
+            length = math.sqrt(x*x+y*y)
+            speed = asteroid_speed(self.get_size())
+            self._velocity.x = x/length*speed
+            self._velocity.y = y/length*speed
+
+    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
+    def resultant_vectors(self):
+        """
+        This method creates three asteroids when medium and large asteroids
+        break up.
+
+        Parameter self: current instance of the class
+
+        _SPLIT_ROTATIONS: The cos and sin of 120, 240 and 360 degrees, the
+        angles of the three asteroids, worked out once when bodies.py loads.
+
+        vx: The x position of the velocity vector.
+        vy: The y position of the velocity vector.
+
+        listi: A list of the three resultant vectors that is returned.
+        """
+        vx=self._velocity.x
+        vy=self._velocity.y
+        listi=[]
+        for rotation in _SPLIT_ROTATIONS:
+            if vx==0.0 and vy==0.0:
+                listi.append(Vector2(0,0))
+            else:
+                listi.append(Vector2(vx*rotation[0]-vy*rotation[1],
+                    vx*rotation[1]+vy*rotation[0]).normalize())
+        return listi
+
+
+class Body(object):
+    """
+    A class representing the position and size of an object without drawing it.
+
+    This class has the attributes x, y, width and height and the edge
+    properties left, right, top and bottom, with the same meaning as in a
+    game2d GObject (y grows upwards). It is the base class of the bodies below.
+
+    Bodies use __slots__, so they have no instance dictionary. They are much
+    smaller than a game2d drawable, and setting x or y is a plain attribute
+    store instead of a Kivy property update.
+    """
+    __slots__ = ('x','y','width','height')
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute x: the x coordinate of the center
+    # Invariant: x is an int or float
+    #
+    # Attribute y: the y coordinate of the center
+    # Invariant: y is an int or float
+    #
+    # Attribute width: the width of the object
+    # Invariant: width is an int or float >= 0
+    #
+    # Attribute height: the height of the object
+    # Invariant: height is an int or float >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    @property
+    def left(self):
+        """
+        The x coordinate of the left edge.
+        """
+        return self.x-self.width/2
+
+    @left.setter
+    def left(self, value):
+        self.x = value+self.width/2
+
+    @property
+    def right(self):
+        """
+        The x coordinate of the right edge.
+        """
+        return self.x+self.width/2
+
+    @right.setter
+    def right(self, value):
+        self.x = value-self.width/2
+
+    @property
+    def top(self):
+        """
+        The y coordinate of the top edge.
+        """
+        return self.y+self.height/2
+
+    @top.setter
+    def top(self, value):
+        self.y = value-self.height/2
+
+    @property
+    def bottom(self):
+        """
+        The y coordinate of the bottom edge.
+        """
+        return self.y-self.height/2
+
+    @bottom.setter
+    def bottom(self, value):
+        self.y = value+self.height/2
+
+    # INITIALIZER TO SET THE POSITION AND SIZE
+    def __init__(self, x, y, width, height):
+        """
+        Initializes the position and size of a body.
+
+        Parameter x: the x coordinate of the center
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center
+        Precondition: y is an int or float
+
+        Parameter width: the width of the body
+        Precondition: width is an int or float >= 0
+
+        Parameter height: the height of the body
+        Precondition: height is an int or float >= 0
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def draw(self, view):
+        """
+        Does nothing, as a body has nothing to draw.
+
+        Parameter view: the view that would be drawn to
+        Precondition: None
+        """
+        pass
+
+
+class BulletBody(BulletPhysics, Body):
+    """
+    A class representing the physics state of a bullet.
+
+    It has the same initializer and methods as Bullet in models.py.
+    """
+    __slots__ = ('_velocity',)
+
+    def __init__(self, position, direction):
+        """
+        Initializes the position, size, and velocity of a bullet.
+
+        Parameter position: the x and y coordinates of the location of the
+        bullet.
+        Precondition: position is a list of ints or floats with a length of 2
+
+        Parameter direction: the direction of the bullet based on the ships
+        facing angle
+        Precondition: direction is a Vector2 object
+        """
+        assert isinstance(position,list) and len(position) == 2
+        assert isinstance(position[0],int) or isinstance(position[0],float)
+        assert isinstance(position[1],int) or isinstance(position[1],float)
+        super().__init__(position[0],position[1],2*BULLET_RADIUS,
+            2*BULLET_RADIUS)
+        self.init_motion(direction)
+
+
+class ShipBody(ShipPhysics, Body):
+    """
+    A class representing the physics state of the ship.
+
+    It has the same initializer and methods as Ship in models.py.
+    """
+    __slots__ = ('angle','_velocity','_facing')
+
+    def __init__(self, position, angle):
+        """
+        Initializes the position, size, facing angle, and velocity of a ship.
+
+        Parameter position: the x and y coordinates of the location of the
+        ship.
+        Precondition: position is a list of ints or floats with a length of 2
+
+        Parameter angle: the angle of the ship in degrees
+        Precondition: angle is any number
+        """
+        assert isinstance(position,list) and len(position) == 2
+        assert isinstance(position[0],int) or isinstance(position[0],float)
+        assert isinstance(position[1],int) or isinstance(position[1],float)
+        super().__init__(position[0],position[1],2*SHIP_RADIUS,2*SHIP_RADIUS)
+        self.init_motion(angle)
+
+
+class AsteroidBody(AsteroidPhysics, Body):
+    """
+    A class representing the physics state of an asteroid.
+
+    It has the same initializer and methods as Asteroid in models.py.
+    """
+    __slots__ = ('_velocity',)
+
+    def __init__(self, size, position, direction):
+        """
+        Initializes the position, size, direction, and velocity of an asteroid.
+
+        Parameter size: either "small", "medium", or "large"
+        Precondition: size is a string
+
+        Parameter position: the x and y coordinates of the location of the
+        asteroid.
+        Precondition: position is a list or tuple of ints or floats with a
+        length of 2
+
+        Parameter direction: direction angle of an asteroid
+        Precondition: direction is either a list or a Vector2 object
+        """
+        assert isinstance(position[0],int) or isinstance(position[0],float)
+        assert isinstance(position[1],int) or isinstance(position[1],float)
+        assert isinstance(size,str) and len(position) == 2
+        radius = asteroid_radius(size)
+        super().__init__(position[0],position[1],2*radius,2*radius)
+        self.init_motion(size,direction)
+
+    def clone(self, position, direction):
+        """
+        Returns a new asteroid of the same size at position moving in
+        direction.
+
+        The clone copies the size of this asteroid and skips the checks and
+        the size lookup of the initializer, so a prototype of each size can
+        make fragments quickly.
+
+        Parameter position: the x and y coordinates of the new asteroid
+        Precondition: position is a list or tuple of two ints or floats
+
+        Parameter direction: the direction of the new asteroid
+        Precondition: direction is a Vector2 object as for reset
+        """
+        body = AsteroidBody.__new__(AsteroidBody)
+        body.width = self.width
+        body.height = self.height
+        body._velocity = Vector2(0,0)
+        body.reset(position,direction)
+        return body
@@ -0,0 +1,510 @@
+"""
+Campaign module for Planetoids
+
+This module contains the campaign: which waves are played, in what order,
+and with what settings. A campaign is described by a manifest, a JSON dict
+like
+
+    {"start": "first",
+     "waves": [
+        {"id": "first", "file": "wave1.json"},
+        {"id": "second", "file": "wave2.json", "maxbullets": 8,
+         "next": [{"to": "bonus", "max_retries": 0, "max_seconds": 60},
+                  {"to": "third"}]},
+        {"id": "bonus", "file": "wave2.json", "swept": false,
+         "ship": {"position": [400, 100], "angle": 90}, "next": "third"},
+        {"id": "third", "file": "wave3.json", "next": null}]}
+
+Every wave has an id (its file name if it has none) and a wave file. It may
+override settings of the wave: the ship's starting position and angle, the
+most bullets on screen ('maxbullets') and whether collisions are swept
+('swept'). A wave in the list may also be just the name of its file, so a
+list of file names is a campaign played in order.
+
+Winning a wave leads to the wave named by its 'next', which is an id, null
+for the end of the campaign, or a list of branches. The first branch whose
+conditions all hold is taken: 'max_retries' is the most times the wave may
+have been lost before it was won, and 'max_seconds' the longest the winning
+try may have taken. A branch with no conditions is always taken. A wave with
+no 'next' leads to the wave after it in the list (the last one ends the
+campaign). The campaign starts at 'start', or at the first wave.
+
+WavePrefetcher builds the Waves that may be played next on a background
+thread, so that starting one (the next wave, or a retry) only has to take a
+Wave that is already made.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+import concurrent.futures
+
+# The conditions a branch of 'next' may have
+BRANCH_CONDITIONS = ('max_retries','max_seconds')
+
+# The settings a wave of a campaign may override
+WAVE_OVERRIDES = ('ship','maxbullets','swept')
+
+
+def parse_campaign(data):
+    """
+    Returns the Campaign of a campaign manifest.
+
+    Parameter data: the campaign, as loaded from a manifest
+    Precondition: data is a dict as described by this module, with a
+    non-empty 'waves' list, distinct ids, and every id in 'start' and
+    'next' naming a wave of the list
+    """
+    assert isinstance(data,dict), repr(data)+' is not a campaign'
+    assert isinstance(data.get('waves'),list) and data['waves'] != [], \
+        'a campaign needs a list of waves'
+    waves = []
+    for entry in data['waves']:
+        if isinstance(entry,str):
+            entry = {'file':entry}
+        assert isinstance(entry,dict), repr(entry)+' is not a campaign wave'
+        waves.append(entry)
+    ids = []
+    for entry in waves:
+        assert isinstance(entry.get('file'),str), repr(entry)+' has no file'
+        ids.append(entry.get('id',entry['file']))
+        assert isinstance(ids[-1],str), repr(ids[-1])+' is not an id'
+    assert len(set(ids)) == len(ids), 'the wave ids are not distinct'
+    result = []
+    for i in range(len(waves)):
+        entry = waves[i]
+        if 'next' in entry:
+            branches = _branches(entry['next'],ids)
+        elif i+1 < len(ids):
+            branches = [(ids[i+1],{})]
+        else:
+            branches = []
+        overrides = {}
+        for key in entry:
+            assert key in ('id','file','next')+WAVE_OVERRIDES, repr(key)+\
+                ' is not a setting of a campaign wave'
+            if key in WAVE_OVERRIDES:
+                overrides[key] = _override(key,entry[key])
+        result.append(CampaignWave(ids[i],entry['file'],branches,overrides))
+    start = data.get('start',ids[0])
+    assert start in ids, repr(start)+' is not a wave of the campaign'
+    return Campaign(start,result)
+
+
+def default_campaign(files=CAMPAIGN_WAVES):
+    """
+    Returns the Campaign that plays wave files one after another.
+
+    Parameter files: the wave files
+    Precondition: files is a non-empty list or tuple of distinct strings
+    """
+    return parse_campaign({'waves':list(files)})
+
+
+def _branches(value, ids):
+    """
+    Returns the 'next' of a campaign wave as a list of (id, conditions)
+    pairs.
+
+    Parameter value: the 'next' of the wave
+    Precondition: value is None, an id, or a list of branch dicts
+
+    Parameter ids: the ids of the waves of the campaign
+    Precondition: ids is a list of strings
+    """
+    if value == None:
+        return []
+    if isinstance(value,str):
+        value = [{'to':value}]
+    assert isinstance(value,list), repr(value)+' is not a next wave'
+    branches = []
+    for branch in value:
+        assert isinstance(branch,dict) and branch.get('to') in ids, \
+            repr(branch)+' does not go to a wave of the campaign'
+        conditions = {}
+        for key in branch:
+            if key != 'to':
+                assert key in BRANCH_CONDITIONS, repr(key)+\
+                    ' is not a condition of a branch'
+                limit = branch[key]
+                assert (isinstance(limit,int) or isinstance(limit,float)) and \
+                    not isinstance(limit,bool) and limit >= 0, repr(limit)+\
+                    ' is not a limit for '+key
+                conditions[key] = limit
+        branches.append((branch['to'],conditions))
+    return branches
+
+
+def _override(key, value):
+    """
+    Returns a checked setting that a campaign wave overrides.
+
+    Parameter key: the name of the setting
+    Precondition: key is in WAVE_OVERRIDES
+
+    Parameter value: the value from the manifest
+    Precondition: None
+    """
+    if key == 'maxbullets':
+        assert isinstance(value,int) and not isinstance(value,bool) and \
+            value > 0, repr(value)+' is not a number of bullets'
+    elif key == 'swept':
+        assert isinstance(value,bool), repr(value)+' is not a boolean'
+    else:
+        ship = parse_wave({'ship':value,'asteroids':[]})
+        value = (ship.getter_ship_position(),ship.getter_ship_angle())
+    return value
+
+
+class CampaignWave(object):
+    """
+    A class representing one wave of a campaign: its wave file, the
+    settings it overrides and the waves it leads to.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _id: the id of the wave in the campaign
+    # Invariant: _id is a string
+    #
+    # Attribute _file: the name of the wave file
+    # Invariant: _file is a string
+    #
+    # Attribute _branches: the waves that winning leads to, in order
+    # Invariant: _branches is a list of (id, conditions) pairs, where
+    #            conditions is a dict mapping names in BRANCH_CONDITIONS to
+    #            ints or floats >= 0
+    #
+    # Attribute _overrides: the settings of the wave that are overridden
+    # Invariant: _overrides is a dict mapping names in WAVE_OVERRIDES to
+    #            values ('ship' maps to a (position, angle) tuple)
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_id(self):
+        """
+        This method is a getter for the id of the wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._id
+
+    def getter_file(self):
+        """
+        This method is a getter for the name of the wave file.
+
+        Parameter self: current instance of the class
+        """
+        return self._file
+
+    def getter_targets(self):
+        """
+        This method returns the ids of every wave that winning may lead to.
+
+        Parameter self: current instance of the class
+        """
+        return [branch[0] for branch in self._branches]
+
+    def getter_maxbullets(self):
+        """
+        This method returns the most bullets on screen in this wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._overrides.get('maxbullets',MAX_BULLETS)
+
+    def getter_swept(self):
+        """
+        This method returns whether collisions are swept in this wave (None
+        for the default, SWEPT_COLLISIONS).
+
+        Parameter self: current instance of the class
+        """
+        return self._overrides.get('swept')
+
+    # INITIALIZER TO STORE A CAMPAIGN WAVE
+    def __init__(self, id, file, branches, overrides):
+        """
+        Initializes a campaign wave. Use parse_campaign to make one from a
+        manifest.
+
+        Parameter id: the id of the wave
+        Precondition: id is a string
+
+        Parameter file: the name of the wave file
+        Precondition: file is a string
+
+        Parameter branches: the waves that winning leads to
+        Precondition: branches is a list of (id, conditions) pairs
+
+        Parameter overrides: the settings that are overridden
+        Precondition: overrides is a dict mapping names in WAVE_OVERRIDES to
+        checked values
+        """
+        self._id = id
+        self._file = file
+        self._branches = branches
+        self._overrides = overrides
+
+    # ADDITIONAL METHODS
+    def next_wave(self, retries, seconds):
+        """
+        This method returns the id of the wave that winning this one leads
+        to, or None if it ends the campaign.
+
+        Parameter retries: how many times this wave was lost before it was won
+        Precondition: retries is an int >= 0
+
+        Parameter seconds: how long the winning try took
+        Precondition: seconds is an int or float >= 0
+        """
+        for branch in self._branches:
+            conditions = branch[1]
+            if (retries <= conditions.get('max_retries',retries) and
+                    seconds <= conditions.get('max_seconds',seconds)):
+                return branch[0]
+        return None
+
+    def definition(self, cache):
+        """
+        This method returns the WaveDefinition that this wave plays: the one
+        of its wave file, with the ship moved if the ship is overridden.
+
+        Parameter cache: the cache to get the wave file from
+        Precondition: cache is a WaveCache
+        """
+        definition = cache.get(self._file)
+        if 'ship' in self._overrides:
+            ship = self._overrides['ship']
+            definition = WaveDefinition(ship[0],ship[1],
+                definition.getter_asteroids())
+        return definition
+
+    def make_wave(self, cache, headless=False):
+        """
+        This method returns a new Wave of this wave, with its overrides.
+
+        Parameter cache: the cache to get the wave file from
+        Precondition: cache is a WaveCache
+
+        Parameter headless: whether the Wave is headless
+        Precondition: headless is a boolean
+        """
+        return Wave(self.definition(cache),headless=headless,
+            maxbullets=self.getter_maxbullets(),swept=self.getter_swept())
+
+
+class Campaign(object):
+    """
+    A class representing a parsed campaign manifest.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _start: the id of the first wave
+    # Invariant: _start is a key of _waves
+    #
+    # Attribute _waves: the waves of the campaign by id
+    # Invariant: _waves is a dict mapping ids to CampaignWaves
+    #
+    # Attribute _order: the ids in the order of the manifest
+    # Invariant: _order is a list of the keys of _waves
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_start(self):
+        """
+        This method is a getter for the id of the first wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._start
+
+    def getter_ids(self):
+        """
+        This method returns the ids of the waves in the order of the manifest.
+
+        Parameter self: current instance of the class
+        """
+        return list(self._order)
+
+    def getter_wave(self, id):
+        """
+        This method returns the CampaignWave with an id.
+
+        Parameter id: the id of the wave
+        Precondition: id is the id of a wave of the campaign
+        """
+        assert id in self._waves, repr(id)+' is not a wave of the campaign'
+        return self._waves[id]
+
+    # INITIALIZER TO STORE A CAMPAIGN
+    def __init__(self, start, waves):
+        """
+        Initializes a campaign. Use parse_campaign to make one from a
+        manifest.
+
+        Parameter start: the id of the first wave
+        Precondition: start is the id of a wave in waves
+
+        Parameter waves: the waves of the campaign
+        Precondition: waves is a non-empty list of CampaignWaves with
+        distinct ids
+        """
+        self._start = start
+        self._waves = {}
+        self._order = []
+        for wave in waves:
+            self._waves[wave.getter_id()] = wave
+            self._order.append(wave.getter_id())
+
+    # ADDITIONAL METHODS
+    def find(self, file):
+        """
+        This method returns the id of the first wave that plays a wave file,
+        or None if no wave does.
+
+        Parameter file: the name of the wave file
+        Precondition: file is a string
+        """
+        for id in self._order:
+            if self._waves[id].getter_file() == file:
+                return id
+        return None
+
+    def upcoming(self, id, depth=PREFETCH_DEPTH):
+        """
+        This method returns the ids of the waves that may be played within
+        depth wins of a wave, nearest first. The list does not repeat ids,
+        and only has id itself if a branch leads back to it.
+
+        Parameter id: the id of the wave
+        Precondition: id is the id of a wave of the campaign
+
+        Parameter depth: how many wins ahead to look
+        Precondition: depth is an int >= 0
+        """
+        assert isinstance(depth,int) and depth >= 0
+        found = []
+        layer = [id]
+        for step in range(depth):
+            following = []
+            for current in layer:
+                for target in self.getter_wave(current).getter_targets():
+                    if not target in found:
+                        found.append(target)
+                        following.append(target)
+            layer = following
+        return found
+
+
+class WavePrefetcher(object):
+    """
+    A class that builds Waves on a background thread before they are needed.
+
+    A Wave changes as it is played, so each prefetched Wave is handed out
+    once. The waves are built one at a time, in the order they were asked
+    for.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _build: the function that makes the Wave of an id
+    # Invariant: _build is a callable taking an id and returning a Wave
+    #
+    # Attribute _executor: the background thread the Waves are built on
+    # Invariant: _executor is a ThreadPoolExecutor with one worker
+    #
+    # Attribute _pending: the Waves asked for and not handed out yet
+    # Invariant: _pending is a dict mapping ids to Futures of Waves
+    #
+    # Attribute _hits: the number of takes served by a prefetched Wave
+    # Invariant: _hits is an int >= 0
+    #
+    # Attribute _misses: the number of takes that had to build their Wave
+    # Invariant: _misses is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_hits(self):
+        """
+        This method is a getter for the number of takes served by a
+        prefetched Wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._hits
+
+    def getter_misses(self):
+        """
+        This method is a getter for the number of takes that had to build
+        their Wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._misses
+
+    def getter_pending(self):
+        """
+        This method returns the sorted ids of the Waves asked for and not
+        handed out yet.
+
+        Parameter self: current instance of the class
+        """
+        return sorted(self._pending)
+
+    # INITIALIZER TO START THE BACKGROUND THREAD
+    def __init__(self, build):
+        """
+        Initializes a prefetcher with nothing asked for.
+
+        Parameter build: the function that makes the Wave of an id
+        Precondition: build is a callable taking an id and returning a Wave
+        """
+        assert callable(build)
+        self._build = build
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+            thread_name_prefix='prefetch')
+        self._pending = {}
+        self._hits = 0
+        self._misses = 0
+
+    # ADDITIONAL METHODS
+    def request(self, ids):
+        """
+        This method starts building a Wave for every id that has none
+        pending, and drops the pending Waves of every other id.
+
+        Parameter ids: the ids of the waves that may be played next
+        Precondition: ids is a list of ids that build accepts
+        """
+        for id in list(self._pending):
+            if not id in ids:
+                self._pending.pop(id).cancel()
+        for id in ids:
+            if not id in self._pending:
+                self._pending[id] = self._executor.submit(self._build,id)
+
+    def take(self, id):
+        """
+        This method returns the Wave of an id: the prefetched one, waiting
+        for it if it is still being built, or a new one if none was asked
+        for.
+
+        An error raised while building a prefetched Wave is raised here.
+
+        Parameter id: the id of the wave
+        Precondition: id is an id that build accepts
+        """
+        future = self._pending.pop(id,None)
+        if future == None:
+            self._misses += 1
+            return self._build(id)
+        self._hits += 1
+        return future.result()
+
+    def shutdown(self):
+        """
+        This method drops every pending Wave and stops the background thread
+        once the Wave it is building (if any) is done.
+
+        Parameter self: current instance of the class
+        """
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        self._executor.shutdown(wait=False)
@@ -9,8 +9,6 @@ all modules to access them.
 # YOUR NAME(S) AND NETID(S) HERE
 # DATE COMPLETED HERE
 """
-import introcs
-import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
@@ -73,6 +71,12 @@ SMALL_RADIUS = 16
 # The speed of a small planetoid
 SMALL_SPEED  = 3
 
+# The spare medium and small planetoids (and their drawables) kept ready for
+# splits, so a chain of splits does not have to make them all at once
+FRAGMENT_RESERVE = 48
+# The most spares made per tick (or drawables per frame) to refill the reserve
+FRAGMENT_REFILL  = 4
+
 ### BULLET CONSTANTS ###
 
 # The radius of a bullet (width/2 and height/2)
@@ -83,6 +87,36 @@ BULLET_SPEED  = 10
 BULLET_RATE   = 30
 # The color of a bullet
 BULLET_COLOR   = 'red'
+# The most bullets that can be on screen at once (the size of the bullet pool)
+MAX_BULLETS   = 64
+
+### TIMING CONSTANTS ###
+
+# The frame rate that the per-frame speeds, impulse, turn rate and BULLET_RATE
+# above are tuned for
+BASE_RATE = 60
+# The number of simulation ticks per second (independent of the display rate)
+TICK_RATE = 60
+# The longest frame time (in seconds) that is turned into ticks, so a stall
+# does not make the game try to catch up all at once
+MAX_FRAME_TIME = 0.25
+
+### COLLISION CONSTANTS ###
+
+# The size of a cell in the spatial hash (must be >= the largest sum of radii)
+SPATIAL_CELL_SIZE = 2*LARGE_RADIUS
+# Whether Wave should use the NumPy array engine when numpy is installed
+ARRAY_ENGINE = False
+# Whether collisions are tested along the whole path of each step, so fast
+# bullets can't pass through small asteroids between two ticks
+SWEPT_COLLISIONS = True
+# The most bullet/asteroid pairs the array engine tests in a single batch
+ENGINE_CHUNK_SIZE = 262144
+
+### GENERATOR CONSTANTS ###
+
+# How close to the ship a generated asteroid's edge may start (see generator.py)
+GENERATOR_SAFE_ZONE = 150
 
 ### GAME CONSTANTS ###
 
@@ -115,29 +149,94 @@ MESSAGE_SIZE = 60
 # The y-offset for the message (the value to add to the center y value)
 MESSAGE_OFFSET = -70
 
+### PROFILER CONSTANTS ###
+
+# The key that shows and hides the frame profiler HUD
+PROFILE_KEY = 'p'
+# The number of frames the HUD averages over
+PROFILE_WINDOW = 120
+# The number of frames between updates of the HUD text
+PROFILE_HUD_REFRESH = 30
+# The font size of the HUD
+PROFILE_HUD_SIZE = 14
+# The CSV file to write every profiled frame to (None for no file)
+PROFILE_CSV = None
+
+### RECORDING CONSTANTS ###
+
+# The folder to save a recording of the keys of every wave played to, for
+# replay.py (None for no recordings)
+RECORD_FOLDER = None
+
+### SOUND AND IMAGE CONSTANTS ###
+
+# The sound when the ship fires a bullet
+BULLET_SOUND = 'pew1.wav'
+# The sound when the ship is hit by an asteroid
+EXPLOSION_SOUND = 'explosion.wav'
+# The sprite sheet for the ship exploding (2 rows, 4 columns)
+EXPLOSION_IMAGE = 'explosion.png'
+# The background of the game
+BACKGROUND_IMAGE = 'space.png'
+
+# The folders that game2d looks in for images, sounds and fonts
+IMAGE_FOLDER = 'Images'
+SOUND_FOLDER = 'Sounds'
+FONT_FOLDER  = 'Fonts'
+
 ### JSON FILES ###
 
-# The default wave
+# The default wave (__main__.py changes it to the file named on the command
+# line, if there is one)
 DEFAULT_WAVE  = 'wave1.json'
-
-### USE COMMAND LINE ARGUMENTS TO CHANGE DEFAULT LEVEL FILE
-"""
-sys.argv is a list of the command line arguments when you run python. These
-arguments are everything after the word python. So if you start the game typing
-
-    python planetoids default.json
-
-Python puts ['planetoids', 'default.json'] into sys.argv. Below, we take
-advantage of this fact to change the constant DEFAULT_LEVEL. This is the level
-file to be used when you start the game.
-"""
-try:
-    file = sys.argv[1]
-    if file[-5:].lower() == '.json':
-        DEFAULT_WAVE = file
-    else:
-        DEFAULT_WAVE = file+'.json'
-except:
-    pass # Use original value
+# The wave file named on the command line, or None if none was named (the
+# game then starts at the start of the campaign)
+NAMED_WAVE    = None
+
+### CAMPAIGN CONSTANTS ###
+
+# The campaign manifest to play (see campaign.py), or None to play
+# CAMPAIGN_WAVES one after another
+CAMPAIGN_FILE  = None
+# The waves of the campaign when there is no manifest, in order
+CAMPAIGN_WAVES = ('wave1.json','wave2.json','wave3.json')
+# How many waves ahead of the current one are built in the background
+PREFETCH_DEPTH = 2
+
+### SERVER CONSTANTS ###
+
+# The address that the session server (see server.py) listens on
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+# The most ticks a session may play in one round of the scheduler to catch
+# up after it fell behind (any more are dropped)
+SERVER_TICK_BUDGET = 4
+# The part of a tick that a round may spend stepping sessions before the
+# sessions left wait for the next round
+SERVER_LOAD_LIMIT = 0.8
+# The most bytes waiting to be sent to a client before its deltas are held
+# back (the next delta it gets covers everything it missed)
+SERVER_HIGH_WATER = 65536
+# The largest message a client may send, in bytes
+SERVER_MAX_MESSAGE = 1 << 20
+# The number of rounds that the metrics of the server are taken over
+SERVER_METRICS_WINDOW = 600
+
+### ENVIRONMENT CONSTANTS ###
+
+# The number of asteroids in the wave an environment (see env.py) generates
+# when it is reset without a wave
+ENV_ASTEROIDS = 8
+# The most steps in an episode before it is cut short
+ENV_MAX_STEPS = 3600
+# The number of ticks each step plays with the same keys down
+ENV_FRAME_SKIP = 1
+# The number of asteroids nearest the ship that an observation describes
+ENV_NEAREST = 8
+# The reward for every asteroid a bullet hits
+ENV_HIT_REWARD = 1.0
+# The reward for winning and for losing a wave
+ENV_WIN_REWARD  = 10.0
+ENV_LOSE_REWARD = -10.0
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
@@ -0,0 +1,408 @@
+"""
+Array physics module for Planetoids
+
+This module contains an optional physics engine that keeps the positions,
+velocities and radii of every asteroid and bullet in contiguous NumPy arrays.
+Moving, wrapping and the circle overlap tests are then done as a handful of
+batch operations per frame instead of one Python call per object.
+
+The bodies (AsteroidBody and BulletBody from bodies.py) are still the ones in
+Wave's lists, but while the engine is in use their x and y are only written
+once per frame, right before Wave.draw, by the method sync.
+
+NumPy is optional. If it is not installed HAS_NUMPY is False and Wave falls
+back to its plain Python update. Importing NumPy takes longer than the rest
+of the game's simulation put together, so this module only checks that it
+is installed, and the first ArrayEngine imports it.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+import importlib.util
+
+# Whether numpy is installed
+HAS_NUMPY = importlib.util.find_spec('numpy') != None
+# The numpy module, once the first ArrayEngine has imported it
+numpy = None
+
+
+def _import_numpy():
+    """
+    Imports numpy into this module, if it has not been imported yet.
+    """
+    global numpy
+    if numpy == None:
+        import numpy as module
+        numpy = module
+
+
+class ArrayEngine(object):
+    """
+    A class that stores asteroids and bullets as a struct of arrays.
+
+    Row i of the asteroid arrays always belongs to the i-th object of the
+    asteroid list given to the engine, and the same holds for the bullets. Wave
+    keeps its stores in that order by telling the engine about every object it
+    adds (add_asteroid, add_bullet) and every object it removes
+    (remove_asteroids, remove_bullets).
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _asteroids: the bodies that the asteroid rows belong to
+    # Invariant: _asteroids is a list of AsteroidBody with length _numas
+    #
+    # Attribute _apos: the asteroid positions
+    # Invariant: _apos is a float array of shape (capacity, 2), capacity >= _numas
+    #
+    # Attribute _avel: the asteroid velocities
+    # Invariant: _avel is a float array with the same shape as _apos
+    #
+    # Attribute _arad: the asteroid radii
+    # Invariant: _arad is a float array of shape (capacity,)
+    #
+    # Attribute _numas: the number of asteroid rows in use
+    # Invariant: _numas is an int >= 0
+    #
+    # Attribute _bullets: the bodies that the bullet rows belong to
+    # Invariant: _bullets is a list of BulletBody with length _numbul
+    #
+    # Attribute _bpos: the bullet positions
+    # Invariant: _bpos is a float array of shape (capacity, 2), capacity >= _numbul
+    #
+    # Attribute _bvel: the bullet velocities
+    # Invariant: _bvel is a float array with the same shape as _bpos
+    #
+    # Attribute _numbul: the number of bullet rows in use
+    # Invariant: _numbul is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_asteroid_positions(self):
+        """
+        This method returns a view of the asteroid positions in use.
+
+        Parameter self: current instance of the class
+        """
+        return self._apos[:self._numas]
+
+    def getter_bullet_positions(self):
+        """
+        This method returns a view of the bullet positions in use.
+
+        Parameter self: current instance of the class
+        """
+        return self._bpos[:self._numbul]
+
+    # INITIALIZER TO LOAD THE CURRENT OBJECTS
+    def __init__(self, asteroids, bullets):
+        """
+        Initializes the arrays from the current asteroids and bullets.
+
+        Parameter asteroids: the asteroids on screen
+        Precondition: asteroids is a list or EntityStore of AsteroidBody
+
+        Parameter bullets: the bullets on screen
+        Precondition: bullets is a list or EntityStore of BulletBody
+        """
+        assert HAS_NUMPY, 'ArrayEngine needs numpy'
+        _import_numpy()
+        self._asteroids = []
+        self._apos = numpy.zeros((16,2))
+        self._avel = numpy.zeros((16,2))
+        self._arad = numpy.zeros(16)
+        self._numas = 0
+        self._bullets = []
+        self._bpos = numpy.zeros((16,2))
+        self._bvel = numpy.zeros((16,2))
+        self._numbul = 0
+        for asteroid in asteroids:
+            self.add_asteroid(asteroid)
+        for bullet in bullets:
+            self.add_bullet(bullet)
+
+    # ADDING AND REMOVING ROWS
+    def add_asteroid(self, asteroid):
+        """
+        This method appends a row for a new asteroid.
+
+        Parameter asteroid: the asteroid that was appended to Wave's list
+        Precondition: asteroid is an AsteroidBody object
+        """
+        if self._numas == len(self._arad):
+            self._apos = self._grow(self._apos)
+            self._avel = self._grow(self._avel)
+            self._arad = self._grow(self._arad)
+        i = self._numas
+        velocity = asteroid.get_velocity()
+        self._apos[i,0] = asteroid.getter_x()
+        self._apos[i,1] = asteroid.getter_y()
+        self._avel[i,0] = velocity.x
+        self._avel[i,1] = velocity.y
+        self._arad[i] = asteroid.getter_width()/2
+        self._asteroids.append(asteroid)
+        self._numas += 1
+
+    def add_bullet(self, bullet):
+        """
+        This method appends a row for a new bullet.
+
+        Parameter bullet: the bullet that was appended to Wave's list
+        Precondition: bullet is a BulletBody object
+        """
+        if self._numbul == len(self._bpos):
+            self._bpos = self._grow(self._bpos)
+            self._bvel = self._grow(self._bvel)
+        i = self._numbul
+        velocity = bullet.getter_for_velocity()
+        self._bpos[i,0] = bullet.x
+        self._bpos[i,1] = bullet.y
+        self._bvel[i,0] = velocity.x
+        self._bvel[i,1] = velocity.y
+        self._bullets.append(bullet)
+        self._numbul += 1
+
+    def remove_asteroids(self, indices):
+        """
+        This method removes asteroid rows by moving the last row into each
+        removed row, the same way EntityStore.flush does.
+
+        Parameter indices: the rows to remove, from the largest to the
+        smallest (as returned by EntityStore.getter_pending)
+        Precondition: indices is a list of distinct ints between 0 and _numas
+        """
+        for i in indices:
+            last = self._numas-1
+            if i != last:
+                self._apos[i] = self._apos[last]
+                self._avel[i] = self._avel[last]
+                self._arad[i] = self._arad[last]
+                self._asteroids[i] = self._asteroids[last]
+            self._asteroids.pop()
+            self._numas = last
+
+    def remove_bullets(self, indices):
+        """
+        This method removes bullet rows by moving the last row into each
+        removed row, the same way EntityStore.flush does.
+
+        Parameter indices: the rows to remove, from the largest to the
+        smallest (as returned by EntityStore.getter_pending)
+        Precondition: indices is a list of distinct ints between 0 and _numbul
+        """
+        for i in indices:
+            last = self._numbul-1
+            if i != last:
+                self._bpos[i] = self._bpos[last]
+                self._bvel[i] = self._bvel[last]
+                self._bullets[i] = self._bullets[last]
+            self._bullets.pop()
+            self._numbul = last
+
+    # BATCH PHYSICS
+    def move_bullets(self, scale=1):
+        """
+        This method adds the velocity of every bullet to its position and
+        returns a boolean array that is False for the bullets that left the
+        screen and its dead zone (the same test as Wave.wrap_all).
+
+        Parameter scale: the length of the tick in BASE_RATE frames
+        Precondition: scale is an int or float > 0
+        """
+        n = self._numbul
+        pos = self._bpos[:n]
+        if scale == 1:
+            pos += self._bvel[:n]
+        else:
+            pos += self._bvel[:n]*scale
+        return ((pos[:,0] >= -DEAD_ZONE) & (pos[:,1] >= -DEAD_ZONE) &
+            (pos[:,0] <= GAME_WIDTH+DEAD_ZONE) &
+            (pos[:,1] <= GAME_HEIGHT+DEAD_ZONE))
+
+    def move_asteroids(self, scale=1):
+        """
+        This method adds the velocity of every asteroid to its position and
+        wraps the asteroids around the same torus as wrap_bodies in bodies.py,
+        with the same modular step.
+
+        Parameter scale: the length of the tick in BASE_RATE frames
+        Precondition: scale is an int or float > 0
+        """
+        n = self._numas
+        pos = self._apos[:n]
+        rad = self._arad[:n]
+        if scale == 1:
+            pos += self._avel[:n]
+        else:
+            pos += self._avel[:n]*scale
+        low = -DEAD_ZONE-rad
+        width = GAME_WIDTH+2*(DEAD_ZONE+rad)
+        height = GAME_HEIGHT+2*(DEAD_ZONE+rad)
+        x = pos[:,0]
+        y = pos[:,1]
+        x -= width*numpy.floor((x-low)/width)
+        y -= height*numpy.floor((y-low)/height)
+
+    def ship_hit(self, x, y, radius, velocity=None, scale=1):
+        """
+        This method returns the index of the first asteroid overlapping a
+        circle, or -1 if there is none.
+
+        If velocity is given, the circle is tested along the whole path it
+        and the asteroids took this step (see swept_overlap in bodies.py).
+
+        Parameter x: the x coordinate of the ship
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the ship
+        Precondition: y is an int or float
+
+        Parameter radius: the radius of the ship
+        Precondition: radius is an int or float >= 0
+
+        Parameter velocity: the velocity of the ship (None means only test
+        where the ship is now)
+        Precondition: velocity is None or a tuple of two ints or floats
+
+        Parameter scale: the length of the step in BASE_RATE frames
+        Precondition: scale is an int or float >= 0
+        """
+        n = self._numas
+        if n == 0:
+            return -1
+        dx = self._apos[:n,0]-x
+        dy = self._apos[:n,1]-y
+        reach = self._arad[:n]+radius
+        if velocity == None:
+            hits = numpy.flatnonzero(dx*dx+dy*dy < reach*reach)
+        else:
+            # swept_overlap is written from the moving circle, so flip dx, dy
+            hits = numpy.flatnonzero(_swept_overlap(-dx,-dy,
+                (velocity[0]-self._avel[:n,0])*scale,
+                (velocity[1]-self._avel[:n,1])*scale,reach*reach))
+        return int(hits[0]) if len(hits) > 0 else -1
+
+    def bullet_hits(self, scale=None, alive=None):
+        """
+        This method returns a list of (bullet, asteroid) index pairs for this
+        frame.
+
+        Bullets are resolved in order. Each bullet hits the first asteroid it
+        overlaps that has not already been hit by an earlier bullet, so no
+        asteroid appears twice. The distance matrix is built in chunks of
+        bullets to bound its memory.
+
+        If scale is given, each pair is tested along the whole path the
+        bullet and the asteroid took this step (see swept_overlap in
+        bodies.py) instead of only where they are now.
+
+        Parameter scale: the length of the step in BASE_RATE frames (None
+        means only test the current positions)
+        Precondition: scale is None, or an int or float >= 0
+
+        Parameter alive: which bullets may hit anything (None means all of
+        them), e.g. the result of move_bullets
+        Precondition: alive is None or a boolean array of length _numbul
+        """
+        na = self._numas
+        nb = self._numbul
+        if na == 0 or nb == 0:
+            return []
+        apos = self._apos[:na]
+        avel = self._avel[:na]
+        reach = self._arad[:na]+BULLET_RADIUS
+        reach = reach*reach
+        chunk = max(1,ENGINE_CHUNK_SIZE//na)
+        pairs = []
+        taken = set()
+        for start in range(0,nb,chunk):
+            stop = min(nb,start+chunk)
+            bpos = self._bpos[start:stop]
+            dx = bpos[:,0,None]-apos[None,:,0]
+            dy = bpos[:,1,None]-apos[None,:,1]
+            if scale == None:
+                overlap = dx*dx+dy*dy < reach[None,:]
+            else:
+                bvel = self._bvel[start:stop]
+                overlap = _swept_overlap(dx,dy,
+                    (bvel[:,0,None]-avel[None,:,0])*scale,
+                    (bvel[:,1,None]-avel[None,:,1])*scale,reach[None,:])
+            if alive is not None:
+                overlap &= alive[start:stop,None]
+            for row in numpy.flatnonzero(overlap.any(axis=1)):
+                for ast in numpy.flatnonzero(overlap[row]):
+                    if int(ast) not in taken:
+                        taken.add(int(ast))
+                        pairs.append((start+int(row),int(ast)))
+                        break
+        return pairs
+
+    def sync(self):
+        """
+        This method copies every position in the arrays back to its body.
+
+        Wave calls this once per frame, right before drawing.
+
+        Parameter self: current instance of the class
+        """
+        apos = self._apos[:self._numas].tolist()
+        for i in range(self._numas):
+            self._asteroids[i].x = apos[i][0]
+            self._asteroids[i].y = apos[i][1]
+        bpos = self._bpos[:self._numbul].tolist()
+        for i in range(self._numbul):
+            self._bullets[i].x = bpos[i][0]
+            self._bullets[i].y = bpos[i][1]
+
+    def sync_asteroid(self, i):
+        """
+        This method copies the position of a single asteroid to its body.
+
+        Parameter i: the row of the asteroid
+        Precondition: i is an int between 0 and _numas
+        """
+        assert isinstance(i,int) and 0 <= i < self._numas
+        self._asteroids[i].x = float(self._apos[i,0])
+        self._asteroids[i].y = float(self._apos[i,1])
+
+    # HELPER METHODS
+    def _grow(self, array):
+        """
+        This method returns a copy of array with twice as many rows.
+
+        Parameter array: the array to grow
+        Precondition: array is a numpy array
+        """
+        bigger = numpy.zeros((2*len(array),)+array.shape[1:])
+        bigger[:len(array)] = array
+        return bigger
+
+
+def _swept_overlap(dx, dy, mx, my, reach2):
+    """
+    Returns a boolean array with swept_overlap (see bodies.py) worked out for
+    every element, in the same order of operations so the results match.
+
+    Parameter dx: the x offsets at the end of the step
+    Precondition: dx is a float array
+
+    Parameter dy: the y offsets at the end of the step
+    Precondition: dy is a float array that broadcasts with dx
+
+    Parameter mx: the relative x movements during the step
+    Precondition: mx is a float array that broadcasts with dx
+
+    Parameter my: the relative y movements during the step
+    Precondition: my is a float array that broadcasts with dx
+
+    Parameter reach2: the squared sums of the radii
+    Precondition: reach2 is a float array that broadcasts with dx
+    """
+    sx = dx-mx
+    sy = dy-my
+    length = mx*mx+my*my
+    moving = length > 0
+    t = numpy.zeros(numpy.broadcast(sx,length).shape)
+    numpy.divide(-(sx*mx+sy*my),length,out=t,where=moving)
+    t = numpy.minimum(1.0,numpy.maximum(0.0,t))
+    cx = sx+t*mx
+    cy = sy+t*my
+    return cx*cx+cy*cy < reach2
@@ -0,0 +1,637 @@
+"""
+Environment module for Planetoids
+
+This module wraps Wave in the reset/step interface that reinforcement
+learning libraries expect (the one made popular by OpenAI Gym), so that
+control policies can be trained against the game. PlanetoidsEnv plays one
+headless wave (see headless.py). VectorEnv plays many of them in lockstep
+and returns their observations, rewards and done flags as NumPy arrays.
+
+An action is one of the ACTIONS key masks of keys_to_mask: bit i holds down
+WAVE_KEYS[i] ('left', 'right', 'up' and 'spacebar'), the keys that
+Wave.inputs reads. An observation is OBSERVATION_SIZE numbers, all scaled to
+about -1..1. The first SHIP_FEATURES describe the ship: its position,
+velocity and facing, and whether it can fire. Then come the ENV_NEAREST
+asteroids nearest the ship, nearest first. Each is ASTEROID_FEATURES
+numbers: its offset from the ship (the short way round the screen), its
+velocity, its radius, and a 1 to show it is there. Missing asteroids are all
+zeros.
+
+A step plays ENV_FRAME_SKIP ticks with the keys of its action down. Its
+reward is ENV_HIT_REWARD for every asteroid a bullet hits, plus
+ENV_WIN_REWARD once the wave is won or ENV_LOSE_REWARD once the ship is
+destroyed (see getter_for_winlose). An episode is done when the wave is won
+or lost, or after ENV_MAX_STEPS steps, when it is cut short (truncated).
+
+reset takes a seed and a wave (a wave JSON dict or a WaveDefinition). Without
+a wave it plays the wave of ENV_ASTEROIDS asteroids from WaveGenerator(seed).
+VectorEnv resets an environment as soon as it is done, with the next seed of
+that environment, so its environments never stop; the observation an
+episode ended on is kept in the final observations.
+
+A tick of a wave is plain Python, so a core plays around ten thousand steps
+per second (see the env suite in benchmark.py). VectorEnv can split its
+environments between worker processes that step them in parallel and share
+the arrays through shared memory, so the steps per second grow with the
+number of cores.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+from generator import *
+import heapq
+import importlib.util
+import multiprocessing
+import multiprocessing.shared_memory
+import random
+
+# The number of actions (every mask of the keys in WAVE_KEYS)
+ACTIONS = 1 << len(WAVE_KEYS)
+# The numbers that describe the ship, and each asteroid, in an observation
+SHIP_FEATURES = 7
+ASTEROID_FEATURES = 6
+# The numbers in an observation
+OBSERVATION_SIZE = SHIP_FEATURES+ENV_NEAREST*ASTEROID_FEATURES
+
+# The keys down for each action
+_ACTION_KEYS = [frozenset(mask_to_keys(action)) for action in range(ACTIONS)]
+# The fastest an asteroid moves, which its velocity is scaled by
+_TOP_SPEED = max(SMALL_SPEED,MEDIUM_SPEED,LARGE_SPEED)
+
+# The arrays that VectorEnv shares with its workers: their element types,
+# and whether each row is an observation
+_ARRAYS = (('observations','float32',True),('final','float32',True),
+    ('rewards','float32',False),('dones','bool',False),
+    ('truncated','bool',False),('actions','int64',False))
+
+# The numpy module, once the first VectorEnv has imported it
+numpy = None
+
+
+def _import_numpy():
+    """
+    Imports numpy into this module, if it has not been imported yet.
+    """
+    global numpy
+    if numpy == None:
+        import numpy as module
+        numpy = module
+
+
+class PlanetoidsEnv(object):
+    """
+    A class representing one environment: a headless wave played a step at
+    a time.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _wave: the wave being played
+    # Invariant: _wave is a headless Wave, or None before the first reset
+    #
+    # Attribute _input: the input the wave reads the keys of each action from
+    # Invariant: _input is a ScriptedInput
+    #
+    # Attribute _steps: the steps played in this episode
+    # Invariant: _steps is an int >= 0
+    #
+    # Attribute _destroyed: the asteroids hit by bullets so far this episode
+    # Invariant: _destroyed is an int >= 0
+    #
+    # Attribute _focus: where the ship is, or was when it was destroyed
+    # Invariant: _focus is an (x, y) tuple of numbers
+    #
+    # Attribute _maxsteps: the most steps in an episode
+    # Invariant: _maxsteps is an int > 0
+    #
+    # Attribute _frameskip: the ticks played each step
+    # Invariant: _frameskip is an int > 0
+    #
+    # Attribute _asteroids: the asteroids in a generated wave
+    # Invariant: _asteroids is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_wave(self):
+        """
+        This method is a getter for the wave being played.
+
+        Parameter self: current instance of the class
+        """
+        return self._wave
+
+    def getter_steps(self):
+        """
+        This method is a getter for the steps played in this episode.
+
+        Parameter self: current instance of the class
+        """
+        return self._steps
+
+    # INITIALIZER TO MAKE AN ENVIRONMENT
+    def __init__(self, maxsteps=ENV_MAX_STEPS, frameskip=ENV_FRAME_SKIP,
+            asteroids=ENV_ASTEROIDS):
+        """
+        Initializes an environment that needs a reset before it is stepped.
+
+        Parameter maxsteps: the most steps in an episode
+        Precondition: maxsteps is an int > 0
+
+        Parameter frameskip: the ticks played each step
+        Precondition: frameskip is an int > 0
+
+        Parameter asteroids: the asteroids in a generated wave
+        Precondition: asteroids is an int >= 0
+        """
+        assert isinstance(maxsteps,int) and maxsteps > 0
+        assert isinstance(frameskip,int) and frameskip > 0
+        assert isinstance(asteroids,int) and asteroids >= 0
+        self._wave = None
+        self._input = ScriptedInput()
+        self._steps = 0
+        self._destroyed = 0
+        self._focus = (GAME_WIDTH/2,GAME_HEIGHT/2)
+        self._maxsteps = maxsteps
+        self._frameskip = frameskip
+        self._asteroids = asteroids
+
+    # ADDITIONAL METHODS
+    def reset(self, seed=None, wave=None):
+        """
+        This method starts a new episode and returns its first observation.
+
+        Parameter seed: the seed of the generated wave (None for any)
+        Precondition: seed is an int or None
+
+        Parameter wave: the wave to play (None for a generated one)
+        Precondition: wave is a wave JSON dict, a WaveDefinition or None
+        """
+        self.start(seed,wave)
+        return self.observe()
+
+    def step(self, action):
+        """
+        This method plays a step and returns the observation after it, its
+        reward, whether the episode is done and a dict of extra information
+        ('won', 'truncated' and 'destroyed').
+
+        Parameter action: the keys to hold down
+        Precondition: action is an int between 0 and ACTIONS-1
+        """
+        reward, done, truncated = self.play(action)
+        info = {'won':self._wave.getter_for_winlose() == True,
+            'truncated':truncated,'destroyed':self._destroyed}
+        return (self.observe(),reward,done,info)
+
+    def start(self, seed, wave):
+        """
+        This method starts a new episode without making an observation.
+
+        Parameter seed: the seed of the generated wave (None for any)
+        Precondition: seed is an int or None
+
+        Parameter wave: the wave to play (None for a generated one)
+        Precondition: wave is a wave JSON dict, a WaveDefinition or None
+        """
+        if wave == None:
+            if seed == None:
+                seed = random.randrange(1 << 31)
+            wave = WaveGenerator(seed).definition(self._asteroids)
+        self._wave = Wave(wave,vectorized=False,headless=True)
+        self._input = ScriptedInput()
+        self._steps = 0
+        self._destroyed = 0
+        ship = self._wave.getter_ship()
+        self._focus = (ship.x,ship.y)
+
+    def play(self, action):
+        """
+        This method plays a step and returns its reward, whether the episode
+        is done, and whether it was cut short, as a tuple.
+
+        Parameter action: the keys to hold down
+        Precondition: action is an int between 0 and ACTIONS-1
+        """
+        wave = self._wave
+        keys = _ACTION_KEYS[action]
+        for tick in range(self._frameskip):
+            if not wave.is_playing():
+                break
+            self._input.set_keys(keys)
+            wave.update(1/TICK_RATE,self._input)
+        self._steps += 1
+        destroyed = wave.getter_destroyed()
+        reward = ENV_HIT_REWARD*(destroyed-self._destroyed)
+        self._destroyed = destroyed
+        if wave.getter_for_winlose() == True:
+            return (reward+ENV_WIN_REWARD,True,False)
+        if wave.getter_ship() == None:
+            return (reward+ENV_LOSE_REWARD,True,False)
+        if self._steps >= self._maxsteps:
+            return (reward,True,True)
+        return (reward,False,False)
+
+    def features(self):
+        """
+        This method returns the current observation as a list of
+        OBSERVATION_SIZE floats.
+
+        Parameter self: current instance of the class
+        """
+        wave = self._wave
+        ship = wave.getter_ship()
+        if ship != None:
+            self._focus = (ship.x,ship.y)
+            velocity = ship.getter_for_velocity()
+            facing = ship.getter_for_facing()
+            result = [ship.x/GAME_WIDTH,ship.y/GAME_HEIGHT,
+                velocity.x/SHIP_MAX_SPEED,velocity.y/SHIP_MAX_SPEED,facing.x,
+                facing.y,1.0 if wave.is_reloaded() else 0.0]
+        else:
+            result = [0.0]*SHIP_FEATURES
+        x, y = self._focus
+        asteroids = list(wave.getter_asteroids())
+        nearest = []
+        for i in range(len(asteroids)):
+            asteroid = asteroids[i]
+            low, width, height = TORUS[asteroid.width]
+            dx = (asteroid.x-x+width/2) % width-width/2
+            dy = (asteroid.y-y+height/2) % height-height/2
+            # The index breaks ties, so the asteroids are never compared
+            nearest.append((dx*dx+dy*dy,i,dx,dy))
+        if len(nearest) > ENV_NEAREST:
+            nearest = heapq.nsmallest(ENV_NEAREST,nearest)
+        else:
+            nearest.sort()
+        for distance, i, dx, dy in nearest:
+            asteroid = asteroids[i]
+            velocity = asteroid._velocity
+            result.extend((dx/GAME_WIDTH,dy/GAME_HEIGHT,velocity.x/_TOP_SPEED,
+                velocity.y/_TOP_SPEED,asteroid.width/(2*LARGE_RADIUS),1.0))
+        result.extend([0.0]*(OBSERVATION_SIZE-len(result)))
+        return result
+
+    def observe(self):
+        """
+        This method returns the current observation as a float32 array.
+
+        Parameter self: current instance of the class
+        """
+        _import_numpy()
+        return numpy.array(self.features(),dtype=numpy.float32)
+
+
+class _EnvBatch(object):
+    """
+    A class that plays a run of the environments of a VectorEnv, reading
+    their actions from the shared arrays and writing their results there.
+
+    It is used by VectorEnv itself when there is one worker, and by each
+    worker process when there are more.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _envs: the environments
+    # Invariant: _envs is a list of PlanetoidsEnvs
+    #
+    # Attribute _first: the index of the first environment in the arrays
+    # Invariant: _first is an int >= 0
+    #
+    # Attribute _arrays: the arrays of the VectorEnv, by name (see _ARRAYS)
+    # Invariant: _arrays is a dict mapping names to numpy arrays
+    #
+    # Attribute _seeds: the seed of the next episode of each environment
+    # Invariant: _seeds is a list of ints as long as _envs
+    #
+    # Attribute _waves: the wave each environment plays
+    # Invariant: _waves is a list of waves (or None) as long as _envs
+    #
+    # Attribute _stride: how much a seed grows from one episode to the next
+    # Invariant: _stride is an int > 0
+
+    def __init__(self, first, count, arrays, settings):
+        """
+        Initializes a batch of environments, none of them reset yet.
+
+        Parameter first: the index of the first environment in the arrays
+        Precondition: first is an int >= 0
+
+        Parameter count: the number of environments
+        Precondition: count is an int > 0
+
+        Parameter arrays: the arrays of the VectorEnv
+        Precondition: arrays is a dict as in _ARRAYS
+
+        Parameter settings: the maxsteps, frameskip and asteroids of the
+        environments, and the stride of the seeds
+        Precondition: settings is a tuple of four ints > 0
+        """
+        self._envs = [PlanetoidsEnv(*settings[:3]) for i in range(count)]
+        self._first = first
+        self._arrays = arrays
+        self._seeds = [0]*count
+        self._waves = [None]*count
+        self._stride = settings[3]
+
+    def reset(self, seeds, waves):
+        """
+        This method starts a new episode in every environment and writes
+        the first observations.
+
+        Parameter seeds: the seed of each environment
+        Precondition: seeds is a list of ints as long as the batch
+
+        Parameter waves: the wave of each environment
+        Precondition: waves is a list of waves (or None) as long as the batch
+        """
+        observations = self._arrays['observations']
+        for i in range(len(self._envs)):
+            self._seeds[i] = seeds[i]
+            self._waves[i] = waves[i]
+            self._envs[i].start(seeds[i],waves[i])
+            observations[self._first+i] = self._envs[i].features()
+
+    def step(self):
+        """
+        This method plays a step of every environment with its action,
+        writes the results, and starts a new episode in the environments
+        that are done.
+
+        Parameter self: current instance of the class
+        """
+        arrays = self._arrays
+        observations = arrays['observations']
+        first = self._first
+        actions = arrays['actions'][first:first+len(self._envs)].tolist()
+        rewards = []
+        dones = []
+        truncated = []
+        for i in range(len(self._envs)):
+            env = self._envs[i]
+            reward, done, cut = env.play(actions[i])
+            rewards.append(reward)
+            dones.append(done)
+            truncated.append(cut)
+            if done:
+                arrays['final'][first+i] = env.features()
+                self._seeds[i] += self._stride
+                env.start(self._seeds[i],self._waves[i])
+            observations[first+i] = env.features()
+        last = first+len(self._envs)
+        arrays['rewards'][first:last] = rewards
+        arrays['dones'][first:last] = dones
+        arrays['truncated'][first:last] = truncated
+
+
+def _serve_batch(connection, names, count, first, size, settings):
+    """
+    Plays a batch of environments in a worker process, until it is told to
+    close.
+
+    Parameter connection: the pipe to the VectorEnv
+    Precondition: connection is a multiprocessing Connection
+
+    Parameter names: the shared memory of each array, by name
+    Precondition: names is a dict mapping the names in _ARRAYS to strings
+
+    Parameter count: the number of environments of the VectorEnv
+    Precondition: count is an int > 0
+
+    Parameter first: the index of the first environment of the batch
+    Precondition: first is an int >= 0
+
+    Parameter size: the number of environments of the batch
+    Precondition: size is an int > 0
+
+    Parameter settings: the settings of the environments (see _EnvBatch)
+    Precondition: settings is a tuple of four ints > 0
+    """
+    _import_numpy()
+    memories = []
+    arrays = {}
+    for name, dtype, rows in _ARRAYS:
+        memory = multiprocessing.shared_memory.SharedMemory(name=names[name])
+        memories.append(memory)
+        arrays[name] = numpy.ndarray(_shape(count,rows),dtype=dtype,
+            buffer=memory.buf)
+    batch = _EnvBatch(first,size,arrays,settings)
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == 'step':
+                batch.step()
+            elif message[0] == 'reset':
+                batch.reset(message[1],message[2])
+            else:
+                break
+            connection.send(True)
+    finally:
+        arrays = None
+        batch = None
+        for memory in memories:
+            memory.close()
+
+
+def _shape(count, rows):
+    """
+    Returns the shape of an array of a VectorEnv.
+
+    Parameter count: the number of environments
+    Precondition: count is an int > 0
+
+    Parameter rows: whether each row of the array is an observation
+    Precondition: rows is a boolean
+    """
+    return (count,OBSERVATION_SIZE) if rows else (count,)
+
+
+class VectorEnv(object):
+    """
+    A class representing many environments stepped in lockstep.
+
+    The arrays returned by reset and step belong to the VectorEnv and are
+    overwritten by the next step, so copy them to keep them.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _count: the number of environments
+    # Invariant: _count is an int > 0
+    #
+    # Attribute _arrays: the arrays shared with the batches (see _ARRAYS)
+    # Invariant: _arrays is a dict mapping names to numpy arrays
+    #
+    # Attribute _memories: the shared memory of the arrays, with workers
+    # Invariant: _memories is a list of SharedMemory objects (empty if
+    #            there are no workers)
+    #
+    # Attribute _batch: the environments, when there are no workers
+    # Invariant: _batch is an _EnvBatch, or None if there are workers
+    #
+    # Attribute _workers: the worker processes and the pipes to them
+    # Invariant: _workers is a list of (Process, Connection) pairs
+    #
+    # Attribute _slices: the first environment and the number of
+    #           environments of each batch
+    # Invariant: _slices is a list of (first, size) pairs
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_count(self):
+        """
+        This method is a getter for the number of environments.
+
+        Parameter self: current instance of the class
+        """
+        return self._count
+
+    def getter_workers(self):
+        """
+        This method is a getter for the number of worker processes (0 if the
+        environments are stepped in this process).
+
+        Parameter self: current instance of the class
+        """
+        return len(self._workers)
+
+    # INITIALIZER TO MAKE THE ENVIRONMENTS
+    def __init__(self, count, workers=1, maxsteps=ENV_MAX_STEPS,
+            frameskip=ENV_FRAME_SKIP, asteroids=ENV_ASTEROIDS):
+        """
+        Initializes count environments that need a reset before they are
+        stepped.
+
+        Parameter count: the number of environments
+        Precondition: count is an int > 0
+
+        Parameter workers: the number of processes to step them in (1 steps
+        them in this process)
+        Precondition: workers is an int between 1 and count
+
+        Parameter maxsteps: the most steps in an episode
+        Precondition: maxsteps is an int > 0
+
+        Parameter frameskip: the ticks played each step
+        Precondition: frameskip is an int > 0
+
+        Parameter asteroids: the asteroids in a generated wave
+        Precondition: asteroids is an int >= 0
+        """
+        assert HAS_NUMPY, 'VectorEnv needs numpy'
+        assert isinstance(count,int) and count > 0
+        assert isinstance(workers,int) and 1 <= workers <= count
+        _import_numpy()
+        self._count = count
+        self._arrays = {}
+        self._memories = []
+        self._batch = None
+        self._workers = []
+        self._slices = []
+        settings = (maxsteps,frameskip,asteroids,count)
+        if workers == 1:
+            for name, dtype, rows in _ARRAYS:
+                self._arrays[name] = numpy.zeros(_shape(count,rows),dtype=dtype)
+            self._batch = _EnvBatch(0,count,self._arrays,settings)
+            self._slices.append((0,count))
+            return
+        names = {}
+        for name, dtype, rows in _ARRAYS:
+            shape = _shape(count,rows)
+            memory = multiprocessing.shared_memory.SharedMemory(create=True,
+                size=max(1,int(numpy.prod(shape))*numpy.dtype(dtype).itemsize))
+            self._memories.append(memory)
+            names[name] = memory.name
+            self._arrays[name] = numpy.ndarray(shape,dtype=dtype,
+                buffer=memory.buf)
+        first = 0
+        for i in range(workers):
+            size = count//workers+(1 if i < count % workers else 0)
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve_batch,
+                args=(child,names,count,first,size,settings),daemon=True)
+            process.start()
+            self._workers.append((process,parent))
+            self._slices.append((first,size))
+            first += size
+
+    # ADDITIONAL METHODS
+    def reset(self, seeds=None, waves=None):
+        """
+        This method starts a new episode in every environment and returns
+        the array of their first observations.
+
+        Parameter seeds: the seed of each environment (None for 0, 1, 2 ...)
+        Precondition: seeds is None or a list of count ints
+
+        Parameter waves: the wave of every environment, or of each one (None
+        for generated waves)
+        Precondition: waves is None, a wave JSON dict, a WaveDefinition, or
+        a list of count of those
+        """
+        if seeds == None:
+            seeds = list(range(self._count))
+        assert isinstance(seeds,list) and len(seeds) == self._count
+        if not isinstance(waves,list):
+            if isinstance(waves,dict):
+                waves = parse_wave(waves)
+            waves = [waves]*self._count
+        assert len(waves) == self._count
+        if self._batch != None:
+            self._batch.reset(seeds,waves)
+        else:
+            for i in range(len(self._workers)):
+                first, size = self._slices[i]
+                self._workers[i][1].send(('reset',seeds[first:first+size],
+                    waves[first:first+size]))
+            self._wait()
+        return self._arrays['observations']
+
+    def step(self, actions):
+        """
+        This method plays a step of every environment and returns the
+        observations, the rewards, the done flags and a dict of extra
+        arrays: 'truncated' (whether each episode that is done was cut
+        short) and 'final_observations' (the observation each episode that
+        is done ended on).
+
+        The environments that are done are reset right away, so their
+        observations are the first ones of their next episode.
+
+        Parameter actions: the action of each environment
+        Precondition: actions is a list or numpy array of count ints
+        between 0 and ACTIONS-1
+        """
+        assert len(actions) == self._count
+        self._arrays['actions'][:] = actions
+        if self._batch != None:
+            self._batch.step()
+        else:
+            for worker in self._workers:
+                worker[1].send(('step',))
+            self._wait()
+        arrays = self._arrays
+        return (arrays['observations'],arrays['rewards'],arrays['dones'],
+            {'truncated':arrays['truncated'],
+            'final_observations':arrays['final']})
+
+    def close(self):
+        """
+        This method stops the worker processes and frees the shared memory.
+        The environments can't be used afterwards.
+
+        Parameter self: current instance of the class
+        """
+        for worker in self._workers:
+            worker[1].send(('close',))
+        for worker in self._workers:
+            worker[0].join()
+        self._workers = []
+        self._arrays = {}
+        for memory in self._memories:
+            memory.close()
+            memory.unlink()
+        self._memories = []
+
+    def _wait(self):
+        """
+        Waits for every worker to finish what it was sent.
+        """
+        for worker in self._workers:
+            worker[1].recv()
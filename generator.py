@@ -0,0 +1,247 @@
+"""
+Wave generator module for Planetoids
+
+This module makes waves from a seed instead of a wave JSON file. A
+WaveGenerator is set up once with a mix of asteroid sizes, a way of pointing
+the asteroids (see DIRECTIONS) and the size of the safe zone around the ship,
+and can then make waves with any number of asteroids.
+
+Everything is made lazily. asteroids is a generator that makes one
+(size, position, direction) tuple at a time, definition turns it straight into
+a WaveDefinition (see wavedata.py) without building the JSON dict first, and
+waves makes one definition at a time for a list of asteroid counts. So a wave
+with tens of thousands of asteroids never has to be written to (or read from)
+a file, and only the waves being played are in memory.
+
+The same seed, settings and wave index always make the same wave, and each
+wave index has its own random generator, so wave 5 is the same whether or not
+waves 0 to 4 were made first.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wavedata import *
+from bodies import asteroid_radius
+import math
+import random
+
+# How much of each asteroid size a generator makes when no mix is given
+DEFAULT_MIX = {SMALL_ASTEROID:1,MEDIUM_ASTEROID:1,LARGE_ASTEROID:1}
+
+# The ways a generator can point its asteroids:
+#   'uniform':    any direction
+#   'horizontal': straight left or right
+#   'inward':     at the ship, give or take 30 degrees
+#   'outward':    away from the ship, give or take 30 degrees
+DIRECTIONS = ('uniform','horizontal','inward','outward')
+
+# How far inward and outward asteroids may point from the ship, in radians
+_DIRECTION_SPREAD = math.radians(30)
+
+
+class WaveGenerator(object):
+    """
+    A class that makes seeded waves with a chosen number of asteroids.
+
+    An asteroid's speed is set by its size (see consts.py), so the velocity of
+    a generated asteroid is chosen by its size from the mix and its direction
+    from DIRECTIONS.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _seed: the seed every wave's random generator is made from
+    # Invariant: _seed is an int
+    #
+    # Attribute _sizes: the asteroid sizes in the mix
+    # Invariant: _sizes is a list of asteroid sizes
+    #
+    # Attribute _weights: the cumulative weight of each size in _sizes
+    # Invariant: _weights is an increasing list of floats as long as _sizes
+    #
+    # Attribute _directions: how the asteroids are pointed
+    # Invariant: _directions is a name in DIRECTIONS
+    #
+    # Attribute _safe: how close to the ship an asteroid's edge may start
+    # Invariant: _safe is an int or float >= 0
+    #
+    # Attribute _position: the starting position of the ship
+    # Invariant: _position is a tuple of two numbers
+    #
+    # Attribute _angle: the starting angle of the ship in degrees
+    # Invariant: _angle is an int or float
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_seed(self):
+        """
+        This method is a getter for the seed of the generator.
+
+        Parameter self: current instance of the class
+        """
+        return self._seed
+
+    def getter_safe(self):
+        """
+        This method is a getter for the size of the safe zone around the ship.
+
+        Parameter self: current instance of the class
+        """
+        return self._safe
+
+    # INITIALIZER TO SET UP A GENERATOR
+    def __init__(self, seed=0, mix=None, directions='uniform',
+            safe=GENERATOR_SAFE_ZONE, position=None, angle=90):
+        """
+        Initializes a generator.
+
+        Parameter seed: the seed of the generator
+        Precondition: seed is an int
+
+        Parameter mix: how much of each size to make, e.g. {'small':3,
+        'large':1} for three small asteroids to every large one (None means
+        DEFAULT_MIX)
+        Precondition: mix is None or a non-empty dict mapping asteroid sizes
+        to ints or floats >= 0, with at least one > 0
+
+        Parameter directions: how to point the asteroids
+        Precondition: directions is a name in DIRECTIONS
+
+        Parameter safe: how close to the ship an asteroid's edge may start
+        Precondition: safe is an int or float >= 0, small enough to leave room
+        on the screen for every size in mix
+
+        Parameter position: the starting position of the ship (None means the
+        center of the screen)
+        Precondition: position is None or a list or tuple of two numbers
+
+        Parameter angle: the starting angle of the ship in degrees
+        Precondition: angle is an int or float
+        """
+        assert isinstance(seed,int)
+        if mix == None:
+            mix = DEFAULT_MIX
+        assert isinstance(mix,dict) and mix != {}, repr(mix)+' is not a mix'
+        assert directions in DIRECTIONS, repr(directions)+' is not one of '+\
+            repr(DIRECTIONS)
+        assert (isinstance(safe,int) or isinstance(safe,float)) and safe >= 0
+        assert isinstance(angle,int) or isinstance(angle,float)
+        if position == None:
+            position = (GAME_WIDTH/2,GAME_HEIGHT/2)
+        self._position = (float(position[0]),float(position[1]))
+        for size in mix:
+            assert size in (SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID), \
+                repr(size)+' is not an asteroid size'
+            weight = mix[size]
+            assert (isinstance(weight,int) or isinstance(weight,float)) and \
+                weight >= 0, repr(weight)+' is not a weight for '+size
+        self._sizes = []
+        self._weights = []
+        total = 0.0
+        for size in (SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID):
+            if mix.get(size,0) > 0:
+                total += mix[size]
+                self._sizes.append(size)
+                self._weights.append(total)
+        assert self._sizes != [], repr(mix)+' makes no asteroids'
+        self._seed = seed
+        self._directions = directions
+        self._safe = safe
+        self._angle = angle
+        farthest = max(math.hypot(x-self._position[0],y-self._position[1])
+            for x in (0,GAME_WIDTH) for y in (0,GAME_HEIGHT))
+        for size in self._sizes:
+            assert farthest > safe+asteroid_radius(size), 'a safe zone of '+\
+                repr(safe)+' leaves no room for '+size+' asteroids'
+
+    # ADDITIONAL METHODS
+    def asteroids(self, count, index=0):
+        """
+        This method is a generator of the (size, position, direction) tuples
+        of the asteroids of a wave, made one at a time.
+
+        Every asteroid starts on the screen with its edge at least the safe
+        distance from the ship.
+
+        Parameter count: the number of asteroids
+        Precondition: count is an int >= 0
+
+        Parameter index: which wave of this generator to make
+        Precondition: index is an int >= 0
+        """
+        assert isinstance(count,int) and count >= 0
+        assert isinstance(index,int) and index >= 0
+        rng = random.Random('%d:%d' % (self._seed,index))
+        cx = self._position[0]
+        cy = self._position[1]
+        for i in range(count):
+            size = rng.choices(self._sizes,cum_weights=self._weights)[0]
+            reach = self._safe+asteroid_radius(size)
+            x = rng.uniform(0,GAME_WIDTH)
+            y = rng.uniform(0,GAME_HEIGHT)
+            while (x-cx)*(x-cx)+(y-cy)*(y-cy) <= reach*reach:
+                x = rng.uniform(0,GAME_WIDTH)
+                y = rng.uniform(0,GAME_HEIGHT)
+            yield (size,(x,y),self._direction(rng,x-cx,y-cy))
+
+    def definition(self, count, index=0):
+        """
+        This method returns the WaveDefinition of a wave.
+
+        Parameter count: the number of asteroids
+        Precondition: count is an int >= 0
+
+        Parameter index: which wave of this generator to make
+        Precondition: index is an int >= 0
+        """
+        return WaveDefinition(self._position,self._angle,
+            self.asteroids(count,index))
+
+    def wave(self, count, index=0):
+        """
+        This method returns a wave as a wave JSON dict, with the same ship and
+        asteroids as definition.
+
+        Parameter count: the number of asteroids
+        Precondition: count is an int >= 0
+
+        Parameter index: which wave of this generator to make
+        Precondition: index is an int >= 0
+        """
+        return wave_json(self.definition(count,index))
+
+    def waves(self, counts):
+        """
+        This method is a generator of the definitions of a run of waves, made
+        one at a time. The n-th definition is wave n of this generator.
+
+        Parameter counts: the number of asteroids in each wave
+        Precondition: counts is an iterable of ints >= 0 (it may be endless)
+        """
+        index = 0
+        for count in counts:
+            yield self.definition(count,index)
+            index += 1
+
+    def _direction(self, rng, dx, dy):
+        """
+        Returns the direction of a new asteroid as a tuple of two floats.
+
+        Parameter rng: the random generator of the wave
+        Precondition: rng is a random.Random object
+
+        Parameter dx: the x offset of the asteroid from the ship
+        Precondition: dx is a float
+
+        Parameter dy: the y offset of the asteroid from the ship
+        Precondition: dy is a float, and dx and dy are not both 0
+        """
+        if self._directions == 'horizontal':
+            return (rng.choice((-1.0,1.0)),0.0)
+        if self._directions == 'uniform':
+            angle = rng.uniform(0,2*math.pi)
+        else:
+            angle = math.atan2(dy,dx)+rng.uniform(-_DIRECTION_SPREAD,
+                _DIRECTION_SPREAD)
+            if self._directions == 'inward':
+                angle += math.pi
+        return (math.cos(angle),math.sin(angle))
+
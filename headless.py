@@ -0,0 +1,378 @@
+"""
+Headless module for Planetoids
+
+This module contains stand-ins for the parts of game2d that a Wave touches
+while it plays: the keyboard (GInput), the sounds (Sound) and the explosion
+animation (GSprite), along with NullAssets to hand them out in place of the
+asset registry. A Wave made with headless=True uses these, and skips
+binding its bodies (see bodies.py) to drawables, so it can be stepped in a
+plain Python process with no window, no audio device and no textures.
+
+The stand-ins only do bookkeeping (which keys are down, how often a sound was
+played), so a headless wave runs as fast as its physics allows. Nothing in
+this module (or in wave.py) imports game2d, so a process that only plays
+headless waves never loads Kivy; is_input and is_view accept the game2d
+classes only once some other module has loaded game2d.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+import sys
+
+# The names of the keys that Wave.inputs reads, in a fixed order
+WAVE_KEYS = ('left','right','up','spacebar')
+
+
+def keys_to_mask(keys):
+    """
+    Returns the keys as a bit mask, with bit i set if WAVE_KEYS[i] is down.
+
+    Keys that Wave does not read are ignored.
+
+    Parameter keys: the keys that are down
+    Precondition: keys is a collection of strings
+    """
+    mask = 0
+    for i in range(len(WAVE_KEYS)):
+        if WAVE_KEYS[i] in keys:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_keys(mask):
+    """
+    Returns the tuple of keys in a bit mask made by keys_to_mask.
+
+    Parameter mask: the bit mask
+    Precondition: mask is an int between 0 and 2**len(WAVE_KEYS)-1
+    """
+    assert isinstance(mask,int) and 0 <= mask < 1 << len(WAVE_KEYS)
+    return tuple(WAVE_KEYS[i] for i in range(len(WAVE_KEYS)) if mask & (1 << i))
+
+
+# The frozenset of keys for every bit mask, so scripts of masks share them
+_MASK_KEYSETS = [frozenset(mask_to_keys(m)) for m in range(1 << len(WAVE_KEYS))]
+
+
+class ScriptedInput(object):
+    """
+    A class that replays a script of key presses in place of GInput.
+
+    The script is a list with one entry per frame. Each entry is a collection
+    of key names (like {'left','spacebar'}) that are held down during that
+    frame, or the same keys as a bit mask from keys_to_mask. A bytes object is
+    therefore a compact script with one mask per frame. Call advance() once
+    per frame, before Wave.update, to move to the next entry. Once the script
+    runs out, no keys are down.
+
+    The keys can also be set directly with set_keys, which is how agents and
+    servers drive a wave frame by frame.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _script: the keys that are down in each frame
+    # Invariant: _script is a list of frozensets of strings, possibly empty
+    #
+    # Attribute _frame: the index of the current frame in _script
+    # Invariant: _frame is an int >= -1
+    #
+    # Attribute _down: the keys that are down in the current frame
+    # Invariant: _down is a frozenset of strings
+    #
+    # Attribute _previous: the keys that were down in the frame before
+    # Invariant: _previous is a frozenset of strings
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_frame(self):
+        """
+        This method is a getter for the index of the current frame.
+
+        Parameter self: current instance of the class
+        """
+        return self._frame
+
+    def is_finished(self):
+        """
+        This method returns True if every frame of the script has been used.
+
+        Parameter self: current instance of the class
+        """
+        return self._frame >= len(self._script)-1
+
+    def set_keys(self, keys):
+        """
+        This method sets the keys that are down in the current frame.
+
+        Parameter keys: the keys to hold down
+        Precondition: keys is a collection of strings
+        """
+        self._previous = self._down
+        self._down = frozenset(keys)
+
+    # INITIALIZER TO LOAD A SCRIPT
+    def __init__(self, script=None):
+        """
+        Initializes the input with a script of key presses.
+
+        Parameter script: the keys that are down in each frame
+        Precondition: script is a list of collections of strings or of bit
+        masks, a bytes object of bit masks, or None
+        """
+        assert script == None or isinstance(script,(list,bytes,bytearray))
+        self._script = []
+        if script != None:
+            for keys in script:
+                if isinstance(keys,int):
+                    self._script.append(_MASK_KEYSETS[keys])
+                else:
+                    self._script.append(frozenset(keys))
+        self._frame = -1
+        self._down = frozenset()
+        self._previous = frozenset()
+
+    # METHODS FROM GINPUT
+    def is_key_down(self, key):
+        """
+        Returns True if the key is held down in the current frame.
+
+        Parameter key: the key name (as used by GInput)
+        Precondition: key is a string
+        """
+        return key in self._down
+
+    def is_key_pressed(self, key):
+        """
+        Returns True if the key went down in this frame (it was up the frame
+        before).
+
+        Parameter key: the key name (as used by GInput)
+        Precondition: key is a string
+        """
+        return key in self._down and not key in self._previous
+
+    @property
+    def key_count(self):
+        """
+        The number of keys held down in the current frame.
+        """
+        return len(self._down)
+
+    def keys(self):
+        """
+        Returns the keys held down in the current frame.
+
+        Parameter self: current instance of the class
+        """
+        return tuple(self._down)
+
+    # ADDITIONAL METHODS
+    def advance(self):
+        """
+        This method moves to the next frame of the script and returns False if
+        the script had already run out.
+
+        Parameter self: current instance of the class
+        """
+        self._frame += 1
+        if self._frame < len(self._script):
+            self.set_keys(self._script[self._frame])
+            return True
+        self.set_keys(())
+        return False
+
+
+class NullSound(object):
+    """
+    A class that stands in for a game2d Sound without an audio device.
+
+    It only counts how many times it was played.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute source: the name of the sound file it stands in for
+    # Invariant: source is a string
+    #
+    # Attribute _plays: the number of times the sound was played
+    # Invariant: _plays is an int >= 0
+
+    def getter_plays(self):
+        """
+        This method is a getter for the number of times the sound was played.
+
+        Parameter self: current instance of the class
+        """
+        return self._plays
+
+    def __init__(self, source):
+        """
+        Initializes a silent sound.
+
+        Parameter source: the name of the sound file
+        Precondition: source is a string
+        """
+        assert isinstance(source,str)
+        self.source = source
+        self._plays = 0
+
+    def play(self):
+        """
+        Counts a play of the sound.
+
+        Parameter self: current instance of the class
+        """
+        self._plays += 1
+
+
+class NullSprite(object):
+    """
+    A class that stands in for a game2d GSprite without a texture.
+
+    It keeps the attributes that Wave.draw reads and writes (x, y, frame and
+    count), and drawing it does nothing.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute x: the x coordinate of the center
+    # Invariant: x is an int or float
+    #
+    # Attribute y: the y coordinate of the center
+    # Invariant: y is an int or float
+    #
+    # Attribute frame: the current animation frame
+    # Invariant: frame is an int between 0 and count-1
+    #
+    # Attribute count: the number of animation frames
+    # Invariant: count is an int > 0
+
+    def __init__(self, x=0, y=0, count=1, **keywords):
+        """
+        Initializes a sprite that is never drawn.
+
+        It accepts (and ignores) the same keywords as GSprite.
+
+        Parameter x: the x coordinate of the center
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center
+        Precondition: y is an int or float
+
+        Parameter count: the number of animation frames
+        Precondition: count is an int > 0
+        """
+        self.x = x
+        self.y = y
+        self.frame = 0
+        self.count = count
+
+    def draw(self, view):
+        """
+        Does nothing, as there is no window to draw to.
+
+        Parameter view: the view that would be drawn to
+        Precondition: None
+        """
+        pass
+
+
+class NullAssets(object):
+    """
+    A class that stands in for the asset registry (see assets.py) of a
+    headless wave.
+
+    It makes a new NullSound or NullSprite for every request, so the play
+    counts of one headless wave are never mixed up with another's.
+    """
+
+    def sound(self, name):
+        """
+        Returns a new NullSound for a sound file.
+
+        Parameter name: the name of the sound file
+        Precondition: name is a string
+        """
+        return NullSound(name)
+
+    def sprite(self, name):
+        """
+        Returns a new NullSprite with the frames of the ship explosion.
+
+        Parameter name: the name of the sprite sheet
+        Precondition: name is a string
+        """
+        return NullSprite(source=name,width=2*SHIP_RADIUS,
+            height=2*SHIP_RADIUS,format=(2,4),count=8)
+
+
+class NullView(object):
+    """
+    A class that stands in for a game2d GView when drawing a headless wave.
+
+    Bodies and null sprites do nothing when drawn, so drawing to a NullView
+    only runs the Python side of Wave.draw. This is what the benchmarks use to
+    time Wave.draw without a window.
+    """
+    pass
+
+
+def is_input(input):
+    """
+    Returns True if input is a ScriptedInput, or a game2d GInput.
+
+    There can be no GInput until game2d is imported, so game2d is looked up
+    among the loaded modules instead of being imported here.
+
+    Parameter input: the value to check
+    Precondition: None
+    """
+    if isinstance(input,ScriptedInput):
+        return True
+    game2d = sys.modules.get('game2d')
+    return game2d != None and isinstance(input,game2d.GInput)
+
+
+def is_view(view):
+    """
+    Returns True if view is a NullView, or a game2d GView.
+
+    Like is_input, this does not import game2d.
+
+    Parameter view: the value to check
+    Precondition: None
+    """
+    if isinstance(view,NullView):
+        return True
+    game2d = sys.modules.get('game2d')
+    return game2d != None and isinstance(view,game2d.GView)
+
+
+def simulate(wave, script, maxframes, dt=1/60):
+    """
+    Plays a headless wave with a script of key presses and returns the number
+    of frames that were played.
+
+    It stops once the wave is won or lost, or after maxframes frames. If the
+    script is shorter than maxframes, the remaining frames are played with no
+    keys down.
+
+    Parameter wave: the wave to play
+    Precondition: wave is a Wave object
+
+    Parameter script: the keys that are down in each frame
+    Precondition: script is a ScriptedInput, or a script as accepted by
+    ScriptedInput
+
+    Parameter maxframes: the most frames to play
+    Precondition: maxframes is an int >= 0
+
+    Parameter dt: the time to pass to Wave.update each frame
+    Precondition: dt is an int or float > 0
+    """
+    assert isinstance(maxframes,int) and maxframes >= 0
+    if not isinstance(script,ScriptedInput):
+        script = ScriptedInput(script)
+    frames = 0
+    while frames < maxframes and wave.getter_for_winlose() == None:
+        script.advance()
+        wave.update(dt,script)
+        frames += 1
+    return frames
@@ -0,0 +1,101 @@
+"""
+Label cache module for Planetoids
+
+This module contains a cache of text labels. Making a GLabel lays out its text,
+which is slow, so the labels that Planetoids shows every frame (the title, the
+messages and the YOU WIN and YOU LOSE screens) are made once by a LabelCache
+and the same GLabel is handed out after that.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from game2d import *
+
+
+class LabelCache(object):
+    """
+    A class that makes each text label once and hands the same GLabel out
+    after that.
+
+    Laying out the text of a GLabel is slow, so a label that is shown every
+    frame (like the YOU WIN and YOU LOSE screens) should not be made again
+    every frame. Labels are keyed by everything they are made from, so a
+    label is only made again when its text, font, size, position or color
+    changes.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _labels: the labels made so far
+    # Invariant: _labels is a dict mapping (text, font_name, font_size, x, y,
+    #            linecolor) tuples to GLabels
+    #
+    # Attribute _builds: the number of labels made
+    # Invariant: _builds is an int >= 0
+    #
+    # Attribute _hits: the number of requests served by a label already made
+    # Invariant: _hits is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_builds(self):
+        """
+        This method is a getter for the number of labels made.
+
+        Parameter self: current instance of the class
+        """
+        return self._builds
+
+    def getter_hits(self):
+        """
+        This method is a getter for the number of requests served by a label
+        that was already made.
+
+        Parameter self: current instance of the class
+        """
+        return self._hits
+
+    # INITIALIZER TO MAKE AN EMPTY CACHE
+    def __init__(self):
+        """
+        Initializes an empty cache.
+        """
+        self._labels = {}
+        self._builds = 0
+        self._hits = 0
+
+    # ADDITIONAL METHODS
+    def label(self, text, font_name, font_size, x, y, linecolor='white'):
+        """
+        This method returns the GLabel with the given text and look, making
+        it only if it was not made before.
+
+        The label is shared, so the caller must not change it.
+
+        Parameter text: the text of the label
+        Precondition: text is a string
+
+        Parameter font_name: the font file
+        Precondition: font_name is a string
+
+        Parameter font_size: the font size
+        Precondition: font_size is an int or float > 0
+
+        Parameter x: the x coordinate of the center
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center
+        Precondition: y is an int or float
+
+        Parameter linecolor: the color of the text
+        Precondition: linecolor is a color name
+        """
+        assert isinstance(text,str) and isinstance(font_name,str)
+        key = (text,font_name,font_size,x,y,linecolor)
+        label = self._labels.get(key)
+        if label != None:
+            self._hits += 1
+            return label
+        self._builds += 1
+        label = GLabel(text=text,font_size=font_size,x=x,y=y,
+            font_name=font_name,linecolor=linecolor)
+        self._labels[key] = label
+        return label
@@ -12,6 +12,10 @@ all need an additional attribute representing this fact). But for the most part,
 that is all they need. You will only need more complex models if you are adding
 advanced features like scoring.
 
+A Wave does not play on these classes directly. It simulates on the small
+bodies from bodies.py, which share the same physics, and uses the BodyView at
+the bottom of this module to bind each body to a drawable when it is drawn.
+
 You are free to add even more models to this module. You may wish to do this
 when you add new features to your game, such as power-ups. If you are unsure
 about whether to make a new class or not, please ask on Ed Discussions.
@@ -23,15 +27,16 @@ Emily Wei (ejw235) and Amira Razack (arr258)
 from consts import *
 from game2d import *
 from introcs import *
+from bodies import *
 import math
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
 # consts.py. If you need extra information from Gameplay, then it should be a
 # parameter in your method, and Wave should pass it as a argument when it calls
-# the method.
+# the method. (bodies.py follows the same rule, so the physics mixins are fine.)
 
 
-class Bullet(GEllipse):
+class Bullet(BulletPhysics, GEllipse):
     """
     A class representing a bullet from the ship
 
@@ -54,21 +59,8 @@ class Bullet(GEllipse):
     detect collisions in this class, you may find it easier to process
     collisions in wave.py.
     """
-    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-
-    # Attribute _velocity: the direction and speed the bullet is traveling
-    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
-
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getter_for_velocity(self):
-        """
-        This method is a getter for the velocity of the bullet.
-
-        Parameter self: current instance of the class
-
-        self._velocity: The velocity vector of the bullet velocity.
-        """
-        return self._velocity
+    # The velocity, getter_for_velocity and the collision methods
+    # (dist_between_center, bullet_isCollided) are in BulletPhysics.
 
     # INITIALIZER TO SET THE POSITION AND VELOCITY
     def __init__(self, position, direction):
@@ -89,43 +81,10 @@ class Bullet(GEllipse):
         assert isinstance(direction,Vector2)
         super().__init__(x=position[0],y=position[1],width=2*BULLET_RADIUS,
             height=2*BULLET_RADIUS,fillcolor=BULLET_COLOR)
-        velocity_x = direction.x * BULLET_SPEED
-        velocity_y = direction.y * BULLET_SPEED
-        self._velocity = Vector2(velocity_x, velocity_y)
-
-    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
-    def dist_between_center(self, asteroid):
-        """
-        This method returns the distance between the center of the bullet and
-        asteroid.
+        self.init_motion(direction)
 
-        Parameter self: current instance of the class
-        Parameter asteroid: any Asteroid object
-        Precondition: asteroid is an Asteroid object
-        """
-        assert isinstance(asteroid,Asteroid)
-        return Point2.distance(Point2(self.x,self.y),Point2(asteroid.getter_x(),
-             asteroid.getter_y()))
-
-    def bullet_isCollided(self, asteroid):
-        """
-        This method returns whether or not a bullet has collided with an
-        asteroid using the dist_between_center() helper function.
 
-        Parameter self: current instance of the class
-        Parameter asteroid: an Asteroid object that is either overlapping or not
-        with the bullet
-        Precondition: asteroid is an Asteroid object
-        """
-        assert isinstance(asteroid, Asteroid)
-        sum_radii = BULLET_RADIUS + (asteroid.getter_width() / 2)
-        if self.dist_between_center(asteroid) < sum_radii:
-            return True
-        else:
-            return False
-
-
-class Ship(GImage):
+class Ship(ShipPhysics, GImage):
     """
     A class to represent the game ship.
 
@@ -148,52 +107,8 @@ class Ship(GImage):
     detect collisions in this class, you may find it easier to process collisions
     in wave.py.
     """
-    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-
-    # Attribute _velocity: the direction and speed the ship is traveling
-    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
-    #
-    # Attribute _facing: the direction the ship is facing
-    # Invariant: _wave is a Vector2 object and objects of this class represent a 2D vector
-
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getter_for_impulse(self):
-        """
-        This method is the getter for the ship's impulse.
-
-        Parameter self: current instance of the class
-
-        self._facing: The vector for the direction the ship is facing.
-        SHIP_IMPULSE: The ship's change in momentum constant
-        found in consts.py.
-        """
-        return self._facing.__mul__(SHIP_IMPULSE)
-
-    def getter_for_facing(self):
-        """
-        This method is the getter for the ship's direction value.
-
-        Parameter self: current instance of the class
-
-        self._facing: The vector for the direction the ship is facing.
-        """
-        return self._facing
-
-    def get_theta(self, angle):
-        """
-        This method returns the unit vector using the value of theta
-        converted from degrees to radians.
-
-        Parameter self: current instance of the class
-
-        Parameter: angle
-        Precondition: angle can be any number
-
-        theta: The angle converted to radians.
-        """
-        assert isinstance(angle,int) or isinstance(angle,float)
-        theta=angle * (math.pi/180)
-        return Vector2(math.cos(theta),math.sin(theta))
+    # The velocity, facing vector, their getters, turn and the collision
+    # methods (dist_between_center, isCollided) are in ShipPhysics.
 
     # INITIALIZER TO CREATE A NEW SHIP
     def __init__(self,position,angle):
@@ -213,68 +128,10 @@ class Ship(GImage):
         assert isinstance(angle,float) or isinstance(angle,int)
         super().__init__(x=position[0],y=position[1],width=2*SHIP_RADIUS,height=
             2*SHIP_RADIUS,source=SHIP_IMAGE)
-        self.angle=angle
-        self._velocity=Vector2(0,0)
-        self._facing=self.get_theta(self.angle)
-
-    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
-    def turn(self,angle):
-        """
-        This method updates the angle and facing vector.
-
-        Parameter self: current instance of the class
-
-        Parameterangle: how much the ship is rotated
-        Precondition: angle can be any number
+        self.init_motion(angle)
 
-        theta: The angle converted to radians.
-
-        self._facing: The vector for the direction that the ship is facing.
-        """
-        assert isinstance(angle, int) or isinstance(angle, float)
-        self.angle=angle
-        theta=self.angle*(math.pi/180)
-        self._facing=Vector2(math.cos(theta),math.sin(theta))
-
-    def dist_between_center(self, asteroid):
-        """
-        This method returns the distance between the centers of the asteroid
-        and ship object.
-
-        Parameter self: current instance of the class
-
-        Parameter: an asteroid
-        Precondition: asteroid is a single GImage Asteroid object
-        """
-        assert isinstance(asteroid,Asteroid)
-        return Point2.distance(Point2(self.x,self.y),Point2(asteroid.getter_x(),
-             asteroid.getter_y()))
-
-    def isCollided(self, asteroid):
-        """
-        This method returns True if the distance between the two centers of
-        the ship and asteroid was less than their combined radii and False
-        if the distance was greater.
-
-        Parameter self: current instance of the class
-
-        Parameter: an asteroid
-        Precondition: asteroid is a single GImage Asteroid object
-
-        sum_radii: The sum of the ship radius constant in consts.py and
-        the radius of the asteroid.
-
-        SHIP_RADIUS: The ship radius constant from consts.py.
-        """
-        assert isinstance(asteroid, Asteroid)
-        sum_radii = SHIP_RADIUS + (asteroid.getter_width() / 2)
-        if self.dist_between_center(asteroid) < sum_radii:
-            return True
-        else:
-            return False
 
-
-class Asteroid(GImage):
+class Asteroid(AsteroidPhysics, GImage):
     """
     A class to represent a single asteroid.
 
@@ -298,70 +155,8 @@ class Asteroid(GImage):
     method to detect collisions in this class, you may find it easier to process
     collisions in wave.py.
     """
-    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-
-    # Attribute _velocity: the direction and speed the asteroid is travelling
-    # Invariant: _velocity is a Vector2 object and objects of this class represent a 2D vector
-
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def get_velocity(self):
-        """
-        This method is a getter for the velocity of the asteroid.
-
-        Parameter self: current instance of the class
-
-        self._velocity: The velocity vector of the asteroid.
-        """
-        return self._velocity
-
-    def get_size(self):
-        """
-        This method is a getter for the size of the asteroid and returns
-        the categorization of the asteroid's size.
-
-        Parameter self: current instance of the class
-
-        self.width: The width of the entire asteroid.
-
-        SMALL_RADIUS: The radius of the small asteroid found in consts.py.
-        MEDIUM_RADIUS: The radium of the medium asteroid found in consts.py
-        """
-        if (self.width == 2*SMALL_RADIUS):
-            return 'small'
-        elif (self.width == 2*MEDIUM_RADIUS):
-            return 'medium'
-        else:
-            return 'large'
-
-    def getter_x(self):
-        """
-        This method is a getter for the x position of the asteroid.
-
-        Parameter self: current instance of the class
-
-        self.x: The x position of the asteroid.
-        """
-        return self.x
-
-    def getter_y(self):
-        """
-        This method is a getter for the y position of the asteroid.
-
-        Parameter self: current instance of the class
-
-        self.y: The y position of the asteroid.
-        """
-        return self.y
-
-    def getter_width(self):
-        """
-        This method is a getter for width of the asteroid.
-
-        Parameter self: current instance of the class
-
-        self.width: The width of the entire asteroid.
-        """
-        return self.width
+    # The velocity, the getters for size, position and width, and
+    # resultant_vectors are in AsteroidPhysics.
 
     # INITIALIZER TO CREATE A NEW ASTEROID
     def __init__(self, size, position, direction):
@@ -384,60 +179,201 @@ class Asteroid(GImage):
         assert isinstance(position[1],int) or isinstance(position[1],float)
         assert isinstance(size,str) and len(position) == 2
         assert isinstance(direction, list) or isinstance(direction, Vector2)
-        zero_vector = Vector2(0,0)
-        if isinstance(direction, list):
-            direction_vect = Vector2(direction[0],direction[1])
-        elif isinstance(direction, Vector2):
-            direction_vect = Vector2(direction.x,direction.y)
         if (size == 'small'):
             super().__init__(x=position[0],y=position[1],width=2*SMALL_RADIUS,
                 height=2*SMALL_RADIUS,source=SMALL_IMAGE)
-            if (direction_vect.__eq__(zero_vector)):
-                self._velocity = zero_vector
-            else:
-                self._velocity=direction_vect.normalize().__mul__(SMALL_SPEED)
         if (size == 'medium'):
             super().__init__(x=position[0],y=position[1],width=2*MEDIUM_RADIUS,
                 height=2*MEDIUM_RADIUS,source=MEDIUM_IMAGE)
-            if (direction_vect.__eq__(zero_vector)):
-                self._velocity = zero_vector
-            else:
-                self._velocity=direction_vect.normalize().__mul__(MEDIUM_SPEED)
         if (size == 'large'):
             super().__init__(x=position[0],y=position[1],width=2*LARGE_RADIUS,
                 height=2*LARGE_RADIUS,source=LARGE_IMAGE)
-            if (direction_vect.__eq__(zero_vector)):
-                self._velocity = zero_vector
-            else:
-                self._velocity=direction_vect.normalize().__mul__(LARGE_SPEED)
+        self.init_motion(size,direction)
+
+
+class BodyView(object):
+    """
+    A class that draws bodies (see bodies.py) with game2d drawables.
+
+    Wave simulates on bodies, which can't draw themselves. When a body is
+    drawn, this class binds it to a drawable (a GImage for the ship and the
+    asteroids, a GEllipse for bullets), copies the position and angle over,
+    and returns the drawable to draw. Each body keeps the same drawable for
+    as long as it is drawn every frame, so drawables are only made for new
+    bodies. The drawables of bodies that were not drawn in the last frame are
+    unbound by sweep and kept as spares (up to FRAGMENT_RESERVE of each kind),
+    which the next new bodies of that kind reuse. After splits, restock makes
+    a few spare asteroid drawables each frame to replace the fragments, so
+    the fragments of the next chain of splits can be drawn without making
+    many drawables in one frame.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _drawables: the drawables bound before the last sweep, by the
+    #           id of their body (the body is kept too, so the id can't be
+    #           reused)
+    # Invariant: _drawables is a dict mapping ints to (body, drawable) tuples
+    #
+    # Attribute _bound: the drawables bound since the last sweep
+    # Invariant: _bound is a dict like _drawables
+    #
+    # Attribute _spares: the unbound drawables, by the image file they show
+    #           (None for bullets)
+    # Invariant: _spares is a dict mapping image file names or None to lists
+    #            of at most FRAGMENT_RESERVE drawables
+    #
+    # Attribute _handed: the fragments the fragment factory had handed out
+    #           at the last restock
+    # Invariant: _handed is an int >= 0
+    #
+    # Attribute _owed: the fragments that restock has not made a spare
+    #           drawable for yet
+    # Invariant: _owed is an int >= 0
 
-    # ADDITIONAL METHODS (MOVEMENT, COLLISIONS, ETC)
-    def resultant_vectors(self):
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_count(self):
         """
-        This method creates three asteroids when medium and large asteroids
-        break up.
+        This method returns the number of drawables kept at the last sweep.
 
         Parameter self: current instance of the class
+        """
+        return len(self._drawables)
+
+    # INITIALIZER TO MAKE AN EMPTY VIEW
+    def __init__(self):
+        """
+        Initializes a view with no drawables.
+        """
+        self._drawables = {}
+        self._bound = {}
+        self._spares = {}
+        self._handed = 0
+        self._owed = 0
+
+    # ADDITIONAL METHODS
+    def bind(self, body, x=None, y=None):
+        """
+        This method returns the drawable of body, moved to (x,y) and turned
+        to the angle of the body.
+
+        Parameter body: the body to draw
+        Precondition: body is a ShipBody, AsteroidBody or BulletBody
+
+        Parameter x: the x coordinate to draw at (None means body.x)
+        Precondition: x is None, an int or a float
 
-        angle: Starting angle of 120 that is incremented by 120 to produce three
-        asteroids with different angles.
+        Parameter y: the y coordinate to draw at (None means body.y)
+        Precondition: y is None, an int or a float
+        """
+        key = id(body)
+        entry = self._bound.get(key)
+        if entry == None:
+            entry = self._drawables.get(key)
+            if entry == None or entry[0] is not body:
+                entry = (body,self._make(body))
+            self._bound[key] = entry
+        drawable = entry[1]
+        drawable.x = body.x if x == None else x
+        drawable.y = body.y if y == None else y
+        if isinstance(body,ShipPhysics):
+            drawable.angle = body.angle
+        return drawable
 
-        vx: The x position of the velocity vector.
-        vy: The y position of the velocity vector.
+    def sweep(self):
+        """
+        This method unbinds the drawables of every body that was not bound
+        since the last sweep, keeping them as spares. Wave calls this at the
+        end of every draw.
 
-        listi: A list of the three resultant vectors that is returned.
+        Parameter self: current instance of the class
         """
-        vx=self._velocity.x
-        vy=self._velocity.y
-        listi=[]
-        angle=120
-        for i in range(3):
-            if vx==0.0 and vy==0.0:
-                listi.append(Vector2(0,0))
+        if len(self._drawables) > 0:
+            for key in self._drawables:
+                if not key in self._bound:
+                    entry = self._drawables[key]
+                    spares = self._spares.setdefault(_source(entry[0]),[])
+                    if len(spares) < FRAGMENT_RESERVE:
+                        spares.append(entry[1])
+        self._drawables = self._bound
+        self._bound = {}
+
+    def restock(self, handed, budget=FRAGMENT_REFILL):
+        """
+        This method makes at most budget spare drawables for medium and small
+        asteroids, alternating between the two, to replace the fragments
+        handed out by the fragment factory since the last restock (see
+        AsteroidFactory.refill). A wave with no splits makes none.
+
+        Parameter handed: the number of fragments the factory has handed out
+        (see AsteroidFactory.getter_handed)
+        Precondition: handed is an int >= the handed of the last restock
+
+        Parameter budget: the most drawables to make
+        Precondition: budget is an int >= 0
+        """
+        self._owed += handed-self._handed
+        self._handed = handed
+        if self._owed == 0:
+            return
+        budget = min(budget,self._owed)
+        wanted = budget
+        made = True
+        while budget > 0 and made:
+            made = False
+            for size, source in ((MEDIUM_ASTEROID,MEDIUM_IMAGE),
+                    (SMALL_ASTEROID,SMALL_IMAGE)):
+                spares = self._spares.setdefault(source,[])
+                if budget > 0 and len(spares) < FRAGMENT_RESERVE:
+                    radius = asteroid_radius(size)
+                    spares.append(GImage(x=0,y=0,width=2*radius,
+                        height=2*radius,source=source))
+                    budget -= 1
+                    made = True
+        # Once every reserve is full, nothing more is owed
+        self._owed = self._owed-wanted if budget == 0 else 0
+
+    def _make(self, body):
+        """
+        Returns a drawable for body, reusing a spare one if there is one.
+
+        Parameter body: the body to make a drawable for
+        Precondition: body is a ShipBody, AsteroidBody or BulletBody
+        """
+        spares = self._spares.get(_source(body))
+        if spares:
+            return spares.pop()
+        if isinstance(body,ShipPhysics):
+            return GImage(x=body.x,y=body.y,width=body.width,
+                height=body.height,source=SHIP_IMAGE,angle=body.angle)
+        elif isinstance(body,AsteroidPhysics):
+            size = body.get_size()
+            if size == SMALL_ASTEROID:
+                source = SMALL_IMAGE
+            elif size == MEDIUM_ASTEROID:
+                source = MEDIUM_IMAGE
             else:
-                listi.append(Vector2(vx*math.cos(math.radians(angle))-vy*
-                    math.sin(math.radians(angle)),
-                    vx*math.sin(math.radians(angle))+vy*math.cos
-                    (math.radians(angle))).normalize())
-            angle+=120
-        return listi
+                source = LARGE_IMAGE
+            return GImage(x=body.x,y=body.y,width=body.width,
+                height=body.height,source=source)
+        assert isinstance(body,BulletPhysics), repr(body)+' is not a body'
+        return GEllipse(x=body.x,y=body.y,width=body.width,
+            height=body.height,fillcolor=BULLET_COLOR)
+
+
+def _source(body):
+    """
+    Returns the image file that a body is drawn with, or None for a bullet.
+
+    Parameter body: the body
+    Precondition: body is a ShipBody, AsteroidBody or BulletBody
+    """
+    if isinstance(body,ShipPhysics):
+        return SHIP_IMAGE
+    elif isinstance(body,AsteroidPhysics):
+        size = body.get_size()
+        if size == SMALL_ASTEROID:
+            return SMALL_IMAGE
+        elif size == MEDIUM_ASTEROID:
+            return MEDIUM_IMAGE
+        return LARGE_IMAGE
+    return None
@@ -0,0 +1,376 @@
+"""
+Object pool module for Planetoids
+
+This module contains a pool of bullets. Instead of making a new bullet for
+every shot and letting the old ones be garbage collected, Wave asks the pool
+for a bullet when the ship fires and hands it back when the bullet leaves the
+screen or hits an asteroid. A returned bullet is reset in place (position and
+velocity) the next time it is handed out.
+
+The pool is bounded: it never has more than a fixed number of bullets live at
+once, and it never keeps more than that many bullets in total. It counts how
+many requests were served by a recycled bullet (hits) and how many needed a
+new one (misses), so that the hit rate shows whether steady play allocates.
+
+It also contains the factory that makes the fragments of broken asteroids.
+It hands out spare asteroids of the right size, reset in place, and makes
+new ones by cloning a prototype of each size when it runs out. Destroyed
+asteroids become spares, and the fragments handed out are replaced a few at a
+time each tick, so a chain of splits in one frame makes few (if any) new
+objects. A wave that never splits an asteroid never makes a spare.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from introcs import Vector2
+
+# The direction of a spare asteroid that is waiting to be used
+_NO_DIRECTION = Vector2(0,0)
+
+
+class BulletPool(object):
+    """
+    A class representing a bounded pool of bullets.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _bulletclass: the class used to make new bullets
+    # Invariant: _bulletclass is BulletBody (or Bullet)
+    #
+    # Attribute _maxlive: the most bullets that may be live at once
+    # Invariant: _maxlive is an int > 0
+    #
+    # Attribute _free: the bullets waiting to be reused
+    # Invariant: _free is a list of bullets with length <= _maxlive
+    #
+    # Attribute _live: the number of bullets handed out and not yet released
+    # Invariant: _live is an int between 0 and _maxlive
+    #
+    # Attribute _hits: the number of acquires served by a recycled bullet
+    # Invariant: _hits is an int >= 0
+    #
+    # Attribute _misses: the number of acquires that made a new bullet
+    # Invariant: _misses is an int >= 0
+    #
+    # Attribute _refused: the number of acquires refused at _maxlive
+    # Invariant: _refused is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_live(self):
+        """
+        This method is a getter for the number of live bullets.
+
+        Parameter self: current instance of the class
+        """
+        return self._live
+
+    def getter_maxlive(self):
+        """
+        This method is a getter for the most bullets that may be live at once.
+
+        Parameter self: current instance of the class
+        """
+        return self._maxlive
+
+    def getter_hits(self):
+        """
+        This method is a getter for the number of acquires served by a
+        recycled bullet.
+
+        Parameter self: current instance of the class
+        """
+        return self._hits
+
+    def getter_misses(self):
+        """
+        This method is a getter for the number of acquires that had to make a
+        new bullet.
+
+        Parameter self: current instance of the class
+        """
+        return self._misses
+
+    def getter_refused(self):
+        """
+        This method is a getter for the number of acquires that were refused
+        because the most bullets were already live.
+
+        Parameter self: current instance of the class
+        """
+        return self._refused
+
+    def getter_hitrate(self):
+        """
+        This method returns the fraction of acquires that reused a bullet, or
+        1.0 if no bullet was ever made.
+
+        Parameter self: current instance of the class
+        """
+        total = self._hits+self._misses
+        if total == 0:
+            return 1.0
+        return self._hits/total
+
+    # INITIALIZER TO MAKE AN EMPTY POOL
+    def __init__(self, bulletclass, maxlive=MAX_BULLETS, prefill=0):
+        """
+        Initializes an empty pool.
+
+        Parameter bulletclass: the class used to make new bullets
+        Precondition: bulletclass is BulletBody (or Bullet)
+
+        Parameter maxlive: the most bullets that may be live at once
+        Precondition: maxlive is an int > 0
+
+        Parameter prefill: the number of bullets to make up front
+        Precondition: prefill is an int between 0 and maxlive
+        """
+        assert isinstance(maxlive,int) and maxlive > 0
+        assert isinstance(prefill,int) and 0 <= prefill <= maxlive
+        self._bulletclass = bulletclass
+        self._maxlive = maxlive
+        self._free = []
+        self._live = 0
+        self._hits = 0
+        self._misses = 0
+        self._refused = 0
+        for i in range(prefill):
+            self._free.append(self._make([0,0],Vector2(1,0)))
+
+    # ADDITIONAL METHODS
+    def acquire(self, position, direction):
+        """
+        This method returns a bullet at position moving in direction, or None
+        if the most bullets are already live.
+
+        Parameter position: the x and y coordinates of the bullet
+        Precondition: position is a list of ints or floats with a length of 2
+
+        Parameter direction: the direction of the bullet
+        Precondition: direction is a Vector2 object
+        """
+        if self._live >= self._maxlive:
+            self._refused += 1
+            return None
+        self._live += 1
+        if self._free != []:
+            self._hits += 1
+            bullet = self._free.pop()
+            bullet.reset(position,direction)
+            return bullet
+        self._misses += 1
+        return self._make(position,direction)
+
+    def release(self, bullet):
+        """
+        This method gives a bullet back to the pool.
+
+        Parameter bullet: a bullet returned by acquire that is no longer used
+        Precondition: bullet is a bullet from this pool
+        """
+        assert self._live > 0
+        self._live -= 1
+        self._free.append(bullet)
+
+    def reset_counters(self):
+        """
+        This method sets the hit, miss and refused counters back to 0.
+
+        Parameter self: current instance of the class
+        """
+        self._hits = 0
+        self._misses = 0
+        self._refused = 0
+
+    def _make(self, position, direction):
+        """
+        Returns a new bullet.
+
+        Parameter position: the x and y coordinates of the bullet
+        Precondition: position is a list of ints or floats with a length of 2
+
+        Parameter direction: the direction of the bullet
+        Precondition: direction is a Vector2 object
+        """
+        return self._bulletclass(position,direction)
+
+
+class AsteroidFactory(object):
+    """
+    A class that makes the medium and small asteroids of splits.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _prototypes: an asteroid of each fragment size to clone
+    # Invariant: _prototypes is a dict mapping MEDIUM_ASTEROID and
+    #            SMALL_ASTEROID to AsteroidBody objects
+    #
+    # Attribute _spares: the asteroids waiting to be reused, by size
+    # Invariant: _spares is a dict with the keys of _prototypes, mapping to
+    #            lists of at most _reserve AsteroidBody objects of that size
+    #
+    # Attribute _reserve: the most spares kept of each size
+    # Invariant: _reserve is an int >= 0
+    #
+    # Attribute _owed: the fragments handed out that refill has not replaced
+    #           with a spare yet
+    # Invariant: _owed is an int >= 0
+    #
+    # Attribute _handed: the number of fragments handed out so far
+    # Invariant: _handed is an int >= 0
+    #
+    # Attribute _reused: the number of fragments that were a spare
+    # Invariant: _reused is an int >= 0
+    #
+    # Attribute _cloned: the number of fragments cloned on the spot
+    # Invariant: _cloned is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_reused(self):
+        """
+        This method is a getter for the number of fragments that were a spare.
+
+        Parameter self: current instance of the class
+        """
+        return self._reused
+
+    def getter_cloned(self):
+        """
+        This method is a getter for the number of fragments that had to be
+        cloned when they were needed.
+
+        Parameter self: current instance of the class
+        """
+        return self._cloned
+
+    def getter_handed(self):
+        """
+        This method is a getter for the number of fragments handed out so
+        far. Unlike the reused and cloned counters, it is never reset.
+
+        Parameter self: current instance of the class
+        """
+        return self._handed
+
+    def getter_spares(self, size):
+        """
+        This method returns the number of spares of a size.
+
+        Parameter size: the asteroid size
+        Precondition: size is MEDIUM_ASTEROID or SMALL_ASTEROID
+        """
+        return len(self._spares[size])
+
+    # INITIALIZER TO MAKE AN EMPTY FACTORY
+    def __init__(self, asteroidclass, reserve=FRAGMENT_RESERVE, prefill=0):
+        """
+        Initializes a factory.
+
+        Parameter asteroidclass: the class of the prototypes
+        Precondition: asteroidclass is AsteroidBody
+
+        Parameter reserve: the most spares to keep of each size
+        Precondition: reserve is an int >= 0
+
+        Parameter prefill: the number of spares of each size to make up front
+        Precondition: prefill is an int between 0 and reserve
+        """
+        assert isinstance(reserve,int) and reserve >= 0
+        assert isinstance(prefill,int) and 0 <= prefill <= reserve
+        self._prototypes = {}
+        self._spares = {}
+        for size in (MEDIUM_ASTEROID,SMALL_ASTEROID):
+            self._prototypes[size] = asteroidclass(size,[0,0],Vector2(1,0))
+            self._spares[size] = []
+        self._reserve = reserve
+        self._owed = 0
+        self._handed = 0
+        self._reused = 0
+        self._cloned = 0
+        self._make(2*prefill)
+
+    # ADDITIONAL METHODS
+    def acquire(self, size, position, direction):
+        """
+        This method returns an asteroid of a size at position moving in
+        direction (see AsteroidPhysics.reset).
+
+        Parameter size: the asteroid size
+        Precondition: size is MEDIUM_ASTEROID or SMALL_ASTEROID
+
+        Parameter position: the x and y coordinates of the asteroid
+        Precondition: position is a list or tuple of two ints or floats
+
+        Parameter direction: the direction of the asteroid
+        Precondition: direction is a Vector2 object that is either exactly
+        zero or not close to zero
+        """
+        spares = self._spares[size]
+        self._owed += 1
+        self._handed += 1
+        if spares != []:
+            self._reused += 1
+            asteroid = spares.pop()
+            asteroid.reset(position,direction)
+            return asteroid
+        self._cloned += 1
+        return self._prototypes[size].clone(position,direction)
+
+    def release(self, asteroid):
+        """
+        This method keeps a destroyed asteroid as a spare, if it is a fragment
+        size and the reserve of that size is not full.
+
+        Parameter asteroid: an asteroid that is no longer used
+        Precondition: asteroid is an AsteroidBody
+        """
+        spares = self._spares.get(asteroid.get_size())
+        if spares != None and len(spares) < self._reserve:
+            spares.append(asteroid)
+            self._owed = max(0,self._owed-1)
+
+    def refill(self, budget=FRAGMENT_REFILL):
+        """
+        This method makes at most budget spares to replace the fragments
+        handed out since the last refill, so a factory that was never asked
+        for a fragment (such as that of a wave with no splits) stays empty.
+
+        Parameter budget: the most spares to make
+        Precondition: budget is an int >= 0
+        """
+        if self._owed > 0:
+            budget = min(budget,self._owed)
+            made = self._make(budget)
+            # Once every reserve is full, nothing more is owed
+            self._owed = self._owed-made if made == budget else 0
+
+    def _make(self, budget):
+        """
+        Makes at most budget spares, alternating between the sizes, for the
+        sizes whose reserve is not full, and returns how many it made.
+
+        Parameter budget: the most spares to make
+        Precondition: budget is an int >= 0
+        """
+        total = 0
+        made = True
+        while budget > 0 and made:
+            made = False
+            for size in (MEDIUM_ASTEROID,SMALL_ASTEROID):
+                spares = self._spares[size]
+                if budget > 0 and len(spares) < self._reserve:
+                    spares.append(self._prototypes[size].clone((0,0),
+                        _NO_DIRECTION))
+                    budget -= 1
+                    total += 1
+                    made = True
+        return total
+
+    def reset_counters(self):
+        """
+        This method sets the reused and cloned counters back to 0.
+
+        Parameter self: current instance of the class
+        """
+        self._reused = 0
+        self._cloned = 0
@@ -0,0 +1,197 @@
+"""
+Frame profiler module for Planetoids
+
+This module contains a profiler that records how long each phase of a frame
+takes. Wave and Planetoids time their phases only while they have a profiler,
+so when profiling is off the only cost is a check for None once per tick and
+once per draw.
+
+The phases of a frame are the names in PHASES. A phase that runs more than
+once in a frame (the wave phases run once per tick) adds up. At the end of
+every frame the profiler keeps the frame in a rolling window, for the
+averages and 99th percentiles shown by the HUD, and can write it as a row of
+a CSV file.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+import collections
+import csv
+
+# The phases of a frame, in the order they run
+PHASES = ('inputs','move_bullets','move_ship','move_asteroids','wrap_ship',
+    'wrap_asteroids','cull_bullets','collisions','engine_step','wave_draw',
+    'background','labels')
+
+
+class FrameProfiler(object):
+    """
+    A class that records the time of each phase of each frame.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _current: the time of each phase in the frame so far, in
+    #           seconds
+    # Invariant: _current is a dict mapping every name in PHASES to a float
+    #
+    # Attribute _window: the times of each phase in the last frames, in
+    #           milliseconds
+    # Invariant: _window is a dict mapping every name in PHASES to a deque of
+    #            at most PROFILE_WINDOW floats
+    #
+    # Attribute _totals: the total time of the last frames, in milliseconds
+    # Invariant: _totals is a deque of at most PROFILE_WINDOW floats
+    #
+    # Attribute _frame: the number of frames ended so far
+    # Invariant: _frame is an int >= 0
+    #
+    # Attribute _file: the CSV file the frames are written to
+    # Invariant: _file is an open file, or None if there is no CSV file
+    #
+    # Attribute _writer: the writer for _file
+    # Invariant: _writer is a csv writer, or None if _file is None
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_frame(self):
+        """
+        This method is a getter for the number of frames ended so far.
+
+        Parameter self: current instance of the class
+        """
+        return self._frame
+
+    def getter_averages(self):
+        """
+        This method returns a dict with the average time of each phase (and
+        of the whole frame, as 'total') over the rolling window, in
+        milliseconds.
+
+        Parameter self: current instance of the class
+        """
+        averages = {}
+        for phase in PHASES:
+            averages[phase] = _average(self._window[phase])
+        averages['total'] = _average(self._totals)
+        return averages
+
+    def getter_p99s(self):
+        """
+        This method returns a dict with the 99th percentile time of each
+        phase (and of the whole frame, as 'total') over the rolling window, in
+        milliseconds.
+
+        Parameter self: current instance of the class
+        """
+        p99s = {}
+        for phase in PHASES:
+            p99s[phase] = _p99(self._window[phase])
+        p99s['total'] = _p99(self._totals)
+        return p99s
+
+    # INITIALIZER TO MAKE AN EMPTY PROFILER
+    def __init__(self, csvfile=None):
+        """
+        Initializes a profiler with no frames.
+
+        Parameter csvfile: the name of the CSV file to write every frame to
+        (None means no CSV file)
+        Precondition: csvfile is a string or None
+        """
+        assert csvfile == None or isinstance(csvfile,str)
+        self._current = dict.fromkeys(PHASES,0.0)
+        self._window = {}
+        for phase in PHASES:
+            self._window[phase] = collections.deque(maxlen=PROFILE_WINDOW)
+        self._totals = collections.deque(maxlen=PROFILE_WINDOW)
+        self._frame = 0
+        self._file = None
+        self._writer = None
+        if csvfile != None:
+            self._file = open(csvfile,'w',newline='')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(('frame',)+PHASES+('total',))
+
+    # ADDITIONAL METHODS
+    def add(self, phase, seconds):
+        """
+        This method adds time to a phase of the current frame.
+
+        Parameter phase: the phase
+        Precondition: phase is a name in PHASES
+
+        Parameter seconds: the time the phase took
+        Precondition: seconds is a float >= 0
+        """
+        self._current[phase] += seconds
+
+    def end_frame(self):
+        """
+        This method ends the current frame: it goes into the rolling window
+        and, if there is one, the CSV file.
+
+        Parameter self: current instance of the class
+        """
+        total = 0.0
+        row = [self._frame]
+        for phase in PHASES:
+            ms = self._current[phase]*1000
+            self._window[phase].append(ms)
+            self._current[phase] = 0.0
+            total += ms
+            row.append(round(ms,4))
+        self._totals.append(total)
+        row.append(round(total,4))
+        if self._writer != None:
+            self._writer.writerow(row)
+        self._frame += 1
+
+    def hud_text(self):
+        """
+        This method returns the text of the HUD: one line per phase with its
+        average and 99th percentile over the rolling window.
+
+        Parameter self: current instance of the class
+        """
+        averages = self.getter_averages()
+        p99s = self.getter_p99s()
+        lines = ['%-34s %7s %7s' % ('ms/frame','avg','p99')]
+        for phase in PHASES+('total',):
+            lines.append('%-34s %7.2f %7.2f' % (phase,averages[phase],
+                p99s[phase]))
+        return '\n'.join(lines)
+
+    def close(self):
+        """
+        This method closes the CSV file, if there is one.
+
+        Parameter self: current instance of the class
+        """
+        if self._file != None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+def _average(samples):
+    """
+    Returns the average of samples, or 0.0 if there are none.
+
+    Parameter samples: the samples
+    Precondition: samples is a collection of floats
+    """
+    if len(samples) == 0:
+        return 0.0
+    return sum(samples)/len(samples)
+
+
+def _p99(samples):
+    """
+    Returns the 99th percentile of samples, or 0.0 if there are none.
+
+    Parameter samples: the samples
+    Precondition: samples is a collection of floats
+    """
+    if len(samples) == 0:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered)-1,int(0.99*len(ordered)))]
@@ -0,0 +1,401 @@
+"""
+Input recording and replay module for Planetoids
+
+This module records the keys that Wave.inputs reads ('left', 'right', 'up' and
+'spacebar') on every tick of a wave, along with the wave itself, the settings
+it was played with and the length of a tick, and plays a recording back on a
+headless wave (see headless.py) as fast as the CPU allows. As a wave only
+depends on its JSON, its settings and the keys down on each tick, a replay
+ends exactly like the session that was recorded.
+
+A recording is stored in a compact binary format (all numbers little endian):
+
+    b'PLNR'                 the magic number
+    version                 1 byte, RECORDING_VERSION
+    tick                    8 byte float, the length of a tick in seconds
+    ticks                   4 byte int, the number of ticks recorded
+    maxbullets              4 byte int, the most bullets on screen
+    swept                   1 byte, 1 or 0 for swept collisions or not, 2
+                            for the default (SWEPT_COLLISIONS)
+    name length, name       2 byte int, then the wave file name in UTF-8
+    wave length, wave       4 byte int, then the zlib compressed wave JSON
+    run count, runs         4 byte int, then one 3 byte run per run
+
+where each run is a key mask (1 byte, see headless.keys_to_mask) and the
+number of ticks in a row that had that mask (2 bytes). Keys are held for many
+ticks at a time, so an hour of play takes a few kilobytes. Recordings of
+version 1 have no maxbullets and swept, and replay with the defaults.
+
+Run it from the game folder to replay recordings, e.g.
+
+    python replay.py session-001-wave1.json.rec
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+import json
+import struct
+import sys
+import time
+import zlib
+
+# The first bytes of every recording
+RECORDING_MAGIC = b'PLNR'
+# The version of the format written by Recorder
+RECORDING_VERSION = 2
+
+# The fixed size fields at the start of a recording
+_HEADER = struct.Struct('<4sBdI')
+# The settings that follow _HEADER in a recording of version 2
+_SETTINGS = struct.Struct('<IB')
+# The swept settings, by their byte in _SETTINGS
+_SWEPT = (False,True,None)
+# A single run of ticks with the same keys down
+_RUN = struct.Struct('<BH')
+# The longest run that fits in a _RUN
+_MAX_RUN = 0xFFFF
+
+
+class Recording(object):
+    """
+    A class representing the recorded input of a single wave.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _name: the name of the wave file that was played
+    # Invariant: _name is a string
+    #
+    # Attribute _wave: the wave that was played
+    # Invariant: _wave is a wave JSON dict
+    #
+    # Attribute _tick: the length of a tick in seconds
+    # Invariant: _tick is a float > 0
+    #
+    # Attribute _masks: the key mask of every tick
+    # Invariant: _masks is a bytes object
+    #
+    # Attribute _maxbullets: the most bullets on screen in the wave
+    # Invariant: _maxbullets is an int > 0
+    #
+    # Attribute _swept: whether collisions were swept (None for the default)
+    # Invariant: _swept is a boolean or None
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_name(self):
+        """
+        This method is a getter for the name of the wave file.
+
+        Parameter self: current instance of the class
+        """
+        return self._name
+
+    def getter_wave(self):
+        """
+        This method is a getter for the wave JSON dict.
+
+        Parameter self: current instance of the class
+        """
+        return self._wave
+
+    def getter_tick(self):
+        """
+        This method is a getter for the length of a tick in seconds.
+
+        Parameter self: current instance of the class
+        """
+        return self._tick
+
+    def getter_masks(self):
+        """
+        This method is a getter for the key mask of every tick, as bytes.
+
+        Parameter self: current instance of the class
+        """
+        return self._masks
+
+    def getter_maxbullets(self):
+        """
+        This method is a getter for the most bullets on screen in the wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._maxbullets
+
+    def getter_swept(self):
+        """
+        This method is a getter for whether collisions were swept (None for
+        the default, SWEPT_COLLISIONS).
+
+        Parameter self: current instance of the class
+        """
+        return self._swept
+
+    # INITIALIZER TO STORE A RECORDING
+    def __init__(self, name, wave, tick, masks, maxbullets=MAX_BULLETS,
+            swept=None):
+        """
+        Initializes a recording.
+
+        Parameter name: the name of the wave file
+        Precondition: name is a string
+
+        Parameter wave: the wave that was played
+        Precondition: wave is a wave JSON dict
+
+        Parameter tick: the length of a tick in seconds
+        Precondition: tick is an int or float > 0
+
+        Parameter masks: the key mask of every tick
+        Precondition: masks is a bytes object
+
+        Parameter maxbullets: the most bullets on screen in the wave
+        Precondition: maxbullets is an int > 0
+
+        Parameter swept: whether collisions were swept (None for the default)
+        Precondition: swept is a boolean or None
+        """
+        assert isinstance(name,str) and isinstance(wave,dict)
+        assert (isinstance(tick,int) or isinstance(tick,float)) and tick > 0
+        assert isinstance(masks,(bytes,bytearray))
+        assert isinstance(maxbullets,int) and maxbullets > 0
+        assert swept in (None,True,False)
+        self._name = name
+        self._wave = wave
+        self._tick = float(tick)
+        self._masks = bytes(masks)
+        self._maxbullets = maxbullets
+        self._swept = swept
+
+    # ADDITIONAL METHODS
+    def to_bytes(self):
+        """
+        This method returns the recording in the binary format of this module.
+
+        Parameter self: current instance of the class
+        """
+        runs = bytearray()
+        count = 0
+        i = 0
+        while i < len(self._masks):
+            j = i+1
+            while (j < len(self._masks) and j-i < _MAX_RUN and
+                    self._masks[j] == self._masks[i]):
+                j += 1
+            runs += _RUN.pack(self._masks[i],j-i)
+            count += 1
+            i = j
+        name = self._name.encode('utf-8')
+        wave = zlib.compress(json.dumps(self._wave,
+            separators=(',',':')).encode('utf-8'))
+        return b''.join([_HEADER.pack(RECORDING_MAGIC,RECORDING_VERSION,
+            self._tick,len(self._masks)),_SETTINGS.pack(self._maxbullets,
+            _SWEPT.index(self._swept)),struct.pack('<H',len(name)),name,
+            struct.pack('<I',len(wave)),wave,struct.pack('<I',count),
+            bytes(runs)])
+
+    def save(self, filename):
+        """
+        This method writes the recording to a file.
+
+        Parameter filename: the name of the file
+        Precondition: filename is a string
+        """
+        with open(filename,'wb') as file:
+            file.write(self.to_bytes())
+
+
+def decode_recording(data):
+    """
+    Returns the Recording stored in data.
+
+    Parameter data: a recording in the binary format of this module
+    Precondition: data is a bytes object
+    """
+    assert isinstance(data,(bytes,bytearray))
+    magic, version, tick, ticks = _HEADER.unpack_from(data,0)
+    assert magic == RECORDING_MAGIC, 'not a Planetoids recording'
+    assert version in (1,RECORDING_VERSION), 'unknown recording version '+\
+        repr(version)
+    at = _HEADER.size
+    maxbullets = MAX_BULLETS
+    swept = None
+    if version > 1:
+        maxbullets, swept = _SETTINGS.unpack_from(data,at)
+        assert swept < len(_SWEPT), 'unknown swept setting '+repr(swept)
+        swept = _SWEPT[swept]
+        at += _SETTINGS.size
+    length = struct.unpack_from('<H',data,at)[0]
+    at += 2
+    name = bytes(data[at:at+length]).decode('utf-8')
+    at += length
+    length = struct.unpack_from('<I',data,at)[0]
+    at += 4
+    wave = json.loads(zlib.decompress(data[at:at+length]).decode('utf-8'))
+    at += length
+    count = struct.unpack_from('<I',data,at)[0]
+    at += 4
+    masks = bytearray()
+    for run in range(count):
+        mask, length = _RUN.unpack_from(data,at)
+        at += _RUN.size
+        masks += bytes([mask])*length
+    assert len(masks) == ticks, 'the recording is truncated'
+    return Recording(name,wave,tick,masks,maxbullets,swept)
+
+
+def load_recording(filename):
+    """
+    Returns the Recording stored in a file.
+
+    Parameter filename: the name of the file
+    Precondition: filename is a string
+    """
+    with open(filename,'rb') as file:
+        return decode_recording(file.read())
+
+
+class Recorder(object):
+    """
+    A class that records the keys down on every tick of a wave.
+
+    Call record with the input right before every call to Wave.update.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _name: the name of the wave file being played
+    # Invariant: _name is a string
+    #
+    # Attribute _wave: the wave being played
+    # Invariant: _wave is a wave JSON dict
+    #
+    # Attribute _tick: the length of a tick in seconds
+    # Invariant: _tick is a float > 0
+    #
+    # Attribute _masks: the key mask of every tick so far
+    # Invariant: _masks is a bytearray
+    #
+    # Attribute _maxbullets: the most bullets on screen in the wave
+    # Invariant: _maxbullets is an int > 0
+    #
+    # Attribute _swept: whether collisions are swept (None for the default)
+    # Invariant: _swept is a boolean or None
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_ticks(self):
+        """
+        This method is a getter for the number of ticks recorded.
+
+        Parameter self: current instance of the class
+        """
+        return len(self._masks)
+
+    # INITIALIZER TO START AN EMPTY RECORDING
+    def __init__(self, name, wave, tick, maxbullets=MAX_BULLETS, swept=None):
+        """
+        Initializes a recorder with no ticks.
+
+        Parameter name: the name of the wave file being played
+        Precondition: name is a string
+
+        Parameter wave: the wave being played
+        Precondition: wave is a wave JSON dict or a WaveDefinition
+
+        Parameter tick: the length of a tick in seconds
+        Precondition: tick is an int or float > 0
+
+        Parameter maxbullets: the most bullets on screen in the wave
+        Precondition: maxbullets is an int > 0
+
+        Parameter swept: whether collisions are swept (None for the default)
+        Precondition: swept is a boolean or None
+        """
+        assert isinstance(name,str)
+        if isinstance(wave,WaveDefinition):
+            wave = wave_json(wave)
+        assert isinstance(wave,dict)
+        self._name = name
+        self._wave = wave
+        self._tick = tick
+        self._masks = bytearray()
+        self._maxbullets = maxbullets
+        self._swept = swept
+
+    # ADDITIONAL METHODS
+    def record(self, input):
+        """
+        This method records the keys of WAVE_KEYS that are down.
+
+        Parameter input: the input about to be passed to Wave.update
+        Precondition: input is an instance of GInput (or ScriptedInput)
+        """
+        mask = 0
+        for i in range(len(WAVE_KEYS)):
+            if input.is_key_down(WAVE_KEYS[i]):
+                mask |= 1 << i
+        self._masks.append(mask)
+
+    def recording(self):
+        """
+        This method returns a Recording of the ticks so far.
+
+        Parameter self: current instance of the class
+        """
+        return Recording(self._name,self._wave,self._tick,self._masks,
+            self._maxbullets,self._swept)
+
+
+def replay(recording, vectorized=False):
+    """
+    Plays a recording on a headless wave and returns its outcome, a dict with
+
+        'result':    'win', 'lose', or None if the recording ended first
+        'ticks':     the number of ticks played
+        'destroyed': the number of asteroids hit by bullets
+        'seconds':   the time the replay took
+
+    Parameter recording: the recording to play
+    Precondition: recording is a Recording
+
+    Parameter vectorized: whether to use the array engine
+    Precondition: vectorized is a boolean, and is only True if HAS_NUMPY is
+    True
+    """
+    assert isinstance(recording,Recording)
+    start = time.perf_counter()
+    wave = Wave(recording.getter_wave(),vectorized=vectorized,headless=True,
+        maxbullets=recording.getter_maxbullets(),
+        swept=recording.getter_swept())
+    masks = recording.getter_masks()
+    ticks = simulate(wave,masks,len(masks),recording.getter_tick())
+    seconds = time.perf_counter()-start
+    winlose = wave.getter_for_winlose()
+    if winlose == True:
+        result = 'win'
+    elif winlose == False:
+        result = 'lose'
+    else:
+        result = None
+    return {'result':result,'ticks':ticks,'destroyed':wave.getter_destroyed(),
+        'seconds':seconds}
+
+
+def main(argv):
+    """
+    Replays recording files and prints the outcome of each.
+
+    Parameter argv: the names of the recording files
+    Precondition: argv is a list of strings
+    """
+    for filename in argv:
+        recording = load_recording(filename)
+        outcome = replay(recording)
+        played = outcome['ticks']*recording.getter_tick()
+        print('%s (%s): %s after %d ticks, %d destroyed, %.1fs of play in '
+            '%.2fs (%.0fx)' % (filename,recording.getter_name(),
+            outcome['result'],outcome['ticks'],outcome['destroyed'],played,
+            outcome['seconds'],played/max(outcome['seconds'],1e-9)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,1076 @@
+"""
+Session server for Planetoids
+
+This module contains SessionServer, an asyncio server that plays many
+headless Waves (see headless.py) at once for clients on local sockets, and
+SessionMirror, which a client uses to keep its own copy of a session.
+
+Every message, in both directions, is a 4 byte little-endian length, a 1
+byte kind and a payload of that length. A client sends
+
+    J  join: a JSON dict, either {"wave": <wave JSON dict>} or
+       {"seed": s, "count": n} for a wave from WaveGenerator(s) with n
+       asteroids (each starts a new session), or {"watch": id} to watch a
+       session without playing it
+    I  input: one byte, the keys that are down as a mask from keys_to_mask;
+       the keys stay down until the next I
+    M  metrics: no payload
+
+and the server sends
+
+    W  welcome: a JSON dict with 'session', 'tick_rate' and 'player'
+    D  delta: the changes to the session since the last delta to the client
+    M  metrics: the JSON dict of SessionServer.metrics
+    E  error: a JSON string, just before the server closes the connection
+
+A delta has the tick, the result and the ship, then the handles (see
+store.py) of the asteroids and bullets that are gone and the full state of
+the ones that are new. Asteroids and bullets move in straight lines, so
+that is all a client needs: SessionMirror moves the rest itself with the
+same arithmetic as Wave, and gets the same positions. Each client keeps the
+handles it knows about, so a delta is always against what that client has
+seen, and a delta held back from a slow client is not lost.
+
+The sessions share one scheduler, which plays a round every 1/TICK_RATE
+seconds. A session plays one tick a round, plus any that it is owed from
+rounds that were late or that it was deferred from, up to its tick budget
+(SERVER_TICK_BUDGET); the ticks past the budget are dropped. Once a round
+has used SERVER_LOAD_LIMIT of its tick, the sessions left are deferred to
+the next round, and the next round starts with the session after the last
+one started. Deltas are only written to a client whose socket buffer is
+below SERVER_HIGH_WATER, so a slow client costs memory for one delta and
+never blocks the others.
+
+The metrics are the tick jitter (how late rounds start), the time a session
+tick takes, how much of each tick the rounds keep the core busy, and the
+sessions per core: the sessions that one fully busy core could play at the
+current load. The server is one event loop, so it uses one core; more cores
+need more server processes.
+
+Run it from the game folder to serve on SERVER_PORT, or to load test it
+with bots in another process, e.g.
+
+    python server.py --bots 200 --asteroids 20 --seconds 10 --slow 2
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+from wave import *
+from generator import *
+import argparse
+import asyncio
+import collections
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import struct
+import sys
+import time
+
+# The header of every message: the length of the payload and its kind
+_HEADER = struct.Struct('<Ic')
+
+# The start of a delta: the tick, the result (see RESULT_CODES) and whether
+# there is a ship
+_DELTA = struct.Struct('<IBB')
+# The ship of a delta: x, y and angle
+_SHIP = struct.Struct('<ddd')
+# The number of handles or entities that follow
+_COUNT = struct.Struct('<I')
+# A new asteroid: handle, size (see ASTEROID_SIZES), x, y and velocity
+_ASTEROID = struct.Struct('<QBdddd')
+# A new bullet: handle, x, y and velocity
+_BULLET = struct.Struct('<Qdddd')
+
+# The results of a wave in the order of their codes in a delta
+RESULT_CODES = (None,True,False)
+
+# The sizes of asteroids in the order of their codes in a delta
+ASTEROID_SIZES = (SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID)
+
+
+def write_message(writer, kind, payload=b''):
+    """
+    Writes a message to a stream without waiting for it to be sent, and
+    returns the number of bytes written.
+
+    Parameter writer: the stream
+    Precondition: writer is an asyncio.StreamWriter
+
+    Parameter kind: the kind of message
+    Precondition: kind is a bytes object of length 1
+
+    Parameter payload: the payload
+    Precondition: payload is a bytes object
+    """
+    writer.write(_HEADER.pack(len(payload),kind)+payload)
+    return _HEADER.size+len(payload)
+
+
+async def read_message(reader):
+    """
+    Returns the next message of a stream as a (kind, payload) pair.
+
+    It raises asyncio.IncompleteReadError if the stream ends, and ValueError
+    if the message is longer than SERVER_MAX_MESSAGE.
+
+    Parameter reader: the stream
+    Precondition: reader is an asyncio.StreamReader
+    """
+    length, kind = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if length > SERVER_MAX_MESSAGE:
+        raise ValueError('a message of '+str(length)+' bytes is too long')
+    return (kind,await reader.readexactly(length))
+
+
+def live_entities(store):
+    """
+    Returns a dict mapping the handle of every entity in a store to it.
+
+    Parameter store: the store
+    Precondition: store is an EntityStore with nothing marked for removal
+    """
+    handle = store.handle
+    return dict([(handle(i),store[i]) for i in range(len(store))])
+
+
+def encode_delta(tick, result, ship, asteroids, bullets, known):
+    """
+    Returns a delta against the asteroids and bullets that a client knows.
+
+    Parameter tick: the number of ticks the session has played
+    Precondition: tick is an int >= 0
+
+    Parameter result: the result of the wave
+    Precondition: result is in RESULT_CODES
+
+    Parameter ship: the ship
+    Precondition: ship is a ShipBody, or None once it is destroyed
+
+    Parameter asteroids: the asteroids, by handle
+    Precondition: asteroids is a dict mapping ints to AsteroidBodies
+
+    Parameter bullets: the bullets, by handle
+    Precondition: bullets is a dict mapping ints to BulletBodies
+
+    Parameter known: the handles of the asteroids and bullets the client knows
+    Precondition: known is a pair of sets of ints
+    """
+    parts = [_DELTA.pack(tick,RESULT_CODES.index(result),ship != None)]
+    if ship != None:
+        parts.append(_SHIP.pack(ship.x,ship.y,ship.angle))
+    gone = known[0]-asteroids.keys()
+    parts.append(_COUNT.pack(len(gone)))
+    parts.append(struct.pack('<%dQ' % len(gone),*gone))
+    new = asteroids.keys()-known[0]
+    parts.append(_COUNT.pack(len(new)))
+    for handle in new:
+        asteroid = asteroids[handle]
+        velocity = asteroid.get_velocity()
+        parts.append(_ASTEROID.pack(handle,
+            ASTEROID_SIZES.index(asteroid.get_size()),asteroid.x,asteroid.y,
+            velocity.x,velocity.y))
+    gone = known[1]-bullets.keys()
+    parts.append(_COUNT.pack(len(gone)))
+    parts.append(struct.pack('<%dQ' % len(gone),*gone))
+    new = bullets.keys()-known[1]
+    parts.append(_COUNT.pack(len(new)))
+    for handle in new:
+        bullet = bullets[handle]
+        velocity = bullet.getter_for_velocity()
+        parts.append(_BULLET.pack(handle,bullet.x,bullet.y,velocity.x,
+            velocity.y))
+    return b''.join(parts)
+
+
+class SessionMirror(object):
+    """
+    A class that keeps a client's copy of a session from its deltas.
+
+    Between deltas the asteroids and bullets are moved (and the asteroids
+    wrapped) one tick at a time exactly like move_all and wrap_all in Wave,
+    so after a delta every position is the same as in the session.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _scale: how far things move in a tick, in frames' worth of
+    #           their per-frame speed (as in Wave.update)
+    # Invariant: _scale is a float > 0
+    #
+    # Attribute _tick: the tick of the last delta
+    # Invariant: _tick is an int >= 0, or None before the first delta
+    #
+    # Attribute _result: the result of the wave
+    # Invariant: _result is in RESULT_CODES
+    #
+    # Attribute _ship: the ship
+    # Invariant: _ship is an (x, y, angle) tuple of floats, or None
+    #
+    # Attribute _asteroids: the asteroids by handle
+    # Invariant: _asteroids is a dict mapping ints to [size, x, y, vx, vy]
+    #            lists
+    #
+    # Attribute _bullets: the bullets by handle
+    # Invariant: _bullets is a dict mapping ints to [x, y, vx, vy] lists
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_tick(self):
+        """
+        This method is a getter for the tick of the last delta.
+
+        Parameter self: current instance of the class
+        """
+        return self._tick
+
+    def getter_result(self):
+        """
+        This method is a getter for the result of the wave (None while it is
+        played, True once it is won and False once it is lost).
+
+        Parameter self: current instance of the class
+        """
+        return self._result
+
+    def getter_ship(self):
+        """
+        This method is a getter for the ship as an (x, y, angle) tuple, or
+        None once it is destroyed.
+
+        Parameter self: current instance of the class
+        """
+        return self._ship
+
+    def getter_asteroids(self):
+        """
+        This method is a getter for the asteroids, a dict mapping handles to
+        [size, x, y, vx, vy] lists.
+
+        Parameter self: current instance of the class
+        """
+        return self._asteroids
+
+    def getter_bullets(self):
+        """
+        This method is a getter for the bullets, a dict mapping handles to
+        [x, y, vx, vy] lists.
+
+        Parameter self: current instance of the class
+        """
+        return self._bullets
+
+    # INITIALIZER TO MAKE AN EMPTY MIRROR
+    def __init__(self, tick_rate=TICK_RATE):
+        """
+        Initializes a mirror with nothing in it.
+
+        Parameter tick_rate: the ticks per second of the server (from its
+        welcome)
+        Precondition: tick_rate is an int > 0
+        """
+        self._scale = (1/tick_rate)*BASE_RATE
+        self._tick = None
+        self._result = None
+        self._ship = None
+        self._asteroids = {}
+        self._bullets = {}
+
+    # ADDITIONAL METHODS
+    def apply(self, payload):
+        """
+        This method moves everything to the tick of a delta and applies it.
+
+        Parameter payload: the payload of a D message
+        Precondition: payload is a bytes object made by encode_delta
+        """
+        tick, result, alive = _DELTA.unpack_from(payload)
+        offset = _DELTA.size
+        if self._tick != None:
+            self.advance(tick-self._tick)
+        self._tick = tick
+        self._result = RESULT_CODES[result]
+        self._ship = None
+        if alive:
+            self._ship = _SHIP.unpack_from(payload,offset)
+            offset += _SHIP.size
+        offset = self._remove(self._asteroids,payload,offset)
+        count = _COUNT.unpack_from(payload,offset)[0]
+        offset += _COUNT.size
+        for i in range(count):
+            handle, size, x, y, vx, vy = _ASTEROID.unpack_from(payload,offset)
+            self._asteroids[handle] = [ASTEROID_SIZES[size],x,y,vx,vy]
+            offset += _ASTEROID.size
+        offset = self._remove(self._bullets,payload,offset)
+        count = _COUNT.unpack_from(payload,offset)[0]
+        offset += _COUNT.size
+        for i in range(count):
+            handle, x, y, vx, vy = _BULLET.unpack_from(payload,offset)
+            self._bullets[handle] = [x,y,vx,vy]
+            offset += _BULLET.size
+
+    def advance(self, ticks):
+        """
+        This method moves the asteroids and bullets by a number of ticks.
+
+        Parameter ticks: the number of ticks
+        Precondition: ticks is an int >= 0
+        """
+        scale = self._scale
+        floor = math.floor
+        for asteroid in self._asteroids.values():
+            low, width, height = TORUS[2*asteroid_radius(asteroid[0])]
+            x, y, vx, vy = asteroid[1:]
+            for i in range(ticks):
+                x += vx*scale
+                y += vy*scale
+                x -= width*floor((x-low)/width)
+                y -= height*floor((y-low)/height)
+            asteroid[1] = x
+            asteroid[2] = y
+        for bullet in self._bullets.values():
+            for i in range(ticks):
+                bullet[0] += bullet[2]*scale
+                bullet[1] += bullet[3]*scale
+
+    def _remove(self, entities, payload, offset):
+        """
+        Removes the entities of a list of handles in a delta and returns the
+        offset after the list.
+
+        Parameter entities: the entities by handle
+        Precondition: entities is a dict
+
+        Parameter payload: the delta
+        Precondition: payload is a bytes object
+
+        Parameter offset: where the list starts
+        Precondition: offset is an int >= 0
+        """
+        count = _COUNT.unpack_from(payload,offset)[0]
+        offset += _COUNT.size
+        for handle in struct.unpack_from('<%dQ' % count,payload,offset):
+            entities.pop(handle,None)
+        return offset+8*count
+
+
+class Session(object):
+    """
+    A class representing one headless wave played by the server, and the
+    keys that its player holds down.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _id: the id of the session
+    # Invariant: _id is an int >= 0
+    #
+    # Attribute _wave: the wave
+    # Invariant: _wave is a headless Wave
+    #
+    # Attribute _input: the input that the wave reads its keys from
+    # Invariant: _input is a ScriptedInput
+    #
+    # Attribute _keys: the keys the player holds down
+    # Invariant: _keys is a tuple of strings in WAVE_KEYS
+    #
+    # Attribute _tick: the number of ticks played
+    # Invariant: _tick is an int >= 0
+    #
+    # Attribute _owed: the ticks that are due but not played yet
+    # Invariant: _owed is an int >= 0
+    #
+    # Attribute _clients: the clients of the session
+    # Invariant: _clients is a list of Clients
+    #
+    # Attribute _live: the asteroids and bullets by handle at _live[0]
+    # Invariant: _live is a (tick, asteroids, bullets) tuple, or None
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_id(self):
+        """
+        This method is a getter for the id of the session.
+
+        Parameter self: current instance of the class
+        """
+        return self._id
+
+    def getter_wave(self):
+        """
+        This method is a getter for the wave of the session.
+
+        Parameter self: current instance of the class
+        """
+        return self._wave
+
+    def getter_tick(self):
+        """
+        This method is a getter for the number of ticks played.
+
+        Parameter self: current instance of the class
+        """
+        return self._tick
+
+    def getter_clients(self):
+        """
+        This method is a getter for the clients of the session.
+
+        Parameter self: current instance of the class
+        """
+        return self._clients
+
+    def setter_mask(self, mask):
+        """
+        This method sets the keys that the player holds down.
+
+        Parameter mask: the keys as a mask from keys_to_mask
+        Precondition: mask is an int between 0 and 2**len(WAVE_KEYS)-1
+        """
+        self._keys = mask_to_keys(mask)
+
+    def is_playing(self):
+        """
+        This method returns True if the wave is neither won nor lost yet.
+
+        Parameter self: current instance of the class
+        """
+        return self._wave.getter_for_winlose() == None
+
+    # INITIALIZER TO START A SESSION
+    def __init__(self, id, definition):
+        """
+        Initializes a session with a new headless wave.
+
+        Parameter id: the id of the session
+        Precondition: id is an int >= 0
+
+        Parameter definition: the wave to play
+        Precondition: definition is a WaveDefinition
+        """
+        self._id = id
+        self._wave = Wave(definition,vectorized=False,headless=True)
+        self._input = ScriptedInput()
+        self._keys = ()
+        self._tick = 0
+        self._owed = 0
+        self._clients = []
+        self._live = None
+
+    # ADDITIONAL METHODS
+    def owe(self, ticks):
+        """
+        This method adds ticks that are due and returns all that are owed.
+
+        Parameter ticks: the ticks that are due
+        Precondition: ticks is an int >= 0
+        """
+        self._owed += ticks
+        return self._owed
+
+    def play(self, budget, dt):
+        """
+        This method plays the ticks owed, up to a budget, and returns the
+        number of ticks that were dropped. Nothing is owed afterwards.
+
+        Only the ticks that move things are counted. Once the ship is
+        destroyed the wave needs one more update to be lost, which changes
+        the result but not the tick.
+
+        Parameter budget: the most ticks to play
+        Precondition: budget is an int > 0
+
+        Parameter dt: the time of a tick in seconds
+        Precondition: dt is a float > 0
+        """
+        ticks = min(self._owed,budget)
+        dropped = self._owed-ticks
+        self._owed = 0
+        for i in range(ticks):
+            if self._wave.getter_for_winlose() != None:
+                break
+            moving = self._wave.is_playing()
+            self._input.set_keys(self._keys)
+            self._wave.update(dt,self._input)
+            if moving:
+                self._tick += 1
+        return dropped
+
+    def live(self):
+        """
+        This method returns the asteroids and bullets of the current tick as
+        a pair of dicts by handle (see live_entities), made once per tick.
+
+        Parameter self: current instance of the class
+        """
+        if self._live == None or self._live[0] != self._tick:
+            self._live = (self._tick,live_entities(self._wave.getter_asteroids()),
+                live_entities(self._wave.getter_bullets()))
+        return self._live[1:]
+
+
+class Client(object):
+    """
+    A class representing a connection that plays or watches a session, and
+    what it has been sent.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _writer: the stream to the client
+    # Invariant: _writer is an asyncio.StreamWriter
+    #
+    # Attribute _session: the session the client plays or watches
+    # Invariant: _session is a Session
+    #
+    # Attribute _player: whether the client plays the session
+    # Invariant: _player is a boolean
+    #
+    # Attribute _known: the handles of the asteroids and bullets the client
+    #           has been sent
+    # Invariant: _known is a pair of sets of ints
+    #
+    # Attribute _sent: the tick and the result of the last delta sent
+    # Invariant: _sent is a (tick, result) pair, or None before the first
+    #            delta
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_session(self):
+        """
+        This method is a getter for the session of the client.
+
+        Parameter self: current instance of the class
+        """
+        return self._session
+
+    def is_player(self):
+        """
+        This method returns True if the client plays its session.
+
+        Parameter self: current instance of the class
+        """
+        return self._player
+
+    # INITIALIZER TO CONNECT A CLIENT TO A SESSION
+    def __init__(self, writer, session, player):
+        """
+        Initializes a client of a session that has been sent nothing yet.
+
+        Parameter writer: the stream to the client
+        Precondition: writer is an asyncio.StreamWriter
+
+        Parameter session: the session
+        Precondition: session is a Session
+
+        Parameter player: whether the client plays the session
+        Precondition: player is a boolean
+        """
+        self._writer = writer
+        self._session = session
+        self._player = player
+        self._known = (set(),set())
+        self._sent = None
+
+    # ADDITIONAL METHODS
+    def push(self, highwater):
+        """
+        This method sends the client a delta if the tick or the result of
+        its session has changed since the last one, and returns the number
+        of bytes written.
+
+        It returns -1 (and sends nothing) if more than highwater bytes are
+        still waiting to be sent to the client. The next delta then covers
+        everything it missed.
+
+        Parameter highwater: the most bytes that may be waiting
+        Precondition: highwater is an int >= 0
+        """
+        session = self._session
+        wave = session.getter_wave()
+        state = (session.getter_tick(),wave.getter_for_winlose())
+        if self._sent == state:
+            return 0
+        if self._writer.transport.get_write_buffer_size() > highwater:
+            return -1
+        asteroids, bullets = session.live()
+        payload = encode_delta(state[0],state[1],wave.getter_ship(),asteroids,
+            bullets,self._known)
+        self._known = (set(asteroids),set(bullets))
+        self._sent = state
+        return write_message(self._writer,b'D',payload)
+
+
+class SessionServer(object):
+    """
+    A class representing the server: its sessions, its clients and the
+    scheduler that plays them.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _period: the time of a tick in seconds
+    # Invariant: _period is a float > 0
+    #
+    # Attribute _budget: the most ticks a session plays in a round
+    # Invariant: _budget is an int > 0
+    #
+    # Attribute _highwater: the most bytes waiting for a client before its
+    #           deltas are held back
+    # Invariant: _highwater is an int >= 0
+    #
+    # Attribute _sessions: the sessions by id, in the order they started
+    # Invariant: _sessions is a dict mapping ints to Sessions
+    #
+    # Attribute _nextid: the id of the next session
+    # Invariant: _nextid is an int >= 0
+    #
+    # Attribute _turn: the number of rounds started, which picks the session
+    #           each round starts with
+    # Invariant: _turn is an int >= 0
+    #
+    # Attribute _server: the listening server
+    # Invariant: _server is an asyncio.Server, or None until start
+    #
+    # Attribute _scheduler: the task that plays the rounds
+    # Invariant: _scheduler is an asyncio.Task, or None until start
+    #
+    # Attribute _connections: the task that serves each connection
+    # Invariant: _connections is a set of asyncio.Tasks
+    #
+    # Attribute _lateness: how late each of the recent rounds started
+    # Invariant: _lateness is a deque of floats >= 0 (seconds)
+    #
+    # Attribute _busy: how long each of the recent rounds took
+    # Invariant: _busy is a deque of floats >= 0 (seconds)
+    #
+    # Attribute _stepping: the time spent playing ticks and the ticks played
+    #           in each of the recent rounds
+    # Invariant: _stepping is a deque of (float, int) pairs
+    #
+    # Attribute _counts: the totals for the metrics ('dropped', 'deferred',
+    #           'held', 'bytes')
+    # Invariant: _counts is a dict mapping those names to ints >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_port(self):
+        """
+        This method is a getter for the port the server listens on.
+
+        Parameter self: current instance of the class
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    def getter_sessions(self):
+        """
+        This method is a getter for the sessions by id.
+
+        Parameter self: current instance of the class
+        """
+        return self._sessions
+
+    # INITIALIZER TO MAKE A SERVER WITH NO SESSIONS
+    def __init__(self, tick_rate=TICK_RATE, budget=SERVER_TICK_BUDGET,
+            highwater=SERVER_HIGH_WATER):
+        """
+        Initializes a server that does not listen yet (see start).
+
+        Parameter tick_rate: the rounds per second
+        Precondition: tick_rate is an int > 0
+
+        Parameter budget: the most ticks a session plays in a round
+        Precondition: budget is an int > 0
+
+        Parameter highwater: the most bytes waiting for a client before its
+        deltas are held back
+        Precondition: highwater is an int >= 0
+        """
+        assert isinstance(tick_rate,int) and tick_rate > 0
+        assert isinstance(budget,int) and budget > 0
+        assert isinstance(highwater,int) and highwater >= 0
+        self._period = 1/tick_rate
+        self._budget = budget
+        self._highwater = highwater
+        self._sessions = {}
+        self._nextid = 0
+        self._turn = 0
+        self._server = None
+        self._scheduler = None
+        self._connections = set()
+        self._lateness = collections.deque(maxlen=SERVER_METRICS_WINDOW)
+        self._busy = collections.deque(maxlen=SERVER_METRICS_WINDOW)
+        self._stepping = collections.deque(maxlen=SERVER_METRICS_WINDOW)
+        self._counts = {'dropped':0,'deferred':0,'held':0,'bytes':0}
+
+    # ADDITIONAL METHODS
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT):
+        """
+        This method starts listening and starts the scheduler.
+
+        Parameter host: the address to listen on
+        Precondition: host is a string
+
+        Parameter port: the port to listen on (0 for any free port)
+        Precondition: port is an int >= 0
+        """
+        self._server = await asyncio.start_server(self.serve,host,port)
+        self._scheduler = asyncio.get_running_loop().create_task(self.run())
+
+    async def close(self):
+        """
+        This method stops the scheduler and closes every connection.
+
+        Parameter self: current instance of the class
+        """
+        self._scheduler.cancel()
+        self._server.close()
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections,return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def serve(self, reader, writer):
+        """
+        This method reads the messages of one connection until it closes.
+
+        A message that breaks the protocol gets an E message back and
+        closes the connection; the other connections are not affected.
+
+        Parameter reader: the stream from the client
+        Precondition: reader is an asyncio.StreamReader
+
+        Parameter writer: the stream to the client
+        Precondition: writer is an asyncio.StreamWriter
+        """
+        task = asyncio.current_task()
+        self._connections.add(task)
+        client = None
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == b'J' and client == None:
+                    client = self.join(writer,json.loads(payload))
+                elif kind == b'I' and client != None and client.is_player():
+                    if len(payload) != 1:
+                        raise ValueError('an input is one byte')
+                    client.getter_session().setter_mask(payload[0])
+                elif kind == b'M':
+                    write_message(writer,b'M',
+                        json.dumps(self.metrics()).encode())
+                else:
+                    raise ValueError('unexpected message '+repr(kind))
+        except (asyncio.IncompleteReadError,ConnectionError,
+                asyncio.CancelledError):
+            pass
+        except (AssertionError,ValueError,KeyError,TypeError) as error:
+            write_message(writer,b'E',json.dumps(str(error)).encode())
+        finally:
+            if client != None:
+                self.leave(client)
+            self._connections.discard(task)
+            writer.close()
+
+    def join(self, writer, request):
+        """
+        This method connects a client to a new session (or to the session it
+        watches), welcomes it and returns its Client.
+
+        Parameter writer: the stream to the client
+        Precondition: writer is an asyncio.StreamWriter
+
+        Parameter request: the payload of the J message
+        Precondition: request is a dict as described by this module
+        """
+        assert isinstance(request,dict), repr(request)+' is not a join'
+        if 'watch' in request:
+            session = self._sessions[request['watch']]
+            player = False
+        else:
+            if 'wave' in request:
+                definition = parse_wave(request['wave'])
+            else:
+                definition = WaveGenerator(request['seed']).definition(
+                    request['count'])
+            session = Session(self._nextid,definition)
+            self._sessions[self._nextid] = session
+            self._nextid += 1
+            player = True
+        client = Client(writer,session,player)
+        session.getter_clients().append(client)
+        write_message(writer,b'W',json.dumps({'session':session.getter_id(),
+            'tick_rate':round(1/self._period),'player':player}).encode())
+        return client
+
+    def leave(self, client):
+        """
+        This method disconnects a client, and ends its session once the
+        session has no clients left.
+
+        Parameter client: the client
+        Precondition: client is a Client of a session of this server
+        """
+        session = client.getter_session()
+        session.getter_clients().remove(client)
+        if session.getter_clients() == []:
+            del self._sessions[session.getter_id()]
+
+    async def run(self):
+        """
+        This method plays a round every tick until it is cancelled.
+
+        A round that starts a whole tick or more late also plays the ticks
+        it missed (within each session's budget), so the sessions keep to
+        the clock.
+
+        Parameter self: current instance of the class
+        """
+        loop = asyncio.get_running_loop()
+        period = self._period
+        deadline = loop.time()
+        while True:
+            deadline += period
+            await asyncio.sleep(max(0,deadline-loop.time()))
+            late = loop.time()-deadline
+            due = 1
+            if late >= period:
+                missed = int(late//period)
+                due += missed
+                deadline += missed*period
+            self._lateness.append(max(0,late))
+            self.play_round(due)
+
+    def play_round(self, due):
+        """
+        This method plays a round: every session is owed ticks, plays what
+        it is owed within its budget, and every client is sent a delta.
+
+        Parameter due: the ticks that are due for every session
+        Precondition: due is an int > 0
+        """
+        clock = time.perf_counter
+        start = clock()
+        limit = start+self._period*SERVER_LOAD_LIMIT
+        sessions = list(self._sessions.values())
+        first = self._turn
+        self._turn += 1
+        stepping = 0.0
+        ticks = 0
+        for k in range(len(sessions)):
+            session = sessions[(first+k) % len(sessions)]
+            if not session.is_playing():
+                continue
+            session.owe(due)
+            now = clock()
+            if now > limit:
+                self._counts['deferred'] += 1
+                continue
+            played = session.getter_tick()
+            self._counts['dropped'] += session.play(self._budget,self._period)
+            stepping += clock()-now
+            ticks += session.getter_tick()-played
+        for session in sessions:
+            for client in session.getter_clients():
+                sent = client.push(self._highwater)
+                if sent < 0:
+                    self._counts['held'] += 1
+                else:
+                    self._counts['bytes'] += sent
+        self._stepping.append((stepping,ticks))
+        self._busy.append(clock()-start)
+
+    def metrics(self):
+        """
+        This method returns the metrics of the recent rounds as a dict.
+
+        'jitter_ms' has the p50, p99 and max of how late the rounds started.
+        'busy' is the part of each tick the rounds took, 'step_us' the mean
+        time of a session tick, and 'sessions_per_core' the sessions that a
+        core could play if the rounds took all of it ('cores' is the number
+        of cores there are). The other numbers are totals since the start.
+
+        Parameter self: current instance of the class
+        """
+        late = sorted(self._lateness)
+        def pick(p):
+            return 1000*late[min(len(late)-1,int(p*len(late)))] if late else 0
+        busy = 0
+        if self._busy:
+            busy = sum(self._busy)/len(self._busy)/self._period
+        seconds = sum([entry[0] for entry in self._stepping])
+        ticks = sum([entry[1] for entry in self._stepping])
+        playing = len([s for s in self._sessions.values() if s.is_playing()])
+        return {'sessions':len(self._sessions),'playing':playing,
+            'clients':sum([len(s.getter_clients())
+                for s in self._sessions.values()]),
+            'rounds':self._turn,'tick_rate':round(1/self._period),
+            'jitter_ms':{'p50':pick(0.5),'p99':pick(0.99),'max':pick(1)},
+            'busy':busy,'step_us':1e6*seconds/ticks if ticks else 0,
+            'sessions_per_core':len(self._sessions)/busy if busy else None,
+            'cores':os.cpu_count(),'dropped_ticks':self._counts['dropped'],
+            'deferred':self._counts['deferred'],
+            'held_deltas':self._counts['held'],
+            'bytes_sent':self._counts['bytes']}
+
+
+async def run_bot(host, port, seed, count, seconds, slow=False):
+    """
+    Plays a session as a bot that changes its keys at random, and returns
+    its SessionMirror.
+
+    Parameter host: the address of the server
+    Precondition: host is a string
+
+    Parameter port: the port of the server
+    Precondition: port is an int > 0
+
+    Parameter seed: the seed of the wave and of the keys
+    Precondition: seed is an int
+
+    Parameter count: the number of asteroids in the wave
+    Precondition: count is an int >= 0
+
+    Parameter seconds: how long to play
+    Precondition: seconds is an int or float >= 0
+
+    Parameter slow: whether the bot never reads, with a small socket
+    buffer, so the server has to hold its deltas back
+    Precondition: slow is a boolean
+    """
+    sock = socket.socket()
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET,socket.SO_RCVBUF,4096)
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    await loop.sock_connect(sock,(host,port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    write_message(writer,b'J',json.dumps({'seed':seed,'count':count}).encode())
+    welcome = json.loads((await read_message(reader))[1])
+    mirror = SessionMirror(welcome['tick_rate'])
+    rng = random.Random(seed)
+    end = loop.time()+seconds
+    async def steer():
+        while True:
+            write_message(writer,b'I',bytes([rng.randrange(1 << len(WAVE_KEYS))]))
+            await asyncio.sleep(0.25)
+    steering = loop.create_task(steer())
+    try:
+        if slow:
+            await asyncio.sleep(seconds)
+        else:
+            while loop.time() < end:
+                try:
+                    kind, payload = await asyncio.wait_for(read_message(reader),
+                        max(0,end-loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if kind == b'D':
+                    mirror.apply(payload)
+    finally:
+        steering.cancel()
+        writer.close()
+    return mirror
+
+
+async def run_bots(host, port, bots, count, seconds, slow=0):
+    """
+    Plays bots at the same time and returns their SessionMirrors.
+
+    Parameter host: the address of the server
+    Precondition: host is a string
+
+    Parameter port: the port of the server
+    Precondition: port is an int > 0
+
+    Parameter bots: the number of bots that read their deltas
+    Precondition: bots is an int >= 0
+
+    Parameter count: the number of asteroids in each wave
+    Precondition: count is an int >= 0
+
+    Parameter seconds: how long to play
+    Precondition: seconds is an int or float >= 0
+
+    Parameter slow: the number of bots that never read
+    Precondition: slow is an int >= 0
+    """
+    tasks = [run_bot(host,port,seed,count,seconds,seed >= bots)
+        for seed in range(bots+slow)]
+    return await asyncio.gather(*tasks)
+
+
+def _bot_process(host, port, bots, count, seconds, slow):
+    """
+    Plays bots in a process of their own (see run_bots).
+    """
+    asyncio.run(run_bots(host,port,bots,count,seconds,slow))
+
+
+async def load_test(args):
+    """
+    Serves on a free port while bots in another process play it, and
+    returns the metrics of the server at the end.
+
+    Parameter args: the command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    server = SessionServer(args.tick_rate,args.budget)
+    await server.start(args.host,0)
+    process = multiprocessing.Process(target=_bot_process,args=(args.host,
+        server.getter_port(),args.bots,args.asteroids,args.seconds+1,
+        args.slow))
+    process.start()
+    await asyncio.sleep(args.seconds)
+    metrics = server.metrics()
+    await asyncio.get_running_loop().run_in_executor(None,process.join)
+    await server.close()
+    return metrics
+
+
+async def serve_forever(args):
+    """
+    Serves until the process is stopped.
+
+    Parameter args: the command line arguments
+    Precondition: args is an argparse.Namespace
+    """
+    server = SessionServer(args.tick_rate,args.budget)
+    await server.start(args.host,args.port)
+    print('serving on %s:%d' % (args.host,server.getter_port()))
+    await asyncio.Event().wait()
+
+
+def main(argv):
+    """
+    Serves sessions, or load tests the server with bots.
+
+    Parameter argv: the command line arguments (without the program name)
+    Precondition: argv is a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Serve Planetoids sessions')
+    parser.add_argument('--host',default=SERVER_HOST)
+    parser.add_argument('--port',type=int,default=SERVER_PORT)
+    parser.add_argument('--tick-rate',type=int,default=TICK_RATE)
+    parser.add_argument('--budget',type=int,default=SERVER_TICK_BUDGET,
+        help='the most ticks a session plays in a round')
+    parser.add_argument('--bots',type=int,default=0,
+        help='load test with this many bots instead of serving')
+    parser.add_argument('--slow',type=int,default=0,
+        help='the number of extra bots that never read')
+    parser.add_argument('--asteroids',type=int,default=20,
+        help='the number of asteroids in the wave of each bot')
+    parser.add_argument('--seconds',type=float,default=10)
+    args = parser.parse_args(argv)
+    if args.bots == 0 and args.slow == 0:
+        asyncio.run(serve_forever(args))
+        return
+    metrics = asyncio.run(load_test(args))
+    print('%(sessions)d sessions (%(playing)d playing), %(rounds)d rounds at '
+        '%(tick_rate)d ticks/s' % metrics)
+    print('jitter p50 %(p50).2fms p99 %(p99).2fms max %(max).2fms' %
+        metrics['jitter_ms'])
+    print('%.1f%% of each tick busy, %.1fus per session tick, %s sessions '
+        'per core (%d cores)' % (100*metrics['busy'],metrics['step_us'],
+        'n/a' if metrics['sessions_per_core'] == None else
+        '%.0f' % metrics['sessions_per_core'],metrics['cores']))
+    print('%(dropped_ticks)d ticks dropped, %(deferred)d deferred, '
+        '%(held_deltas)d deltas held back, %(bytes_sent)d bytes sent' % metrics)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
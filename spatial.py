@@ -0,0 +1,141 @@
+"""
+Spatial hash module for Planetoids
+
+This module contains a uniform grid that Wave uses as a broadphase for its
+collision checks. Instead of testing every bullet against every asteroid, the
+asteroids are bucketed into square cells once per frame, and a bullet (or the
+ship) only needs to be tested against the asteroids in its own cell and the
+eight cells around it.
+
+The cell size comes from consts.py. It is at least as large as the largest
+possible sum of radii, so any two objects that overlap are guaranteed to be in
+neighbouring cells.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+import math
+
+
+class SpatialHash(object):
+    """
+    A class representing a uniform grid of buckets keyed on cell coordinates.
+
+    Each bucket is a list of keys (in Wave these are indices into the asteroid
+    list). The grid does not care what the keys are; it only stores them next
+    to the cell their position falls in.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _cellsize: the width and height of a single cell in pixels
+    # Invariant: _cellsize is an int or float > 0
+    #
+    # Attribute _cells: the buckets of the grid
+    # Invariant: _cells is a dict mapping (column, row) tuples to lists of keys
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_cellsize(self):
+        """
+        This method is a getter for the size of a cell.
+
+        Parameter self: current instance of the class
+        """
+        return self._cellsize
+
+    # INITIALIZER TO CREATE AN EMPTY GRID
+    def __init__(self, cellsize=SPATIAL_CELL_SIZE):
+        """
+        Initializes an empty grid.
+
+        Parameter cellsize: the width and height of a single cell
+        Precondition: cellsize is an int or float > 0
+        """
+        assert isinstance(cellsize,int) or isinstance(cellsize,float)
+        assert cellsize > 0
+        self._cellsize = cellsize
+        self._cells = {}
+
+    # ADDITIONAL METHODS
+    def cell(self, x, y):
+        """
+        This method returns the (column, row) of the cell containing a point.
+
+        Parameter x: the x coordinate of the point
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the point
+        Precondition: y is an int or float
+        """
+        return (math.floor(x/self._cellsize), math.floor(y/self._cellsize))
+
+    def clear(self):
+        """
+        This method removes every key from the grid.
+
+        Parameter self: current instance of the class
+        """
+        self._cells.clear()
+
+    def insert(self, key, x, y):
+        """
+        This method adds a key to the cell containing the point (x, y).
+
+        Parameter key: the value to store (usually an index into a list)
+        Precondition: key is hashable
+
+        Parameter x: the x coordinate of the object
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the object
+        Precondition: y is an int or float
+        """
+        cell = self.cell(x,y)
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            self._cells[cell] = [key]
+        else:
+            bucket.append(key)
+
+    def rebuild(self, asteroids):
+        """
+        This method clears the grid and inserts every asteroid by its index.
+
+        Parameter asteroids: the asteroids to bucket
+        Precondition: asteroids is a list of objects with getter_x and getter_y
+        """
+        self._cells.clear()
+        for i in range(len(asteroids)):
+            self.insert(i,asteroids[i].getter_x(),asteroids[i].getter_y())
+
+    def query(self, x, y, reach=None):
+        """
+        This method returns the keys in the cell containing (x, y) and in the
+        eight cells around it, sorted so that callers visit them in the same
+        order as the original list.
+
+        If reach is larger than the cell size, enough rings of cells are
+        added to cover every key within reach of (x, y). Swept collisions
+        use this when an object moved far in a single step.
+
+        Parameter x: the x coordinate to look around
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate to look around
+        Precondition: y is an int or float
+
+        Parameter reach: the distance to cover (None means the cell size)
+        Precondition: reach is None, or an int or float >= 0
+        """
+        col, row = self.cell(x,y)
+        rings = 1
+        if reach != None and reach > self._cellsize:
+            rings = math.ceil(reach/self._cellsize)
+        offsets = range(-rings,rings+1)
+        found = []
+        for dcol in offsets:
+            for drow in offsets:
+                bucket = self._cells.get((col+dcol,row+drow))
+                if bucket is not None:
+                    found.extend(bucket)
+        found.sort()
+        return found
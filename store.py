@@ -0,0 +1,283 @@
+"""
+Entity store module for Planetoids
+
+This module contains the container that Wave keeps its asteroids and bullets
+in. It is a list that is never shifted: removing an entity moves the last
+entity into its place (a swap-remove), so a removal costs the same however
+many entities there are.
+
+Removals are deferred. remove_at only marks an entity, which stays where it
+is (and can still be read) until flush is called at the end of the tick. So
+indices taken during a tick stay valid for the whole tick, and appending new
+entities (like the fragments of a broken asteroid) while looping over the
+store never moves the entities being looped over.
+
+Every entity also gets a handle when it is added, an int that keeps referring
+to that entity however it moves. A handle stops working once its entity is
+removed, even if its slot is used again, because each slot counts how many
+times it was reused (its generation) and the handle records the generation it
+was made for.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+
+# The number of slots a store can have (handles keep the generation above it)
+_SLOT_LIMIT = 1 << 24
+
+
+class EntityStore(object):
+    """
+    A class that stores entities in a dense list with swap-remove, deferred
+    removal and generational handles.
+
+    It can be used like a read-only list: len, indexing with an int and
+    looping all work on the dense list, in which the entities marked for
+    removal are still present until the next flush.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _items: the entities, with no gaps
+    # Invariant: _items is a list
+    #
+    # Attribute _slots: the slot of each entity in _items
+    # Invariant: _slots is a list of ints as long as _items
+    #
+    # Attribute _removed: whether each entity in _items is marked for removal
+    # Invariant: _removed is a list of booleans as long as _items
+    #
+    # Attribute _pending: the indices of the entities marked for removal
+    # Invariant: _pending is a list of distinct ints, each an index of _items
+    #            whose flag in _removed is True
+    #
+    # Attribute _index: where the entity of each slot is in _items
+    # Invariant: _index is a list of ints, -1 for a free slot
+    #
+    # Attribute _generation: how many times each slot was freed
+    # Invariant: _generation is a list of ints >= 0 as long as _index
+    #
+    # Attribute _free: the slots that can be used again
+    # Invariant: _free is a list of ints, each a slot whose _index is -1
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_pending(self):
+        """
+        This method returns the indices of the entities marked for removal,
+        from the largest to the smallest, which is the order flush removes
+        them in.
+
+        Parameter self: current instance of the class
+        """
+        return sorted(self._pending,reverse=True)
+
+    # INITIALIZER TO MAKE A STORE
+    def __init__(self, items=()):
+        """
+        Initializes a store with some entities.
+
+        Parameter items: the entities to start with
+        Precondition: items is an iterable
+        """
+        self._items = []
+        self._slots = []
+        self._removed = []
+        self._pending = []
+        self._index = []
+        self._generation = []
+        self._free = []
+        for item in items:
+            self.append(item)
+
+    # LIST METHODS
+    def __len__(self):
+        """
+        Returns the number of entities, including the ones marked for removal.
+        """
+        return len(self._items)
+
+    def __getitem__(self, index):
+        """
+        Returns the entity at an index.
+
+        Parameter index: the index of the entity
+        Precondition: index is an int, a valid index of the store
+        """
+        return self._items[index]
+
+    def __iter__(self):
+        """
+        Returns an iterator over the entities, including the ones marked for
+        removal.
+        """
+        return iter(self._items)
+
+    # ADDITIONAL METHODS
+    def append(self, item):
+        """
+        This method adds an entity at the end and returns its handle.
+
+        Parameter item: the entity to add
+        Precondition: None
+        """
+        if self._free != []:
+            slot = self._free.pop()
+        else:
+            slot = len(self._index)
+            assert slot < _SLOT_LIMIT, 'the store is full'
+            self._index.append(-1)
+            self._generation.append(0)
+        self._index[slot] = len(self._items)
+        self._items.append(item)
+        self._slots.append(slot)
+        self._removed.append(False)
+        return self._generation[slot]*_SLOT_LIMIT+slot
+
+    def handle(self, index):
+        """
+        This method returns the handle of the entity at an index.
+
+        Parameter index: the index of the entity
+        Precondition: index is an int, a valid index of the store
+        """
+        slot = self._slots[index]
+        return self._generation[slot]*_SLOT_LIMIT+slot
+
+    def index_of(self, handle):
+        """
+        This method returns where the entity of a handle is now, or -1 if it
+        was removed.
+
+        Parameter handle: the handle of the entity
+        Precondition: handle is an int returned by append or handle
+        """
+        slot = handle % _SLOT_LIMIT
+        if (slot < len(self._index) and
+                self._generation[slot] == handle//_SLOT_LIMIT):
+            return self._index[slot]
+        return -1
+
+    def get(self, handle):
+        """
+        This method returns the entity of a handle, or None if it was removed.
+
+        Parameter handle: the handle of the entity
+        Precondition: handle is an int returned by append or handle
+        """
+        index = self.index_of(handle)
+        if index == -1:
+            return None
+        return self._items[index]
+
+    def is_alive(self, index):
+        """
+        This method returns True if the entity at an index is not marked for
+        removal.
+
+        Parameter index: the index of the entity
+        Precondition: index is an int, a valid index of the store
+        """
+        return not self._removed[index]
+
+    def remove_at(self, index):
+        """
+        This method marks the entity at an index for removal at the next
+        flush. Marking an entity twice does nothing.
+
+        Parameter index: the index of the entity
+        Precondition: index is an int, a valid index of the store
+        """
+        if not self._removed[index]:
+            self._removed[index] = True
+            self._pending.append(index)
+
+    def remove(self, handle):
+        """
+        This method marks the entity of a handle for removal at the next
+        flush. It does nothing if the entity was already removed.
+
+        Parameter handle: the handle of the entity
+        Precondition: handle is an int returned by append or handle
+        """
+        index = self.index_of(handle)
+        if index != -1:
+            self.remove_at(index)
+
+    def flush(self):
+        """
+        This method removes every entity marked for removal and returns them.
+
+        They are removed from the largest index to the smallest, each by
+        moving the last entity into its place, so every removal costs the
+        same. ArrayEngine does the same with the indices from getter_pending.
+
+        Parameter self: current instance of the class
+        """
+        if self._pending == []:
+            return []
+        removed = []
+        for index in self.getter_pending():
+            removed.append(self._items[index])
+            slot = self._slots[index]
+            self._index[slot] = -1
+            self._generation[slot] += 1
+            self._free.append(slot)
+            last = len(self._items)-1
+            if index != last:
+                self._items[index] = self._items[last]
+                self._slots[index] = self._slots[last]
+                self._removed[index] = self._removed[last]
+                self._index[self._slots[index]] = index
+            self._items.pop()
+            self._slots.pop()
+            self._removed.pop()
+        self._pending = []
+        return removed
+
+    def replace(self, items):
+        """
+        This method removes every entity at once, adds items in their place
+        and returns the entities that were removed.
+
+        It does the same as clear followed by appending each of items (every
+        old handle is dead and every new entity gets a new handle), but
+        builds the new lists in one go instead of one entity at a time.
+
+        Parameter items: the entities to add, in order
+        Precondition: items is a list, and nothing is marked for removal
+        """
+        assert isinstance(items,list)
+        assert self._pending == [], 'flush the store before replacing it'
+        removed = self._items
+        index = self._index
+        generation = self._generation
+        free = self._free
+        for slot in self._slots:
+            index[slot] = -1
+            generation[slot] += 1
+        free.extend(reversed(self._slots))
+        count = len(items)
+        reused = min(count,len(free))
+        slots = free[len(free)-reused:]
+        slots.reverse()
+        del free[len(free)-reused:]
+        while len(slots) < count:
+            assert len(index) < _SLOT_LIMIT, 'the store is full'
+            slots.append(len(index))
+            index.append(-1)
+            generation.append(0)
+        for i in range(count):
+            index[slots[i]] = i
+        self._items = list(items)
+        self._slots = slots
+        self._removed = [False]*count
+        return removed
+
+    def clear(self):
+        """
+        This method removes every entity at once and returns them.
+
+        Parameter self: current instance of the class
+        """
+        for index in range(len(self._items)):
+            self.remove_at(index)
+        return self.flush()
@@ -7,7 +7,16 @@ correspond to a JSON file in the Data directory. Whenever you move to a new
 level, you are expected to make a new instance of the class.
 
 The subcontroller Wave manages the ship, the asteroids, and any bullets on
-screen. These are model objects. Their classes are defined in models.py.
+screen. These are model objects. The ship, asteroids and bullets are simulated
+as the bodies in bodies.py, and drawn through a BodyView from models.py.
+
+Only the simulation is imported with this module. models.py and assets.py
+(and with them game2d and Kivy) are imported by the first Wave that is not
+headless, so a headless process never loads the windowing stack.
+
+The state of a running wave can be packed into a compact bytes object with
+snapshot and put back with restore (or copied into a new Wave with clone),
+which is fast enough to do every tick for rollback or a branching search.
 
 Most of your work on this assignment will be in either this module or models.py.
 Whether a helper method belongs in this module or models.py is often a
@@ -17,11 +26,39 @@ Emily Wei (ejw235) and Amira Razack (arr258)
 12/11/24
 
 """
-from game2d import *
 from consts import *
-from models import *
+from bodies import *
+from spatial import *
+from engine import *
+from headless import *
+from pool import *
+from wavedata import *
+from profiler import *
+from store import *
 import random
 import datetime
+import struct
+import time
+
+# The fastest an asteroid can move, per BASE_RATE frame
+_ASTEROID_TOP_SPEED = max(SMALL_SPEED,MEDIUM_SPEED,LARGE_SPEED)
+
+# The start of a snapshot (see Wave.snapshot): the tag, whether the ship is
+# alive, the result, the numbers of asteroids and bullets, the asteroids
+# destroyed, the fire rate, finalship_x and finalship_y, then the ship's
+# position, angle, velocity and facing
+_SNAPSHOT_HEAD = struct.Struct('<4sBBxxIIIdddddddddd')
+# The tag at the start of every snapshot
+_SNAPSHOT_TAG = b'PWS1'
+# The results of a wave in the order of their codes in a snapshot
+_SNAPSHOT_RESULTS = (None,True,False)
+# The numbers stored for each asteroid (width, x, y and velocity) and for
+# each bullet (x, y and velocity) in a snapshot
+_ASTEROID_FIELDS = 5
+_BULLET_FIELDS = 4
+# The size of an asteroid by its width, for restoring a snapshot
+_ASTEROID_SIZES = dict([(2*asteroid_radius(size),size) for size in
+    (SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID)])
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Level is NOT allowed to access anything in app.py (Subcontrollers are not permitted
@@ -66,34 +103,84 @@ class Wave(object): #new object
     finalship_x = 0
     finalship_y = 0
     # THE ATTRIBUTES LISTED ARE SUGGESTIONS ONLY AND CAN BE CHANGED AS YOU SEE FIT
-    # Attribute _data: The data from the wave JSON, for reloading
-    # Invariant: _data is a dict loaded from a JSON file
+    # Attribute _data: The parsed wave, for reloading
+    # Invariant: _data is a WaveDefinition
     #
     # Attribute _ship: The player ship to control
-    # Invariant: _ship is a Ship object
+    # Invariant: _ship is a ShipBody object, or None once it is destroyed
     #
     # Attribute _asteroids: the asteroids on screen
-    # Invariant: _asteroids is a list of Asteroid, possibly empty
+    # Invariant: _asteroids is an EntityStore (see store.py) of AsteroidBody,
+    #            possibly empty
     #
     # Attribute _bullets: the bullets currently on screen
-    # Invariant: _bullets is a list of Bullet, possibly empty
+    # Invariant: _bullets is an EntityStore of BulletBody, possibly empty
     #
+    # Attribute _factory: the factory that makes the fragments of splits
+    # Invariant: _factory is an AsteroidFactory object
     #
-    # Attribute _firerate: the number of frames until the player can fire again
-    # Invariant: _firerate is an int >= 0
+    # Attribute _bulletpool: the pool that bullets are taken from when fired
+    #           and given back to when they leave the screen or hit something
+    # Invariant: _bulletpool is a BulletPool whose live bullets are _bullets
+    #
+    # Attribute _firerate: the number of frames since the player last fired
+    # Invariant: _firerate is an int or float >= 0 (a float once ticks are not
+    #            exactly one BASE_RATE frame long)
     #
     # Attribute _winlose: whether or not the wave is won or lost
     # Invariant: _winlose is a boolean either True or False
     #
     # Attribute _bulletsound: a sound for when the bullet is shot
-    # Invariant: _bulletsound is a Sound object
+    # Invariant: _bulletsound is the shared Sound object from the asset
+    #            registry (a NullSound if headless)
     #
     # Attribute _shipsound: a sound for when the ship collides with an asteroid
-    # Invariant: _shipsound is a Sound object
+    # Invariant: _shipsound is the shared Sound object from the asset registry
+    #            (a NullSound if headless)
     #
     # Attribute _explosion: an explosion animation for when the ship collides
     #           with an asteroid
-    # Invariant: _explosion is a GSprite object
+    # Invariant: _explosion is the shared GSprite object from the asset
+    #            registry (a NullSprite if headless)
+    #
+    # Attribute _blast: the frame of the explosion to draw next (the shared
+    #           sprite is set to it, and moved, only when it is drawn)
+    # Invariant: _blast is an int between 0 and the frame count of
+    #            _explosion minus 1, or None once the explosion played
+    #
+    # Attribute _grid: the broadphase for asteroid collisions, rebuilt every frame
+    # Invariant: _grid is a SpatialHash object
+    #
+    # Attribute _swept: whether collisions are tested along the whole path of
+    #           a step (see bullet_isSwept in bodies.py) instead of only at
+    #           its end
+    # Invariant: _swept is a boolean
+    #
+    # Attribute _engine: the array engine that moves and collides the asteroids
+    #           and bullets, if this wave is vectorized
+    # Invariant: _engine is an ArrayEngine object, or None
+    #
+    # Attribute _bodyview: the drawables for the ship, asteroids and bullets
+    # Invariant: _bodyview is a BodyView object, or None if headless
+    #
+    # Attribute _destroyed: the number of asteroids hit by bullets so far
+    # Invariant: _destroyed is an int >= 0
+    #
+    # Attribute _scale: the length of the current tick in BASE_RATE frames (the
+    #           per-frame constants in consts.py are multiplied by this)
+    # Invariant: _scale is an int or float > 0
+    #
+    # Attribute _interpolate: whether to remember where everything was at the
+    #           start of each tick, so draw can interpolate between ticks
+    # Invariant: _interpolate is a boolean
+    #
+    # Attribute _previous: the positions at the start of the last tick, keyed
+    #           by id (the object is kept too, so the id can't be reused)
+    # Invariant: _previous is a dict mapping ints to (object, x, y) tuples
+    #
+    # Attribute _profiler: the profiler that the phases of each tick and draw
+    #           are timed with
+    # Invariant: _profiler is a FrameProfiler object, or None if not profiling
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getter_for_winlose(self):
         """
@@ -106,8 +193,108 @@ class Wave(object): #new object
         """
         return self._winlose
 
+    def getter_destroyed(self):
+        """
+        This method is a getter for the number of asteroids that bullets have
+        hit (broken up or removed) in this wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._destroyed
+
+    def is_playing(self):
+        """
+        This method returns True if the ship is alive and the wave is neither
+        won nor lost yet.
+
+        Parameter self: current instance of the class
+        """
+        return self._ship != None and self._winlose == None
+
+    def getter_asteroid_count(self):
+        """
+        This method is a getter for the number of asteroids on screen.
+
+        Parameter self: current instance of the class
+        """
+        return len(self._asteroids)
+
+    def getter_asteroids(self):
+        """
+        This method is a getter for the asteroids on screen.
+
+        It returns the EntityStore itself (not a copy), so it is only meant
+        for tools like the benchmarks that need to look inside a wave.
+
+        Parameter self: current instance of the class
+        """
+        return self._asteroids
+
+    def getter_bullets(self):
+        """
+        This method is a getter for the bullets on screen.
+
+        Like getter_asteroids, it returns the EntityStore itself, for tools
+        like the benchmarks.
+
+        Parameter self: current instance of the class
+        """
+        return self._bullets
+
+    def getter_ship(self):
+        """
+        This method is a getter for the ship, or None once it is destroyed.
+
+        Parameter self: current instance of the class
+        """
+        return self._ship
+
+    def is_reloaded(self):
+        """
+        This method returns True if enough frames have passed since the ship
+        last fired for it to fire again.
+
+        Parameter self: current instance of the class
+        """
+        return self._firerate >= BULLET_RATE
+
+    def is_vectorized(self):
+        """
+        This method returns True if the wave uses the array engine.
+
+        Parameter self: current instance of the class
+        """
+        return self._engine != None
+
+    def getter_bullet_count(self):
+        """
+        This method is a getter for the number of bullets on screen.
+
+        Parameter self: current instance of the class
+        """
+        return len(self._bullets)
+
+    def is_swept(self):
+        """
+        This method returns True if collisions are tested along the whole
+        path of each step.
+
+        Parameter self: current instance of the class
+        """
+        return self._swept
+
+    def getter_bulletpool(self):
+        """
+        This method is a getter for the bullet pool, for tools like the
+        benchmarks that report how often bullets are reused.
+
+        Parameter self: current instance of the class
+        """
+        return self._bulletpool
+
     # INITIALIZER (standard form) TO CREATE SHIP AND ASTEROIDS
-    def __init__(self,l):
+    def __init__(self,l,vectorized=None,headless=False,maxbullets=MAX_BULLETS,
+            swept=None,factory=None):
         """
         Initializes a ship and list of asteroids  with its attributes, the
         bullets lists, sounds, and sprite.
@@ -115,28 +302,107 @@ class Wave(object): #new object
         Parameter self: current instance of the class
 
         Parameter l: current wave json
-        Precondition: l is a loaded json dict file
+        Precondition: l is a loaded json dict file, or the WaveDefinition of
+        one (see wavedata.py)
+
+        Parameter vectorized: whether to move and collide the asteroids and
+        bullets with the NumPy array engine (None means use ARRAY_ENGINE from
+        consts.py if numpy is installed)
+        Precondition: vectorized is a boolean or None, and is only True if
+        HAS_NUMPY is True
+
+        Parameter headless: whether to play the wave without drawables, sounds
+        or sprites (see headless.py)
+        Precondition: headless is a boolean
+
+        Parameter maxbullets: the most bullets that may be on screen at once
+        (the ship can't fire while that many are on screen)
+        Precondition: maxbullets is an int > 0
+
+        Parameter swept: whether to test collisions along the whole path of
+        each step, so fast bullets can't pass through an asteroid between two
+        ticks (None means use SWEPT_COLLISIONS from consts.py)
+        Precondition: swept is a boolean or None
+
+        Parameter factory: the factory that makes the fragments of splits
+        (None means a new, empty AsteroidFactory)
+        Precondition: factory is None or an AsteroidFactory object
         """
-        assert isinstance(l,dict)
+        assert isinstance(l,dict) or isinstance(l,WaveDefinition)
+        assert swept in (None,True,False)
+        assert vectorized in (None,True,False)
+        assert vectorized != True or HAS_NUMPY
+        assert isinstance(headless,bool)
+        if headless:
+            assets = NullAssets()
+            self._bodyview = None
+        else:
+            from assets import shared_assets
+            from models import BodyView
+            assets = shared_assets()
+            self._bodyview = BodyView()
+        if isinstance(l,dict):
+            l=parse_wave(l)
         self._data=l
-        position=self._data['ship']['position']
-        angle=self._data['ship']['angle']
-        self._ship=Ship(position,angle)
-        self._asteroids = []
-        numas = len(self._data['asteroids'])
-        for x in range(numas):
-            assize = self._data['asteroids'][x]['size']
-            asposition = self._data['asteroids'][x]['position']
-            asdirection = self._data['asteroids'][x]['direction']
-            self._asteroids.append(Asteroid(assize, asposition, asdirection))
-        self._bullets = []
+        position=list(self._data.getter_ship_position())
+        angle=self._data.getter_ship_angle()
+        self._ship=ShipBody(position,angle)
+        self._asteroids = EntityStore()
+        for asteroid in self._data.getter_asteroids():
+            self._asteroids.append(AsteroidBody(asteroid[0], asteroid[1],
+                list(asteroid[2])))
+        self._bullets = EntityStore()
+        self._bulletpool = BulletPool(BulletBody,maxbullets)
+        if factory == None:
+            factory = AsteroidFactory(AsteroidBody)
+        self._factory = factory
         self._firerate = 0
         self._winlose = None
-        self._bulletsound = Sound('pew1.wav')
-        self._shipsound = Sound('explosion.wav')
-        self._explosion = GSprite(x=self._ship.x,y=self._ship.y,
-            source='explosion.png',width=2*SHIP_RADIUS,
-            height=2*SHIP_RADIUS,format=(2,4),count=8)
+        self._destroyed = 0
+        self._scale = 1
+        self._interpolate = False
+        self._previous = {}
+        self._profiler = None
+        self._bulletsound = assets.sound(BULLET_SOUND)
+        self._shipsound = assets.sound(EXPLOSION_SOUND)
+        self._explosion = assets.sprite(EXPLOSION_IMAGE)
+        self._blast = 0
+        self._grid = SpatialHash()
+        self._swept = SWEPT_COLLISIONS if swept == None else swept
+        if vectorized == None:
+            vectorized = ARRAY_ENGINE and HAS_NUMPY
+        self._engine = None
+        if vectorized:
+            self._engine = ArrayEngine(self._asteroids,self._bullets)
+
+    def setter_interpolate(self, interpolate):
+        """
+        This method sets whether draw may interpolate between ticks.
+
+        It costs a little each tick to remember the old positions, so it is
+        off unless the caller draws between ticks (like Planetoids does).
+
+        Parameter self: current instance of the class
+
+        Parameter interpolate: whether to remember positions for interpolation
+        Precondition: interpolate is a boolean
+        """
+        assert isinstance(interpolate,bool)
+        self._interpolate = interpolate
+        self._previous = {}
+
+    def setter_profiler(self, profiler):
+        """
+        This method sets the profiler that times each phase of update and
+        draw. With no profiler (None) nothing is timed.
+
+        Parameter self: current instance of the class
+
+        Parameter profiler: the profiler
+        Precondition: profiler is a FrameProfiler object or None
+        """
+        assert profiler == None or isinstance(profiler,FrameProfiler)
+        self._profiler = profiler
 
     # UPDATE METHOD TO MOVE THE SHIP, ASTEROIDS, AND BULLETS
     def update(self,dt,input):
@@ -144,31 +410,78 @@ class Wave(object): #new object
         This method updates the game frames to move the ship, asteroids, and
         bullets as well as show if the player won or lost at the end of the game.
 
+        Each call is one simulation tick. Everything moves by dt*BASE_RATE
+        frames' worth of its per-frame speed, so a tick of 1/BASE_RATE seconds
+        plays exactly like one frame always has, and longer ticks cover more
+        ground instead of slowing the game down.
+
         Parameter: self- the instance of the class
 
         Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
+        Precondition: dt is a number (int or float) > 0
 
         Parameter: input
-        Precondition: input is an instance of GInput
+        Precondition: input is an instance of GInput (or ScriptedInput)
         """
         assert isinstance(dt, int) or isinstance(dt,float)
-        assert isinstance(input, GInput)
+        assert is_input(input)
+        self._scale = dt*BASE_RATE
+        if self._interpolate:
+            self.remember_positions()
         if self._ship != None:
-            self._firerate += 1
+            self._firerate += self._scale
             if self._winlose==None:
-                self.inputs(input)
-                for bullet in self._bullets:
-                    bullet.x += bullet.getter_for_velocity().x
-                    bullet.y += bullet.getter_for_velocity().y
-                self.wrapthebullets()
-                self.shipwrapping()
-                self.asteroid_wrapping_and_collisions()
-                if self._asteroids == []:
+                if self._profiler != None:
+                    self.profiled_step(input)
+                elif self._engine != None:
+                    self.inputs(input)
+                    self.engine_step()
+                else:
+                    self.inputs(input)
+                    self.move_all()
+                    self.wrap_all()
+                    self.collisions()
+                self.end_tick()
+                if len(self._asteroids) == 0:
                     self._winlose = True
         else:
             self._winlose = False
 
+    def profiled_step(self, input):
+        """
+        This method does the same as the playing part of update, but adds the
+        time of each phase to self._profiler.
+
+        Parameter: self- the instance of the class
+
+        Parameter: input
+        Precondition: input is an instance of GInput (or ScriptedInput)
+        """
+        clock = time.perf_counter
+        profiler = self._profiler
+        start = clock()
+        self.inputs(input)
+        now = clock()
+        profiler.add('inputs',now-start)
+        if self._engine != None:
+            start = now
+            self.engine_step()
+            profiler.add('engine_step',clock()-start)
+            return
+        # The steps of move_all and wrap_all are timed one by one, so a
+        # profile shows which of them grew
+        for phase, step in (('move_bullets',self.move_bullets),
+                ('move_ship',self.move_ship),
+                ('move_asteroids',self.move_asteroids),
+                ('wrap_ship',self.wrap_ship),
+                ('wrap_asteroids',self.wrap_asteroids),
+                ('cull_bullets',self.cull_bullets),
+                ('collisions',self.collisions)):
+            start = now
+            step()
+            now = clock()
+            profiler.add(phase,now-start)
+
     def inputs(self, input):
         """
         This method checks the user's key input to turn the ship, change
@@ -178,69 +491,81 @@ class Wave(object): #new object
         Parameter: self- the instance of the class
 
         Parameter: input
-        Precondition: input is an instance of GInput
+        Precondition: input is an instance of GInput (or ScriptedInput)
         """
-        assert isinstance(input, GInput)
+        assert is_input(input)
         if input.is_key_down('left'):
-            self._ship.angle += SHIP_TURN_RATE
+            self._ship.angle += SHIP_TURN_RATE*self._scale
             self._ship.turn(self._ship.angle)
         if input.is_key_down('right'):
-            self._ship.angle -= SHIP_TURN_RATE
+            self._ship.angle -= SHIP_TURN_RATE*self._scale
             self._ship.turn(self._ship.angle)
         if input.is_key_down('up'):
             impulse=self._ship.getter_for_impulse()
-            self._ship._velocity += impulse
+            self._ship._velocity += impulse*self._scale
         if input.is_key_down('spacebar') and self._firerate>=BULLET_RATE:
             facing = self._ship.getter_for_facing()
             bullet_posx = facing.x*SHIP_RADIUS+self._ship.x
             bullet_posy = facing.y*SHIP_RADIUS+self._ship.y
-            self._bullets.append(Bullet([bullet_posx,bullet_posy],
-                self._ship.getter_for_facing()))
-            self._firerate = 0
-            self._bulletsound.play()
+            if self.spawn_bullet([bullet_posx,bullet_posy],
+                    self._ship.getter_for_facing()) != None:
+                self._firerate = 0
+                self._bulletsound.play()
 
-    def wrapthebullets(self):
+    def spawn_bullet(self, position, direction):
         """
-        This method goes through the self._bullets list and wraps their movement
-        on the screen.
+        This method adds a bullet from the bullet pool to the wave and returns
+        it, or returns None if the most bullets are already on screen.
 
-        Parameter: self- current instance of the class
+        Parameter: self- the instance of the class
 
-        i: The increment counter over the self._bullets list.
+        Parameter: position
+        Precondition: A list of two ints or floats
 
-        DEAD_ZONE: The area outside of the bounds of the game screen that
-        helps wrap the movement of items on the screen.
+        Parameter: direction
+        Precondition: A Vector2 object of length 1
+        """
+        bullet = self._bulletpool.acquire(position,direction)
+        if bullet == None:
+            return None
+        # A reused bullet must not be interpolated from where it last was
+        self._previous.pop(id(bullet),None)
+        self._bullets.append(bullet)
+        if self._engine != None:
+            self._engine.add_bullet(bullet)
+        return bullet
+
+    def move_all(self):
+        """
+        This method moves the bullets, the ship and the asteroids by their
+        velocity (see move_bullets, move_ship and move_asteroids). Nothing is
+        wrapped yet, which wrap_all does for all of them at once.
 
-        GAME_WIDTH: The integer representing the width of the game screen.
-        GAME_HEIGHT: The integer representing the height of the game screen.
+        Parameter: self- the instance of the class
         """
-        i = 0
-        while i < len(self._bullets):
-            if (self._bullets[i].x < -DEAD_ZONE):
-                del self._bullets[i]
-            elif (self._bullets[i].y < -DEAD_ZONE):
-                del self._bullets[i]
-            elif (self._bullets[i].x > GAME_WIDTH+DEAD_ZONE):
-                del self._bullets[i]
-            elif (self._bullets[i].y > GAME_HEIGHT+DEAD_ZONE):
-                del self._bullets[i]
-            else:
-                i += 1
+        self.move_bullets()
+        self.move_ship()
+        self.move_asteroids()
 
-    def shipwrapping(self):
+    def move_bullets(self):
         """
-        This method checks if the ship's speed is too high and
-        wraps the ships movement on the screen.
+        This method adds the velocity of every bullet to its position.
 
         Parameter: self- the instance of the class
+        """
+        scale = self._scale
+        for bullet in self._bullets:
+            bullet.x += bullet.getter_for_velocity().x*scale
+            bullet.y += bullet.getter_for_velocity().y*scale
 
-        SHIP_MAX_SPEED: The maximum speed the ship can have.
+    def move_ship(self):
+        """
+        This method checks if the ship's speed is too high and
+        moves the ship by its velocity.
 
-        GAME_WIDTH: The integer representing the width of the game screen.
-        GAME_HEIGHT: The integer representing the height of the game screen.
+        Parameter: self- the instance of the class
 
-        DEAD_ZONE: The area outside of the bounds of the game screen that
-        helps wrap the movement of items on the screen.
+        SHIP_MAX_SPEED: The maximum speed the ship can have.
 
         self._ship: The ship object.
 
@@ -248,40 +573,92 @@ class Wave(object): #new object
 
         self._ship.x: The x position of the ship.
         self._ship.y: The y position of the ship.
-
-        self._ship.right: The right edge of the ship object.
-        self._ship.top: The top edge of the ship object.
-        self._ship.left: The left edge of the ship object.
-        self._ship.bottom: The bottom edge of the ship object.
         """
         if self._ship._velocity.length() > SHIP_MAX_SPEED:
             normalized=self._ship._velocity.normalize()
             multiplied=normalized.__mul__(SHIP_MAX_SPEED)
             self._ship._velocity=multiplied
-        self._ship.x+=self._ship._velocity.x
-        self._ship.y+=self._ship._velocity.y
-        if (self._ship.right < -DEAD_ZONE):
-            self._ship.right = GAME_WIDTH+DEAD_ZONE
-        if (self._ship.top < -DEAD_ZONE):
-            self._ship.bottom = GAME_HEIGHT+DEAD_ZONE
-        if (self._ship.left > GAME_WIDTH+DEAD_ZONE):
-            self._ship.right = -DEAD_ZONE
-        if (self._ship.bottom > GAME_HEIGHT+DEAD_ZONE):
-            self._ship.top = -DEAD_ZONE
-
-    def asteroid_wrapping_and_collisions(self):
+        self._ship.x+=self._ship._velocity.x*self._scale
+        self._ship.y+=self._ship._velocity.y*self._scale
+
+    def move_asteroids(self):
         """
-        This method checks if the ship's speed is too high and
-        wraps the ships movement on the screen.
+        This method adds the velocity of every asteroid to its position.
 
         Parameter: self- the instance of the class
+        """
+        scale = self._scale
+        for asteroid in self._asteroids:
+            asteroid.x += asteroid._velocity.x*scale
+            asteroid.y += asteroid._velocity.y*scale
 
-        GAME_WIDTH: The integer representing the width of the game screen.
-        GAME_HEIGHT: The integer representing the height of the game screen.
+    def wrap_all(self):
+        """
+        This method wraps the ship and every asteroid around the screen, and
+        removes every bullet that left the screen, in one stage (see
+        wrap_ship, wrap_asteroids and cull_bullets).
+
+        The ship and asteroids move on a torus the size of the screen and
+        its dead zone (see wrap_bodies in bodies.py), so each coordinate is
+        wrapped with one modular step instead of four edge tests. Bullets
+        don't wrap: one that leaves the screen and its dead zone is removed.
+
+        Parameter: self- current instance of the class
+        """
+        self.wrap_ship()
+        self.wrap_asteroids()
+        self.cull_bullets()
+
+    def wrap_ship(self):
+        """
+        This method moves the ship back onto its torus if it left it.
+
+        Parameter: self- current instance of the class
+        """
+        if self._ship != None:
+            wrap_bodies((self._ship,))
+
+    def wrap_asteroids(self):
+        """
+        This method moves every asteroid that left its torus back onto it.
+
+        Parameter: self- current instance of the class
+        """
+        wrap_bodies(self._asteroids)
+
+    def cull_bullets(self):
+        """
+        This method marks every bullet that left the screen and its dead zone
+        for removal.
+
+        Parameter: self- current instance of the class
 
         DEAD_ZONE: The area outside of the bounds of the game screen that
         helps wrap the movement of items on the screen.
 
+        GAME_WIDTH: The integer representing the width of the game screen.
+        GAME_HEIGHT: The integer representing the height of the game screen.
+        """
+        right = GAME_WIDTH+DEAD_ZONE
+        top = GAME_HEIGHT+DEAD_ZONE
+        i = 0
+        for bullet in self._bullets:
+            if not (-DEAD_ZONE <= bullet.x <= right and
+                    -DEAD_ZONE <= bullet.y <= top):
+                self._bullets.remove_at(i)
+            i += 1
+
+    def collisions(self):
+        """
+        This method checks for collisions of the asteroids with the ship and
+        the bullets, once everything has moved and wrapped.
+
+        The asteroids are put in a spatial hash (self._grid) first, so the
+        ship and each bullet are only tested against the asteroids in
+        neighbouring cells instead of against every asteroid on screen.
+
+        Parameter: self- the instance of the class
+
         ast: The increment counter for a single asteroid in self._asteroids.
 
         self._asteroids[ast]: An individual asteroid object in self._asteroids.
@@ -294,93 +671,427 @@ class Wave(object): #new object
 
         self._bullets: The list of bullet objects in the game.
 
-        bluh: The three Vector2 resultant vectors calculated for the medium or
-        large asteroid.
+        destroyed: The indices of the asteroids hit this frame, in the order
+        they were hit.
         """
-        ast=0
-        while ast < len(self._asteroids):
-            self._asteroids[ast].x += self._asteroids[ast]._velocity.x
-            self._asteroids[ast].y += self._asteroids[ast]._velocity.y
-            self.asteroid_wrap(ast)
-            if (self._ship != None):
-                if self._ship.isCollided(self._asteroids[ast]):
+        scale = self._scale
+        self._grid.rebuild(self._asteroids)
+        if (self._ship != None):
+            reach = None
+            if self._swept:
+                reach = SHIP_RADIUS+LARGE_RADIUS+(SHIP_MAX_SPEED+
+                    _ASTEROID_TOP_SPEED)*scale
+            for ast in self._grid.query(self._ship.x,self._ship.y,reach):
+                if self.ship_hits(self._asteroids[ast]):
                     Wave.finalship_x = self._ship.x
                     Wave.finalship_y = self._ship.y
                     self._ship = None
                     self._shipsound.play()
-            bullet=0
-            while bullet < len(self._bullets):
-                if ast in range(len(self._asteroids)):
-                    asteroidd=self._asteroids[ast]
-                if self._bullets[bullet].bullet_isCollided(asteroidd):
-                    self._bullets.remove(self._bullets[bullet])
-                    size = asteroidd.get_size()
-                    if size=='medium' or size=='large':
-                        bluh=asteroidd.resultant_vectors()
-                        self.place_asteroids(asteroidd.get_size(),bluh,ast)
-                        del self._asteroids[ast]
-                    elif size=='small':
-                        del self._asteroids[ast]
-                else:
-                    bullet+=1
-            if ast < len(self._asteroids):
-                ast+=1
+                    break
+        reach = None
+        if self._swept:
+            reach = BULLET_RADIUS+LARGE_RADIUS+(BULLET_SPEED+
+                _ASTEROID_TOP_SPEED)*scale
+        destroyed=[]
+        for bullet in range(len(self._bullets)):
+            if not self._bullets.is_alive(bullet):
+                continue
+            for ast in self._grid.query(self._bullets[bullet].x,
+                    self._bullets[bullet].y,reach):
+                if self._asteroids.is_alive(ast) and self.bullet_hits(
+                        self._bullets[bullet],self._asteroids[ast]):
+                    self._bullets.remove_at(bullet)
+                    self._asteroids.remove_at(ast)
+                    destroyed.append(ast)
+                    break
+        self.break_asteroids(destroyed)
+
+    def ship_hits(self,asteroid):
+        """
+        This method returns True if the ship hit an asteroid this step,
+        along its whole path if the wave is swept.
+
+        Parameter: self- the instance of the class
 
-    def asteroid_wrap(self,ast):
+        Parameter: asteroid
+        Precondition: asteroid is an AsteroidBody in self._asteroids
         """
-        This method wraps the movement of the asteroids on the screen.
+        if self._swept:
+            return self._ship.isSwept(asteroid,self._scale)
+        return self._ship.isCollided(asteroid)
 
-        Parameter: self- current instance of the class
+    def bullet_hits(self,bullet,asteroid):
+        """
+        This method returns True if a bullet hit an asteroid this step,
+        along its whole path if the wave is swept.
 
-        Parameter: ast
-        Precondition: An integer between 0 and the length of self._asteroids
+        Parameter: self- the instance of the class
 
-        DEAD_ZONE: The area outside of the bounds of the game screen that
-        helps wrap the movement of items on the screen.
+        Parameter: bullet
+        Precondition: bullet is a BulletBody in self._bullets
 
-        GAME_WIDTH: The integer representing the width of the game screen.
-        GAME_HEIGHT: The integer representing the height of the game screen.
+        Parameter: asteroid
+        Precondition: asteroid is an AsteroidBody in self._asteroids
+        """
+        if self._swept:
+            return bullet.bullet_isSwept(asteroid,self._scale)
+        return bullet.bullet_isCollided(asteroid)
+
+    def break_asteroids(self,destroyed):
+        """
+        This method splits every asteroid that was hit this frame and marks
+        the hit asteroids for removal from self._asteroids at the end of the
+        tick (see end_tick). It returns the list of fragments that were added.
+
+        The fragments are appended by place_asteroids, which never moves the
+        asteroids already in the store, so the indices in destroyed stay valid
+        for the whole tick.
+
+        Parameter: self- the instance of the class
+
+        Parameter: destroyed
+        Precondition: A list of distinct integers between 0 and the length of
+        self._asteroids
+        """
+        assert isinstance(destroyed,list)
+        if destroyed == []:
+            return []
+        self._destroyed += len(destroyed)
+        count = len(self._asteroids)
+        for ast in destroyed:
+            self._asteroids.remove_at(ast)
+            asteroidd=self._asteroids[ast]
+            size = asteroidd.get_size()
+            if size=='medium' or size=='large':
+                bluh=asteroidd.resultant_vectors()
+                self.place_asteroids(size,bluh,ast)
+        return [self._asteroids[i] for i in range(count,len(self._asteroids))]
+
+    def engine_step(self):
         """
-        if (self._asteroids[ast].right < -DEAD_ZONE):
-            self._asteroids[ast].right = GAME_WIDTH+DEAD_ZONE
-        if (self._asteroids[ast].top < -DEAD_ZONE):
-            self._asteroids[ast].bottom = GAME_HEIGHT+DEAD_ZONE
-        if (self._asteroids[ast].left > GAME_WIDTH+DEAD_ZONE):
-            self._asteroids[ast].right = -DEAD_ZONE
-        if (self._asteroids[ast].bottom > GAME_HEIGHT+DEAD_ZONE):
-            self._asteroids[ast].top = -DEAD_ZONE
+        This method does the same work as move_all, wrap_all and collisions,
+        but with the array engine doing the moving, wrapping and overlap tests
+        of the bullets and asteroids in batches.
+
+        The asteroids that are hit are synced to their drawables first, so
+        that place_asteroids sees their current position, and the engine is
+        then told about the fragments that were added. Removed rows are
+        dropped from the engine by end_tick.
+
+        Parameter: self- the instance of the class
+        """
+        engine = self._engine
+        onscreen = engine.move_bullets(self._scale)
+        if not onscreen.all():
+            for bullet in range(len(self._bullets)):
+                if not onscreen[bullet]:
+                    self._bullets.remove_at(bullet)
+        self.move_ship()
+        wrap_bodies((self._ship,))
+        engine.move_asteroids(self._scale)
+        if self._ship != None:
+            velocity = None
+            if self._swept:
+                velocity = (self._ship._velocity.x,self._ship._velocity.y)
+            if engine.ship_hit(self._ship.x,self._ship.y,SHIP_RADIUS,
+                    velocity,self._scale) != -1:
+                Wave.finalship_x = self._ship.x
+                Wave.finalship_y = self._ship.y
+                self._ship = None
+                self._shipsound.play()
+        hits = engine.bullet_hits(self._scale if self._swept else None,
+            onscreen)
+        if hits != []:
+            for pair in hits:
+                self._bullets.remove_at(pair[0])
+            destroyed = [pair[1] for pair in hits]
+            for ast in destroyed:
+                engine.sync_asteroid(ast)
+            for asteroid in self.break_asteroids(destroyed):
+                engine.add_asteroid(asteroid)
+
+    def end_tick(self):
+        """
+        This method removes the bullets and asteroids that were marked for
+        removal during the tick, and gives them back to the bullet pool and
+        the fragment factory. The array engine drops the same rows in the
+        same order. Then the factory replaces a few of the fragments that
+        splits took from it (if any), so that the next big chain of splits
+        needs to make fewer.
+
+        Parameter: self- the instance of the class
+        """
+        if self._engine != None:
+            self._engine.remove_bullets(self._bullets.getter_pending())
+            self._engine.remove_asteroids(self._asteroids.getter_pending())
+        for bullet in self._bullets.flush():
+            self._bulletpool.release(bullet)
+        for asteroid in self._asteroids.flush():
+            self._factory.release(asteroid)
+        self._factory.refill()
+
+    # SNAPSHOT METHODS TO SAVE AND RESTORE THE STATE OF THE WAVE
+    def snapshot(self):
+        """
+        This method returns the state of the wave as a bytes object that
+        restore can put back.
+
+        The layout is fixed: _SNAPSHOT_HEAD, then five little-endian doubles
+        for each asteroid (width, x, y and velocity) and four for each bullet
+        (x, y and velocity), in the order of their stores. The state is
+        everything update reads: the ship, the asteroids, the bullets, the
+        fire rate, the result, the asteroids destroyed, and the class
+        attributes finalship_x and finalship_y. The wave's definition,
+        settings, sounds and drawables are not in it.
+
+        Parameter: self- the instance of the class
+        """
+        if self._engine != None:
+            self._engine.sync()
+        ship = self._ship
+        if ship != None:
+            shipstate = (ship.x,ship.y,ship.angle,ship._velocity.x,
+                ship._velocity.y,ship._facing.x,ship._facing.y)
+        else:
+            shipstate = (0,0,0,0,0,0,0)
+        values = []
+        extend = values.extend
+        for asteroid in self._asteroids:
+            velocity = asteroid._velocity
+            extend((asteroid.width,asteroid.x,asteroid.y,velocity.x,
+                velocity.y))
+        for bullet in self._bullets:
+            velocity = bullet._velocity
+            extend((bullet.x,bullet.y,velocity.x,velocity.y))
+        head = _SNAPSHOT_HEAD.pack(_SNAPSHOT_TAG,ship != None,
+            _SNAPSHOT_RESULTS.index(self._winlose),len(self._asteroids),
+            len(self._bullets),self._destroyed,self._firerate,
+            Wave.finalship_x,Wave.finalship_y,*shipstate)
+        return head+struct.pack('<%dd' % len(values),*values)
+
+    def restore(self, data):
+        """
+        This method puts back the state of a snapshot, so the wave plays on
+        exactly as the wave it was taken from did.
+
+        The bodies already in the wave are reused where possible (the
+        asteroids by size), so a rollback to a similar state makes few new
+        objects. New fragments come from the fragment factory, and the
+        bodies left over go back to it and to the bullet pool. Every entity
+        gets a new handle (see store.py).
+
+        Parameter: self- the instance of the class
+
+        Parameter: data
+        Precondition: data is a bytes object returned by snapshot, of a wave
+        whose bullets fit in the bullet pool of this one, between ticks
+        """
+        assert isinstance(data,(bytes,bytearray,memoryview))
+        head = _SNAPSHOT_HEAD.unpack_from(data)
+        assert head[0] == _SNAPSHOT_TAG, 'data is not a snapshot of a wave'
+        count = head[3]
+        bullets = head[4]
+        total = _ASTEROID_FIELDS*count+_BULLET_FIELDS*bullets
+        assert len(data) == _SNAPSHOT_HEAD.size+8*total, \
+            'the snapshot is '+str(len(data))+' bytes'
+        values = struct.unpack_from('<%dd' % total,data,_SNAPSHOT_HEAD.size)
+        if head[1]:
+            if self._ship == None:
+                self._ship = ShipBody([head[9],head[10]],head[11])
+            self._ship.x = head[9]
+            self._ship.y = head[10]
+            self._ship.angle = head[11]
+            self._ship._velocity = Vector2(head[12],head[13])
+            self._ship._facing = Vector2(head[14],head[15])
+        else:
+            self._ship = None
+        self._winlose = _SNAPSHOT_RESULTS[head[2]]
+        self._destroyed = head[5]
+        self._firerate = head[6]
+        Wave.finalship_x = head[7]
+        Wave.finalship_y = head[8]
+        spares = {}
+        for asteroid in self._asteroids:
+            spares.setdefault(asteroid.width,[]).append(asteroid)
+        asteroids = []
+        still = Vector2(0,0)
+        large = None
+        fields = iter(values[:_ASTEROID_FIELDS*count])
+        for width, x, y, vx, vy in zip(fields,fields,fields,fields,fields):
+            width = int(width)
+            if spares.get(width):
+                asteroid = spares[width].pop()
+                asteroid.x = x
+                asteroid.y = y
+            elif width != 2*LARGE_RADIUS:
+                asteroid = self._factory.acquire(_ASTEROID_SIZES[width],(x,y),
+                    still)
+            elif large == None:
+                asteroid = large = AsteroidBody(LARGE_ASTEROID,[x,y],still)
+            else:
+                asteroid = large.clone((x,y),still)
+            asteroid._velocity.x = vx
+            asteroid._velocity.y = vy
+            asteroids.append(asteroid)
+        self._asteroids.replace(asteroids)
+        for width in spares:
+            for asteroid in spares[width]:
+                self._factory.release(asteroid)
+        old = self._bullets.replace([])
+        bullets = []
+        fields = iter(values[_ASTEROID_FIELDS*count:])
+        for x, y, vx, vy in zip(fields,fields,fields,fields):
+            if old != []:
+                bullet = old.pop()
+                bullet.x = x
+                bullet.y = y
+            else:
+                bullet = self._bulletpool.acquire([x,y],still)
+                assert bullet != None, 'the bullets do not fit in the pool'
+            bullet._velocity.x = vx
+            bullet._velocity.y = vy
+            bullets.append(bullet)
+        self._bullets.replace(bullets)
+        for bullet in old:
+            self._bulletpool.release(bullet)
+        self._previous = {}
+        if self._engine != None:
+            self._engine = ArrayEngine(self._asteroids,self._bullets)
+
+    def clone(self):
+        """
+        This method returns a new Wave with the same definition and settings
+        as this one, restored to a snapshot of it. The clone starts with no
+        asteroids, so nothing is parsed or made twice, and it is cheap enough
+        to branch a search from.
+
+        The clone has its own bullet pool and fragment factory, so the two
+        waves can be played on independently.
+
+        Parameter: self- the instance of the class
+        """
+        empty = WaveDefinition(self._data.getter_ship_position(),
+            self._data.getter_ship_angle(),())
+        wave = Wave(empty,vectorized=self._engine != None,
+            headless=self._bodyview == None,
+            maxbullets=self._bulletpool.getter_maxlive(),swept=self._swept)
+        wave._data = self._data
+        wave.restore(self.snapshot())
+        return wave
 
     # DRAW METHOD TO DRAW THE SHIP, ASTEROIDS, AND BULLETS
-    def draw(self,view):
+    def draw(self,view,alpha=1):
         """
         The draw method to draw the ship, asteroid, and bullets.
 
+        If interpolation is on (see setter_interpolate) and alpha is less than
+        1, every object that existed at the start of the last tick is drawn
+        alpha of the way from where it was then to where it is now. Objects
+        that wrapped around the screen during the tick are drawn where they
+        are now.
+
         Parameter: view
-        Precondition: is an instance of GView
+        Precondition: is an instance of GView (or NullView if headless)
+
+        Parameter: alpha
+        Precondition: An int or float between 0 and 1, how far the time being
+        drawn is between the last two ticks
 
         self._ship: The ship object
         self._asteroids: The asteroid objects in the game.
         self._bullets: The bullet objects in the game.
         """
-        assert isinstance(view, GView)
+        assert is_view(view)
+        assert isinstance(alpha,int) or isinstance(alpha,float)
+        assert 0 <= alpha <= 1
+        if self._profiler != None:
+            start = time.perf_counter()
+            self.draw_all(view,alpha)
+            self._profiler.add('wave_draw',time.perf_counter()-start)
+        else:
+            self.draw_all(view,alpha)
+
+    def draw_all(self,view,alpha):
+        """
+        This method does the drawing for draw.
+
+        Parameter: view
+        Precondition: is an instance of GView (or NullView if headless)
+
+        Parameter: alpha
+        Precondition: An int or float between 0 and 1
+        """
+        if self._engine != None:
+            self._engine.sync()
         if self._ship != None:
-            self._ship.draw(view)
+            self.draw_object(self._ship,view,alpha)
             for x in range(len(self._bullets)):
-                self._bullets[x].draw(view)
+                self.draw_object(self._bullets[x],view,alpha)
         else:
-            if self._explosion != None:
+            if self._blast != None:
+                self._explosion.frame = self._blast
                 self._explosion.x = Wave.finalship_x
                 self._explosion.y = Wave.finalship_y
                 self._explosion.draw(view)
-                if self._explosion.frame < self._explosion.count-1:
-                    self._explosion.frame += 1
-                if self._explosion.frame == self._explosion.count-1:
-                    self._explosion = None
+                if self._blast < self._explosion.count-1:
+                    self._blast += 1
+                if self._blast == self._explosion.count-1:
+                    self._blast = None
         for x in range(len(self._asteroids)):
-            self._asteroids[x].draw(view)
-        if self._asteroids == [] and self._winlose == True:
-            self._bullets = []
-            self._ship.draw(view)
+            self.draw_object(self._asteroids[x],view,alpha)
+        if len(self._asteroids) == 0 and self._winlose == True:
+            for bullet in self._bullets.clear():
+                self._bulletpool.release(bullet)
+            self.draw_object(self._ship,view,1)
+        if self._bodyview != None:
+            self._bodyview.sweep()
+            self._bodyview.restock(self._factory.getter_handed(),
+                FRAGMENT_REFILL)
+
+    def draw_object(self,obj,view,alpha):
+        """
+        This method draws a single body, interpolated between its position
+        at the start of the last tick and its position now. The body is drawn
+        with its drawable from self._bodyview (nothing is drawn if headless).
+
+        Parameter: obj
+        Precondition: obj is a ShipBody, AsteroidBody or BulletBody
+
+        Parameter: view
+        Precondition: is an instance of GView (or NullView if headless)
+
+        Parameter: alpha
+        Precondition: An int or float between 0 and 1
+        """
+        if self._bodyview == None:
+            return
+        x = obj.x
+        y = obj.y
+        if alpha < 1 and id(obj) in self._previous:
+            previous = self._previous[id(obj)]
+            if (abs(x-previous[1]) <= GAME_WIDTH/2 and
+                    abs(y-previous[2]) <= GAME_HEIGHT/2):
+                x = previous[1]+(x-previous[1])*alpha
+                y = previous[2]+(y-previous[2])*alpha
+        self._bodyview.bind(obj,x,y).draw(view)
+
+    def remember_positions(self):
+        """
+        This method records where the ship, asteroids and bullets are at the
+        start of a tick, for draw to interpolate from.
+
+        Parameter: self- the instance of the class
+        """
+        if self._engine != None:
+            self._engine.sync()
+        previous = {}
+        if self._ship != None:
+            previous[id(self._ship)] = (self._ship,self._ship.x,self._ship.y)
+        for asteroid in self._asteroids:
+            previous[id(asteroid)] = (asteroid,asteroid.x,asteroid.y)
+        for bullet in self._bullets:
+            previous[id(bullet)] = (bullet,bullet.x,bullet.y)
+        self._previous = previous
 
     # HELPER METHODS FOR PHYSICS AND COLLISION DETECTION
     def place_asteroids(self,size,bluh,ast):
@@ -431,7 +1142,7 @@ class Wave(object): #new object
                 else:
                     newposition=(SMALL_RADIUS*bluh[i].x+self._asteroids[ast].x,
                         SMALL_RADIUS*bluh[i].y+self._asteroids[ast].y)
-                self._asteroids.append(Asteroid('small',newposition,velocity))
+                self.add_fragment('small',newposition,velocity)
         elif size=='large':
             for i in range(3):
                 velocity=bluh[i]*MEDIUM_SPEED
@@ -441,4 +1152,23 @@ class Wave(object): #new object
                 else:
                     newposition=(MEDIUM_RADIUS*bluh[i].x+self._asteroids[ast].x,
                         MEDIUM_RADIUS*bluh[i].y+self._asteroids[ast].y)
-                self._asteroids.append(Asteroid('medium',newposition,velocity))
+                self.add_fragment('medium',newposition,velocity)
+
+    def add_fragment(self,size,position,velocity):
+        """
+        This method appends a fragment of a split from the fragment factory
+        to self._asteroids.
+
+        Parameter: size
+        Precondition: A string that is either 'small' or 'medium'
+
+        Parameter: position
+        Precondition: A tuple of two ints or floats
+
+        Parameter: velocity
+        Precondition: A Vector2 object (see AsteroidPhysics.reset)
+        """
+        asteroid = self._factory.acquire(size,position,velocity)
+        # A reused asteroid must not be interpolated from where it last was
+        self._previous.pop(id(asteroid),None)
+        self._asteroids.append(asteroid)
@@ -0,0 +1,277 @@
+"""
+Wave data module for Planetoids
+
+This module contains the parsed form of a wave JSON file and a cache of them.
+
+A wave JSON file is a dict with the ship (its position and angle) and a list of
+asteroids (each with a size, position and direction). parse_wave checks that
+a dict has that shape and turns it into a WaveDefinition, which only has
+getters and stores everything as tuples, so one definition can be handed to
+any number of Waves without any of them changing it.
+
+WaveCache loads, parses and keeps the definitions of the wave files, so
+starting the same wave again (a retry, or the next wave) needs no disk access
+and no JSON parsing. It counts how many requests were served from the cache
+(hits) and how many had to load a file (misses). A cache may be shared with
+the thread that prefetches the next waves (see campaign.py), so loading and
+counting are done under a lock.
+
+Emily Wei (ejw235) and Amira Razack (arr258)
+"""
+from consts import *
+import threading
+
+
+def _number(value, what):
+    """
+    Returns value if it is an int or float (but not a bool).
+
+    Parameter value: the value to check
+    Precondition: None
+
+    Parameter what: the name of the value for the error message
+    Precondition: what is a string
+    """
+    assert (isinstance(value,int) or isinstance(value,float)) and \
+        not isinstance(value,bool), repr(value)+' is not a number for '+what
+    return value
+
+
+def _pair(value, what):
+    """
+    Returns value as a tuple of two numbers.
+
+    Parameter value: the value to check
+    Precondition: None
+
+    Parameter what: the name of the value for the error message
+    Precondition: what is a string
+    """
+    assert isinstance(value,list) or isinstance(value,tuple), \
+        repr(value)+' is not a pair for '+what
+    assert len(value) == 2, repr(value)+' is not a pair for '+what
+    return (_number(value[0],what),_number(value[1],what))
+
+
+def parse_wave(data):
+    """
+    Returns the WaveDefinition of a wave JSON dict.
+
+    Parameter data: the wave, as loaded from a wave JSON file
+    Precondition: data is a dict with the keys 'ship' (a dict with a
+    'position' pair and an 'angle') and 'asteroids' (a list of dicts with a
+    'size', a 'position' pair and a 'direction' pair)
+    """
+    assert isinstance(data,dict), repr(data)+' is not a wave'
+    assert 'ship' in data and 'asteroids' in data, 'a wave needs a ship '+\
+        'and asteroids'
+    ship = data['ship']
+    assert isinstance(ship,dict), repr(ship)+' is not a ship'
+    position = _pair(ship.get('position'),'the ship position')
+    angle = _number(ship.get('angle'),'the ship angle')
+    assert isinstance(data['asteroids'],list), 'the asteroids are not a list'
+    asteroids = []
+    for asteroid in data['asteroids']:
+        assert isinstance(asteroid,dict), repr(asteroid)+' is not an asteroid'
+        size = asteroid.get('size')
+        assert size in (SMALL_ASTEROID,MEDIUM_ASTEROID,LARGE_ASTEROID), \
+            repr(size)+' is not an asteroid size'
+        asteroids.append((size,_pair(asteroid.get('position'),
+            'an asteroid position'),_pair(asteroid.get('direction'),
+            'an asteroid direction')))
+    return WaveDefinition(position,angle,asteroids)
+
+
+def wave_json(definition):
+    """
+    Returns a wave JSON dict with the same ship and asteroids as a
+    definition (the opposite of parse_wave).
+
+    Parameter definition: the parsed wave
+    Precondition: definition is a WaveDefinition
+    """
+    assert isinstance(definition,WaveDefinition)
+    asteroids = []
+    for asteroid in definition.getter_asteroids():
+        asteroids.append({'size':asteroid[0],'position':list(asteroid[1]),
+            'direction':list(asteroid[2])})
+    return {'ship':{'position':list(definition.getter_ship_position()),
+        'angle':definition.getter_ship_angle()},'asteroids':asteroids}
+
+
+class WaveDefinition(object):
+    """
+    A class representing a parsed wave: where the ship starts and which
+    asteroids there are.
+
+    A definition is never changed once it is made, so it is safe to share
+    between Waves.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _position: the starting position of the ship
+    # Invariant: _position is a tuple of two numbers
+    #
+    # Attribute _angle: the starting angle of the ship in degrees
+    # Invariant: _angle is an int or float
+    #
+    # Attribute _asteroids: the asteroids at the start of the wave
+    # Invariant: _asteroids is a tuple of (size, position, direction) tuples,
+    #            where position and direction are tuples of two numbers
+    __slots__ = ('_position','_angle','_asteroids')
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_ship_position(self):
+        """
+        This method is a getter for the starting position of the ship.
+
+        Parameter self: current instance of the class
+        """
+        return self._position
+
+    def getter_ship_angle(self):
+        """
+        This method is a getter for the starting angle of the ship.
+
+        Parameter self: current instance of the class
+        """
+        return self._angle
+
+    def getter_asteroids(self):
+        """
+        This method is a getter for the (size, position, direction) tuples of
+        the asteroids.
+
+        Parameter self: current instance of the class
+        """
+        return self._asteroids
+
+    # INITIALIZER TO STORE A PARSED WAVE
+    def __init__(self, position, angle, asteroids):
+        """
+        Initializes a wave definition. Use parse_wave to make one from JSON.
+
+        Parameter position: the starting position of the ship
+        Precondition: position is a tuple of two numbers
+
+        Parameter angle: the starting angle of the ship in degrees
+        Precondition: angle is an int or float
+
+        Parameter asteroids: the asteroids at the start of the wave
+        Precondition: asteroids is a list or tuple of (size, position,
+        direction) tuples
+        """
+        self._position = position
+        self._angle = angle
+        self._asteroids = tuple(asteroids)
+
+
+class WaveCache(object):
+    """
+    A class that loads, parses and keeps wave definitions by file name.
+    """
+    # LIST ANY ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+
+    # Attribute _loader: the function that loads a wave JSON file
+    # Invariant: _loader is a callable taking a file name and returning a dict
+    #
+    # Attribute _waves: the definitions loaded so far
+    # Invariant: _waves is a dict mapping file names to WaveDefinitions
+    #
+    # Attribute _hits: the number of gets served from _waves
+    # Invariant: _hits is an int >= 0
+    #
+    # Attribute _misses: the number of gets that had to load a file
+    # Invariant: _misses is an int >= 0
+    #
+    # Attribute _lock: the lock held while a thread loads or counts
+    # Invariant: _lock is a threading.Lock
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getter_hits(self):
+        """
+        This method is a getter for the number of gets served from the cache.
+
+        Parameter self: current instance of the class
+        """
+        return self._hits
+
+    def getter_misses(self):
+        """
+        This method is a getter for the number of gets that had to load a file.
+
+        Parameter self: current instance of the class
+        """
+        return self._misses
+
+    def getter_names(self):
+        """
+        This method returns the sorted names of the cached waves.
+
+        Parameter self: current instance of the class
+        """
+        return sorted(self._waves)
+
+    # INITIALIZER TO MAKE AN EMPTY CACHE
+    def __init__(self, loader):
+        """
+        Initializes an empty cache.
+
+        Parameter loader: the function that loads a wave JSON file (like
+        GameApp.load_json)
+        Precondition: loader is a callable taking a file name and returning a
+        dict
+        """
+        assert callable(loader)
+        self._loader = loader
+        self._waves = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    # ADDITIONAL METHODS
+    def preload(self, names):
+        """
+        This method loads and parses every named wave that is not cached yet.
+
+        A wave file that is missing or malformed fails here, instead of when
+        the player reaches it. Preloading does not count as a hit or miss.
+
+        Parameter names: the names of the wave files
+        Precondition: names is an iterable of strings
+        """
+        with self._lock:
+            for name in names:
+                if not name in self._waves:
+                    self._waves[name] = self._load(name)
+
+    def get(self, name):
+        """
+        This method returns the definition of a wave, loading it first if it
+        is not cached.
+
+        Parameter name: the name of the wave file
+        Precondition: name is a string
+        """
+        assert isinstance(name,str)
+        with self._lock:
+            definition = self._waves.get(name)
+            if definition != None:
+                self._hits += 1
+                return definition
+            self._misses += 1
+            definition = self._load(name)
+            self._waves[name] = definition
+            return definition
+
+    def _load(self, name):
+        """
+        Returns the parsed definition of a wave file.
+
+        Parameter name: the name of the wave file
+        Precondition: name is a string
+        """
+        assert isinstance(name,str)
+        data = self._loader(name)
+        assert data != None, 'could not load '+repr(name)
+        return parse_wave(data)